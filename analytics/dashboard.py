@@ -1,6 +1,5 @@
 from typing import List
 from tasks.task import Task
-import matplotlib.pyplot as plt
 import os
 
 class Dashboard:
@@ -32,6 +31,9 @@ class Dashboard:
         labels = status_counts.keys()
         sizes = status_counts.values()
         
+        # matplotlib takes ~0.5s to import; only charting needs it
+        import matplotlib.pyplot as plt
+        
         plt.figure(figsize=(6, 6))
         plt.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=140)
         plt.axis('equal')
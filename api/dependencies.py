@@ -1,10 +1,18 @@
+import asyncio
 from functools import lru_cache
+from typing import Iterator
+from fastapi import Depends
 from tasks.task_db import TaskDB
 from assistant.assistant import TaskAssistant
+from config import settings
+from backend.auth.dependencies import get_current_user
+from backend.users.models import User
 
 # Global instances
 _db_instance = None
 _assistant_instance = None
+# Keeps scheduled pre-warm tasks referenced until they finish
+_prewarm_tasks = set()
 
 def get_db() -> TaskDB:
     global _db_instance
@@ -12,6 +20,14 @@ def get_db() -> TaskDB:
         _db_instance = TaskDB()
     return _db_instance
 
+def get_request_db() -> Iterator[TaskDB]:
+    """Per-request TaskDB session, closed (returned to the pool) when the request ends."""
+    db = TaskDB()
+    try:
+        yield db
+    finally:
+        db.close()
+
 def get_assistant() -> TaskAssistant:
     global _assistant_instance
     if _assistant_instance is None:
@@ -20,8 +36,48 @@ def get_assistant() -> TaskAssistant:
         _assistant_instance = TaskAssistant(db)
     return _assistant_instance
 
+def get_request_assistant(
+    db: TaskDB = Depends(get_request_db),
+    current_user: User = Depends(get_current_user),
+    assistant: TaskAssistant = Depends(get_assistant)
+) -> TaskAssistant:
+    """
+    Shared assistant bound to this request's user and DB session.
+    
+    The LLM client and caches stay shared across requests; user context and
+    session are private to the request, so concurrent chats never leak into
+    each other.
+    """
+    return assistant.bind(db, user_id=current_user.id, user_email=current_user.email)
+
 def reset_assistant(provider: str, model_name: str = None):
+    """
+    Reconfigure the shared assistant.
+    
+    Changing only the model of the current provider swaps it in place:
+    requests already in flight finish on the old model, and caches survive.
+    Changing provider builds a new assistant; the LLM connection pools are
+    shared process-wide either way. Either way the connection pool chat
+    requests use is pre-warmed.
+    """
     global _assistant_instance
-    db = get_db()
-    _assistant_instance = TaskAssistant(db, provider=provider, model_name=model_name)
-    return _assistant_instance
+    current = _assistant_instance
+    if current is not None and current.llm_client.provider_name.upper() == provider.upper():
+        if not model_name and provider.upper() == "OPENROUTER":
+            model_name = settings.OPENROUTER_MODEL
+        current.llm_client.swap_model(model_name)
+    else:
+        current = _assistant_instance = TaskAssistant(get_db(), provider=provider, model_name=model_name)
+    _prewarm(current.llm_client)
+    return current
+
+def _prewarm(llm_client):
+    """Pre-warm the running event loop's pool in the background, or the sync pool outside a loop."""
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        llm_client.prewarm()
+        return
+    task = loop.create_task(llm_client.aprewarm())
+    _prewarm_tasks.add(task)
+    task.add_done_callback(_prewarm_tasks.discard)
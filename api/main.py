@@ -11,11 +11,13 @@ load_dotenv()
 from backend.users.models import User
 from backend.tasks.models import Task
 from backend.workspaces.models import Workspace, WorkspaceMember
+from backend.llm_usage.models import LLMUsageRollup
 
 from api.routes import tasks, assistant, analytics
 from backend.users import routes as auth_routes
 from backend.workspaces import routes as workspace_routes
 from scheduler.engine import get_scheduler
+from assistant.llm.transport import aclose_transports
 from contextlib import asynccontextmanager
 
 @asynccontextmanager
@@ -24,8 +26,9 @@ async def lifespan(app: FastAPI):
     scheduler = get_scheduler()
     scheduler.start()
     yield
-    # Shutdown: Stop the scheduler
+    # Shutdown: Stop the scheduler and close pooled LLM connections
     scheduler.stop()
+    await aclose_transports()
 
 app = FastAPI(
     title="TaskJarvis API",
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, Depends
 from api.schemas import AnalyticsResponse
-from api.dependencies import get_db
+from api.dependencies import get_request_db
 from tasks.task_db import TaskDB
 from analytics.dashboard import Dashboard
 import os
@@ -8,7 +8,7 @@ import os
 router = APIRouter(prefix="/analytics", tags=["analytics"])
 
 @router.get("/", response_model=AnalyticsResponse)
-def get_analytics(db: TaskDB = Depends(get_db)):
+def get_analytics(db: TaskDB = Depends(get_request_db)):
     dashboard = Dashboard()
     tasks = db.get_tasks()
     stats = dashboard.get_stats(tasks)
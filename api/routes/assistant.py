@@ -1,31 +1,45 @@
+from datetime import datetime, timedelta
+from typing import Optional
 from fastapi import APIRouter, Depends, HTTPException
-from api.schemas import ChatRequest, ChatResponse, ConfigRequest, ConfigResponse
-from api.dependencies import get_assistant, reset_assistant
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from sqlalchemy.orm import Session
+from api.schemas import (
+    ChatRequest, ChatResponse, ConfigRequest, ConfigResponse, AssistantStatsResponse, ImportRequest, ImportResponse,
+    LLMUsageResponse
+)
+from api.dependencies import get_assistant, get_request_assistant, reset_assistant
 from assistant.assistant import TaskAssistant
+from assistant.llm.accounting import llm_ledger
+from assistant.llm.singleflight import llm_singleflight
+from assistant.llm.usage import usage_tracker
+from assistant.metrics import llm_latency, render_metrics, stage_latency
+from assistant.streaming import StreamEvent
+from config import settings
+from tasks.task_db import TaskDB
 from backend.auth.dependencies import get_current_user
+from backend.database import get_db
+from backend.llm_usage.store import query_usage
 from backend.users.models import User
 import traceback
 
 router = APIRouter(prefix="/assistant", tags=["assistant"])
 
 @router.post("/chat", response_model=ChatResponse)
-def chat(
+async def chat(
     request: ChatRequest,
-    assistant: TaskAssistant = Depends(get_assistant),
-    current_user: User = Depends(get_current_user)
+    assistant: TaskAssistant = Depends(get_request_assistant)
 ):
     try:
-        # Set the current user ID in the assistant context
-        assistant.current_user_id = current_user.id
-        assistant.current_user_email = current_user.email
-        
-        print(f"🤖 AI Assistant processing for user: {current_user.id} ({current_user.email})")
+        # The assistant is bound to this request's user and DB session
+        print(f"🤖 AI Assistant processing for user: {assistant.current_user_id} ({assistant.current_user_email})")
         
-        response = assistant.process_input(request.message)
+        # Async pipeline: the event loop is only held while waiting on I/O
+        response = await assistant.aprocess_input(request.message, request.continuation_token)
         # The current assistant returns a string with mixed content (SQL, results, etc.)
         # We'll return it as is for now, but in a real app we might want to parse it better.
         # For this migration, we are wrapping existing logic, so returning the string is correct.
-        return ChatResponse(response=response)
+        timings = assistant.request_metrics.to_dict() if request.include_timings and assistant.request_metrics else None
+        return ChatResponse(response=response, continuation_token=assistant.continuation_token, timings=timings)
     except Exception as e:
         # Print full traceback to help debug
         print(f"❌ ERROR in /assistant/chat endpoint:")
@@ -35,8 +49,123 @@ def chat(
         traceback.print_exc()
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/import", response_model=ImportResponse)
+async def import_tasks(
+    request: ImportRequest,
+    assistant: TaskAssistant = Depends(get_request_assistant)
+):
+    """Add many tasks from natural-language lines; lines are classified concurrently and inserted together."""
+    if len(request.lines) > settings.ASSISTANT_IMPORT_MAX_LINES:
+        raise HTTPException(
+            status_code=400, detail=f"At most {settings.ASSISTANT_IMPORT_MAX_LINES} lines can be imported at once"
+        )
+    try:
+        result = await assistant.aimport_tasks(request.lines, concurrency=settings.ASSISTANT_IMPORT_CONCURRENCY)
+        return ImportResponse(**result)
+    except Exception as e:
+        print(f"❌ ERROR in /assistant/import endpoint: {type(e).__name__}: {e}")
+        traceback.print_exc()
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.post("/chat/stream")
+async def chat_stream(
+    request: ChatRequest,
+    assistant: TaskAssistant = Depends(get_assistant),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Server-sent-events variant of /chat.
+    
+    Emits "delta" events with the assistant's text as the LLM generates it,
+    then a "result" event with the full reply once any task query has run,
+    and a "continuation" event when a list reply has more pages.
+    """
+    print(f"🤖 AI Assistant streaming for user: {current_user.id} ({current_user.email})")
+    user_id, user_email = current_user.id, current_user.email
+    
+    async def event_stream():
+        # The session must outlive the handler, so the stream owns it
+        db = TaskDB()
+        try:
+            bound = assistant.bind(db, user_id=user_id, user_email=user_email)
+            async for event in bound.stream_input(request.message, request.continuation_token):
+                yield event.to_sse()
+            if bound.continuation_token:
+                yield StreamEvent("continuation", bound.continuation_token).to_sse()
+        except Exception as e:
+            print(f"❌ ERROR in /assistant/chat/stream endpoint: {type(e).__name__}: {e}")
+            traceback.print_exc()
+            yield StreamEvent("error", str(e)).to_sse()
+        finally:
+            db.close()
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/stats", response_model=AssistantStatsResponse)
+def stats(
+    assistant: TaskAssistant = Depends(get_assistant),
+    current_user: User = Depends(get_current_user)
+):
+    """Counters showing how much chat traffic is served without an LLM call, and what the rest costs."""
+    breaker = getattr(assistant.llm_client, "breaker", None)
+    hedge = getattr(assistant.llm_client, "hedge", None)
+    return AssistantStatsResponse(
+        fast_path=assistant.fast_path.stats() if assistant.fast_path else None,
+        intent_cache=assistant.intent_cache.stats() if assistant.intent_cache else None,
+        llm_usage=usage_tracker.stats(),
+        latency={"stages": stage_latency.stats(), "llm": llm_latency.stats()},
+        llm_coalescing=llm_singleflight.stats(),
+        llm_circuit=breaker.stats() if breaker else None,
+        llm_hedging=hedge.stats() if hedge else None,
+        llm_accounting=llm_ledger.stats() if getattr(assistant.llm_client, "ledger", None) else None
+    )
+
+@router.get("/usage", response_model=LLMUsageResponse)
+def usage(
+    group_by: str = "model",
+    hours: float = 24,
+    user_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    LLM calls, tokens, retries, latency and estimated cost over the last ``hours``.
+    
+    ``group_by`` is a comma-separated list of model, stage and user_id, e.g.
+    ``?group_by=user_id,stage`` to find which users and prompt types drive
+    latency and spend. Only operators (LLM_USAGE_OPERATORS) see other users'
+    usage; everyone else gets their own, and user_id is dropped from group_by.
+    Rollups are written by the scheduler every minute, so the latest minute
+    may be missing.
+    """
+    fields = [name.strip() for name in group_by.split(",") if name.strip()]
+    if (current_user.email or "").lower() not in settings.LLM_USAGE_OPERATORS:
+        user_id = current_user.id
+        fields = [name for name in fields if name != "user_id"]
+    since = datetime.utcnow() - timedelta(hours=hours)
+    try:
+        rows = query_usage(db, fields, since=since, user_id=user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return LLMUsageResponse(group_by=fields, since=since, rows=rows)
+
+@router.get("/metrics", response_class=PlainTextResponse)
+def metrics():
+    """
+    Pipeline stage and LLM latency histograms, LLM retries and token counts
+    in the Prometheus text format.
+    
+    Left unauthenticated for scrapers; it carries no user data.
+    """
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @router.post("/config", response_model=ConfigResponse)
-def configure(config: ConfigRequest):
+async def configure(config: ConfigRequest):
+    # Runs on the serving loop, so the pre-warm reaches the pool async chat requests use
     try:
         assistant = reset_assistant(provider=config.provider, model_name=config.model_name)
         # Access internal attributes to confirm - a bit hacky but we need to know what happened
@@ -45,7 +174,7 @@ def configure(config: ConfigRequest):
         return ConfigResponse(
             status="updated",
             provider=config.provider,
-            model=config.model_name
+            model=assistant.llm_client.model_name
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
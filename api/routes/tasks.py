@@ -1,7 +1,7 @@
 from fastapi import APIRouter, Depends, HTTPException
 from typing import List, Optional
 from api.schemas import TaskResponse, TaskCreate, TaskUpdate
-from api.dependencies import get_db
+from api.dependencies import get_request_db
 from tasks.task_db import TaskDB
 from tasks.task import Task
 from backend.auth.dependencies import get_current_user
@@ -13,7 +13,7 @@ router = APIRouter(prefix="/tasks", tags=["tasks"])
 def get_tasks(
     status: Optional[str] = None, 
     priority: Optional[str] = None,
-    db: TaskDB = Depends(get_db)
+    db: TaskDB = Depends(get_request_db)
 ):
     tasks = db.get_tasks(status=status, priority=priority)
     return tasks
@@ -21,7 +21,7 @@ def get_tasks(
 @router.post("/", response_model=TaskResponse)
 def create_task(
     task: TaskCreate,
-    db: TaskDB = Depends(get_db),
+    db: TaskDB = Depends(get_request_db),
     current_user: User = Depends(get_current_user)
 ):
     # Debug: Print user info
@@ -47,7 +47,7 @@ def create_task(
     return new_task
 
 @router.put("/{task_id}", response_model=TaskResponse)
-def update_task(task_id: int, task_update: TaskUpdate, db: TaskDB = Depends(get_db)):
+def update_task(task_id: int, task_update: TaskUpdate, db: TaskDB = Depends(get_request_db)):
     # Check if task exists first (optional but good practice)
     # TaskDB doesn't have get_task_by_id, but update handles it gracefully usually
     # For now, we just call update
@@ -79,6 +79,6 @@ def update_task(task_id: int, task_update: TaskUpdate, db: TaskDB = Depends(get_
     return updated_task
 
 @router.delete("/{task_id}")
-def delete_task(task_id: int, db: TaskDB = Depends(get_db)):
+def delete_task(task_id: int, db: TaskDB = Depends(get_request_db)):
     db.delete_task(task_id)
     return {"message": "Task deleted successfully"}
@@ -1,3 +1,4 @@
+from datetime import datetime
 from pydantic import BaseModel
 from typing import Optional, List, Dict, Any
 
@@ -30,10 +31,40 @@ class TaskResponse(TaskBase):
 # Assistant Schemas
 class ChatRequest(BaseModel):
     message: str
+    # Continuation token of a truncated list reply: returns its next page
+    continuation_token: Optional[str] = None
+    # Return per-stage timings and LLM usage with the reply
+    include_timings: bool = False
 
 class ChatResponse(BaseModel):
     response: str
     sql_query: Optional[str] = None
+    continuation_token: Optional[str] = None
+    timings: Optional[Dict[str, Any]] = None
+
+class ImportRequest(BaseModel):
+    # One natural-language task per line, e.g. "call the bank tomorrow at 10"
+    lines: List[str]
+
+class ImportResponse(BaseModel):
+    imported: int
+    skipped: List[Dict[str, str]] = []
+    response: str
+
+class AssistantStatsResponse(BaseModel):
+    fast_path: Optional[Dict[str, Any]] = None
+    intent_cache: Optional[Dict[str, Any]] = None
+    llm_usage: Dict[str, Any] = {}
+    latency: Dict[str, Any] = {}
+    llm_coalescing: Dict[str, Any] = {}
+    llm_circuit: Optional[Dict[str, Any]] = None
+    llm_hedging: Optional[Dict[str, Any]] = None
+    llm_accounting: Optional[Dict[str, Any]] = None
+
+class LLMUsageResponse(BaseModel):
+    group_by: List[str]
+    since: datetime
+    rows: List[Dict[str, Any]]
 
 class ConfigRequest(BaseModel):
     provider: str
@@ -1,7 +1,23 @@
-import json
+import copy
 import os
-from typing import Dict, Any, Optional, Tuple
+from typing import AsyncIterator, Dict, Any, List, Optional, Tuple, Union
+from sqlalchemy import text
+from sqlalchemy.sql import Executable
 from assistant.llm.factory import LLMFactory
+from assistant.fast_path import FastPathRecognizer
+from assistant.intent_cache import IntentCache
+from assistant.query_builder import CompiledBatch, TaskQueryBuilder, decode_continuation, encode_continuation
+from assistant.llm.accounting import llm_ledger
+from assistant.llm.circuit_breaker import CircuitBreaker
+from assistant.llm.errors import LLMCircuitOpenError, LLMInvalidResponseError
+from assistant.llm.hedging import HedgePolicy
+from assistant.llm.rate_limit import create_rate_limiter
+from assistant.llm.usage import llm_user
+from assistant.prompts import COMBINED_INTENT_SCHEMA, INTENT_SCHEMA, SQL_SCHEMA, build_intent_prompt, build_sql_prompt
+from assistant.sql_guard import SQLGuard, UnsafeSQLError
+from assistant.pipeline import Pipeline, LLMStep, LLMBatchStep, DBStep, run_sync, run_async, run_stream
+from assistant.streaming import StreamEvent
+from assistant.metrics import RequestMetrics, collect_request_metrics, timed
 from config import settings
 from tasks.task_db import TaskDB
 from tasks.task import Task
@@ -10,12 +26,44 @@ from taskjarvis_logging.logger import get_logger
 
 logger = get_logger(__name__)
 
+# Reply while the LLM circuit breaker is open; commands the fast path knows still work
+OFFLINE_RESPONSE = (
+    "🤖 Offline Mode\n\nThe AI service is temporarily unavailable. Simple commands such as "
+    "\"list my tasks\", \"add task: buy milk\" or \"complete task 3\" still work."
+)
+
+
 class TaskAssistant:
-    def __init__(self, db: TaskDB, provider: Optional[str] = None, model_name: Optional[str] = None):
+    def __init__(self, db: TaskDB, provider: Optional[str] = None, model_name: Optional[str] = None,
+                 mode: Optional[str] = None):
         self.db = db
         self.dashboard = Dashboard()
         self.show_sql = True  # Toggle SQL visibility
         
+        # Pipeline mode (argument overrides settings): COMBINED or TWO_STEP
+        self.mode = (mode or settings.ASSISTANT_MODE).upper()
+        
+        # Deterministic recognizer tried before any LLM call
+        self.fast_path = FastPathRecognizer() if settings.ASSISTANT_FAST_PATH else None
+        
+        # Compiles core intents into bound SQL statements
+        self.query_builder = TaskQueryBuilder(page_size=settings.ASSISTANT_PAGE_SIZE)
+        
+        # Scopes, limits and cost-checks SQL the LLM writes for everything else;
+        # one row past the page tells the reply that the list was cut off
+        self.sql_guard = SQLGuard(
+            row_limit=settings.ASSISTANT_PAGE_SIZE + 1,
+            max_cost=settings.SQL_GUARD_MAX_COST,
+            statement_timeout_ms=settings.SQL_GUARD_STATEMENT_TIMEOUT_MS
+        )
+        
+        # Cache of parsed intents for repeated phrasings
+        self.intent_cache = IntentCache(
+            max_size=settings.INTENT_CACHE_SIZE,
+            ttl=settings.INTENT_CACHE_TTL,
+            bucket_seconds=settings.INTENT_CACHE_BUCKET_SECONDS
+        ) if settings.INTENT_CACHE_SIZE > 0 else None
+        
         # Get LLM provider (argument overrides settings)
         provider = provider or settings.LLM_PROVIDER
         
@@ -28,16 +76,99 @@ class TaskAssistant:
         if not model_name and provider.upper() == "OPENROUTER":
             model_name = settings.OPENROUTER_MODEL
         
+        # Optional per-stage models (e.g. a small one for intent classification)
+        router = LLMFactory.create_router(
+            {
+                "intent": settings.ASSISTANT_INTENT_MODEL,
+                "sql": settings.ASSISTANT_SQL_MODEL,
+                "conversation": settings.ASSISTANT_CONVERSATION_MODEL,
+            },
+            {
+                "intent": settings.ASSISTANT_INTENT_BACKUP_MODEL,
+                "sql": settings.ASSISTANT_SQL_BACKUP_MODEL,
+                "conversation": settings.ASSISTANT_CONVERSATION_BACKUP_MODEL,
+            },
+            p95_budget_ms=settings.MODEL_ROUTING_P95_BUDGET_MS
+        )
+        
+        # Fails LLM calls fast during a provider outage; deterministic paths keep working
+        breaker = CircuitBreaker(
+            failure_rate=settings.LLM_BREAKER_FAILURE_RATE,
+            slow_call_seconds=settings.LLM_BREAKER_SLOW_CALL_MS / 1000,
+            window=settings.LLM_BREAKER_WINDOW,
+            open_seconds=settings.LLM_BREAKER_OPEN_SECONDS
+        ) if settings.LLM_CIRCUIT_BREAKER else None
+        
+        # Requests/tokens per minute shared by all workers, so bursts queue instead of hitting 429s
+        rate_limiter = create_rate_limiter(
+            settings.LLM_RATE_LIMIT_RPM,
+            settings.LLM_RATE_LIMIT_TPM,
+            max_wait=settings.LLM_RATE_LIMIT_MAX_WAIT,
+            state_file=settings.LLM_RATE_LIMIT_STATE_FILE
+        )
+        
+        # Races slow calls against a duplicate to cut tail latency
+        hedge = HedgePolicy(
+            percentile=settings.LLM_HEDGE_PERCENTILE,
+            min_delay=settings.LLM_HEDGE_MIN_DELAY_MS / 1000,
+            backup_model=settings.LLM_HEDGE_BACKUP_MODEL or None
+        ) if settings.LLM_HEDGE else None
+        
+        # Per-call tokens, latency and cost per model, stage and user
+        if settings.LLM_ACCOUNTING:
+            llm_ledger.set_prices(settings.LLM_PRICES)
+        
         # Create LLM client with fallback to Mock
         self.llm_client = LLMFactory.create_with_fallback(
             provider=provider,
             api_key=api_key,
-            model_name=model_name
+            model_name=model_name,
+            response_format=settings.OPENROUTER_RESPONSE_FORMAT,
+            router=router,
+            breaker=breaker,
+            base_url=settings.OPENROUTER_BASE_URL,
+            rate_limiter=rate_limiter,
+            hedge=hedge,
+            ledger=llm_ledger if settings.LLM_ACCOUNTING else None,
+            cache_mode=settings.LLM_CACHE_MODE,
+            cache_path=settings.LLM_CACHE_PATH,
+            cache_max_mb=settings.LLM_CACHE_MAX_MB
         )
         
-        # User context (set by the API endpoint)
+        # User context (set per request via bind())
         self.current_user_id: Optional[int] = None
         self.current_user_email: Optional[str] = None
+        
+        # Token for the next page of the last list reply, if it was truncated
+        self.continuation_token: Optional[str] = None
+        
+        # Stage timings and LLM usage of the last request
+        self.request_metrics: Optional[RequestMetrics] = None
+
+    def bind(self, db: TaskDB, user_id: Optional[int] = None, user_email: Optional[str] = None) -> "TaskAssistant":
+        """
+        Return a request-scoped view of this assistant.
+        
+        The copy gets its own database session and user context, while the
+        expensive shared parts (LLM client, caches, recognizer, query builder)
+        stay shared. Concurrent requests can therefore run in parallel without
+        clobbering each other's user or session.
+        
+        Args:
+            db: Database session owned by the request
+            user_id: Current user's ID
+            user_email: Current user's email
+            
+        Returns:
+            A TaskAssistant bound to the request context
+        """
+        bound = copy.copy(self)
+        bound.db = db
+        bound.current_user_id = user_id
+        bound.current_user_email = user_email
+        bound.continuation_token = None
+        bound.request_metrics = None
+        return bound
 
     # ============================================================
     # LOWERCASE CONVERSION UTILITIES
@@ -61,126 +192,42 @@ class TaskAssistant:
     # AI-POWERED SQL GENERATION
     # ============================================================
     
-    def _ask_ai_for_sql(self, intent: str, entities: Dict[str, Any], user_input: str) -> Optional[str]:
+    def _ask_ai_for_sql(self, intent: str, entities: Dict[str, Any], user_input: str) -> Pipeline:
         """
         Ask the AI to generate the SQL query based on intent and entities.
         This is the AI doing the work, not us!
+        
+        Pipeline step: use with ``yield from``; returns the SQL or None.
+        
+        Raises:
+            LLMCircuitOpenError: While the LLM is considered down, so the
+                caller can answer offline as the intent stage does
         """
         from utils.date_parser import get_current_time_str
         
-        current_time = get_current_time_str()
-        
         # Normalize entities before passing to AI
         normalized_entities = self._normalize_entities(entities)
         
-        sql_generation_prompt = f"""
-You are an SQL expert. Generate ONLY the SQL query for this task management operation.
-
-DATABASE SCHEMA (PostgreSQL):
-CREATE TABLE tasks (
-    id SERIAL PRIMARY KEY,
-    title TEXT NOT NULL,
-    status TEXT DEFAULT 'pending',
-    priority TEXT DEFAULT 'medium',
-    deadline TIMESTAMP,
-    recurrence_rule TEXT,
-    reminder_offset INTEGER,
-    last_reminded_at TIMESTAMP,
-    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-    user_id INTEGER,
-    workspace_id INTEGER,
-    assigned_to_id INTEGER
-);
-
-IMPORTANT RULES:
-- ALL text values MUST be in lowercase (title, status, priority)
-- Use lowercase for: 'pending', 'completed', 'low', 'medium', 'high'
-- NEVER use uppercase or mixed case like 'Pending', 'Medium', 'Completed'
-- Always include created_at and updated_at in INSERT queries
-
-USER REQUEST: {user_input}
-DETECTED INTENT: {intent}
-EXTRACTED ENTITIES: {json.dumps(normalized_entities)}
-CURRENT TIME: {current_time}
-
-IMPORTANT DEADLINE RULES:
-- For relative deadlines, use: NOW() + INTERVAL 'X minutes' or INTERVAL 'X hours'
-- Examples: INTERVAL '3 minutes', INTERVAL '2 hours', INTERVAL '1 day'
-- NEVER use decimal numbers like INTERVAL 0.05 minute
-- Always use quotes around the interval value
-
-INSTRUCTIONS:
-- Generate ONLY the SQL query, nothing else
-- No markdown, no explanations, no code blocks
-- Use single quotes for strings
-- ALL string values must be lowercase
-- For INSERT: ALWAYS include created_at and updated_at with NOW()
-- For INSERT: ALWAYS include user_id with the current user's ID
-- For INSERT: include title (lowercase), and optionally deadline, priority (lowercase), status (lowercase), recurrence_rule, reminder_offset. DO NOT include id.
-- If recurrence_rule is provided, include it in INSERT (as string with quotes)
-- If reminder_offset is provided, include it in INSERT (as integer, no quotes)
-- For SELECT: use WHERE clauses with lowercase values (status, priority)
-- For UPDATE: set status='completed' for complete operations (lowercase), and ALWAYS set updated_at = NOW()
-- For DELETE: use WHERE id = X or delete all if scope is "all"
-
-Examples:
-Intent: add_task, Entities: {{"title": "buy milk"}}
-Response: INSERT INTO tasks (title, status, priority, user_id, created_at, updated_at) VALUES ('buy milk', 'pending', 'medium', {self.current_user_id or 'NULL'}, NOW(), NOW());
-
-Intent: add_task, Entities: {{"title": "test reminder", "reminder_offset": 1}}
-Response: INSERT INTO tasks (title, status, priority, reminder_offset, user_id, created_at, updated_at) VALUES ('test reminder', 'pending', 'medium', 1, {self.current_user_id or 'NULL'}, NOW(), NOW());
-
-Intent: list_tasks, Entities: {{"status": "pending"}}
-Response: SELECT * FROM tasks WHERE LOWER(status) = 'pending';
-
-Intent: delete_task, Entities: {{"id": 5}}
-Response: DELETE FROM tasks WHERE id = 5;
-
-Intent: complete_task, Entities: {{"id": 3}}
-Response: UPDATE tasks SET status = 'completed', updated_at = NOW() WHERE id = 3;
-
-Now generate the SQL query:
-"""
+        sql_generation_prompt = build_sql_prompt(
+            user_input, intent, normalized_entities, get_current_time_str(), self.current_user_id
+        )
         
         try:
-            sql_response = self.llm_client.generate(sql_generation_prompt)
-            
-            # Clean up the response
-            sql_query = sql_response.strip()
-
-            logger.info(f"Generated SQL query: {sql_query}")
-            
-            # Remove markdown code blocks if present
-            if "```sql" in sql_query:
-                sql_query = sql_query.split("```sql")[1].split("```")[0].strip()
-            elif "```" in sql_query:
-                sql_query = sql_query.split("```")[1].split("```")[0].strip()
-            
-            # Remove any extra text before or after the query
-            # Find the first SQL keyword
-            sql_keywords = ['SELECT', 'INSERT', 'UPDATE', 'DELETE']
-            for keyword in sql_keywords:
-                if keyword in sql_query.upper():
-                    start_idx = sql_query.upper().find(keyword)
-                    sql_query = sql_query[start_idx:]
-                    break
-            
-            # Find the semicolon and cut there
-            if ';' in sql_query:
-                end_idx = sql_query.find(';')
-                sql_query = sql_query[:end_idx + 1]
-            
+            sql_response = yield LLMStep("sql", sql_generation_prompt, schema=SQL_SCHEMA)
+            sql_query = sql_response["sql"].strip()
             logger.info(f"AI generated SQL: {sql_query}")
             return sql_query
             
+        except LLMCircuitOpenError:
+            raise
         except Exception as e:
             logger.error(f"Failed to generate SQL with AI: {e}")
             return None
 
-    def _format_sql_output(self, sql: str) -> str:
+    def _format_sql_output(self, sql: str, generated_by_ai: bool = True) -> str:
         """Format SQL query for display to user."""
-        return f"\n🔍 [SQL Query Generated by AI]\n{sql}\n"
+        label = "SQL Query Generated by AI" if generated_by_ai else "SQL Query"
+        return f"\n🔍 [{label}]\n{sql}\n"
 
     def _is_task_intent(self, intent: str) -> bool:
         """Check if intent requires database operation."""
@@ -191,102 +238,191 @@ Now generate the SQL query:
     # MODIFIED: Main Processing - AI Generates Everything
     # ============================================================
 
-    def process_input(self, user_input: str) -> str:
+    def process_input(self, user_input: str, continuation_token: Optional[str] = None) -> str:
         """
         Process user input with AI-powered SQL generation:
-        1. AI detects intent
-        2. AI generates SQL query
+        1. AI detects intent (and, in COMBINED mode, generates the SQL too)
+        2. AI generates SQL query (TWO_STEP mode, or COMBINED fallback)
         3. Execute query and return results
+        
+        Passing the continuation_token of a truncated list reply returns the
+        next page directly, without an LLM call. A new token (or None) is left
+        in self.continuation_token, and the request's per-stage timings in
+        self.request_metrics.
         """
+        with llm_user(self.current_user_id), collect_request_metrics() as metrics, timed("total"):
+            self.request_metrics = metrics
+            return run_sync(self._pipeline(user_input, continuation_token), self.llm_client)
+
+    async def aprocess_input(self, user_input: str, continuation_token: Optional[str] = None) -> str:
+        """
+        Async variant of process_input.
+        
+        LLM calls are awaited on the event loop and database work runs in a
+        worker thread, so no thread is blocked while the LLM is generating.
+        """
+        with llm_user(self.current_user_id), collect_request_metrics() as metrics, timed("total"):
+            self.request_metrics = metrics
+            return await run_async(self._pipeline(user_input, continuation_token), self.llm_client)
+
+    async def stream_input(self, user_input: str,
+                           continuation_token: Optional[str] = None) -> AsyncIterator[StreamEvent]:
+        """
+        Streaming variant of aprocess_input.
+        
+        Yields "delta" events with the assistant's conversational text as the
+        LLM generates it, then one "result" event with the full reply once any
+        task query has run.
+        """
+        with llm_user(self.current_user_id), collect_request_metrics() as metrics, timed("total"):
+            self.request_metrics = metrics
+            async for event in run_stream(self._pipeline(user_input, continuation_token), self.llm_client):
+                yield event
+
+    def import_tasks(self, lines: List[str], concurrency: int = 8) -> Dict[str, Any]:
+        """
+        Add many tasks from natural-language lines ("call the bank tomorrow at 10").
+        
+        Lines the fast path recognizes are parsed without the LLM; the rest are
+        classified concurrently (up to ``concurrency`` LLM calls in flight).
+        Every line that parses as a task is inserted in one transaction; the
+        others are reported back instead of failing the whole import.
+        
+        Returns:
+            {"imported": count, "skipped": [{"line": ..., "reason": ...}], "response": summary}
+        """
+        with llm_user(self.current_user_id), collect_request_metrics() as metrics, timed("total"):
+            self.request_metrics = metrics
+            return run_sync(self._import_pipeline(lines, concurrency), self.llm_client)
+
+    async def aimport_tasks(self, lines: List[str], concurrency: int = 8) -> Dict[str, Any]:
+        """Async variant of import_tasks."""
+        with llm_user(self.current_user_id), collect_request_metrics() as metrics, timed("total"):
+            self.request_metrics = metrics
+            return await run_async(self._import_pipeline(lines, concurrency), self.llm_client)
+
+    def _import_pipeline(self, lines: List[str], concurrency: int) -> Pipeline:
+        """Bulk import pipeline shared by import_tasks and aimport_tasks."""
+        from utils.date_parser import get_current_time_str
+        from utils.reminder_parser import extract_reminder_offset
+        
+        lines = [line.strip() for line in lines if line and line.strip()]
+        parsed: List[Optional[Dict[str, Any]]] = [None] * len(lines)
+        
+        # Unambiguous "add task: ..." lines need no LLM call
+        for i, line in enumerate(lines):
+            fast_match = self.fast_path.match(line) if self.fast_path else None
+            if fast_match and fast_match.intent == "add_task":
+                parsed[i] = {"intent": "add_task", "entities": fast_match.entities}
+        
+        pending = [i for i, item in enumerate(parsed) if item is None]
+        if pending:
+            current_time = get_current_time_str()
+            prompts = [
+                build_intent_prompt(lines[i], current_time, self.current_user_id, combined=False) for i in pending
+            ]
+            results = yield LLMBatchStep("intent", prompts, schema=INTENT_SCHEMA, concurrency=concurrency)
+            for i, result in zip(pending, results):
+                parsed[i] = result if isinstance(result, Exception) else result.data
+        
+        operations, skipped = [], []
+        for line, item in zip(lines, parsed):
+            if isinstance(item, Exception):
+                logger.warning(f"Import: could not classify {line[:50]!r}: {item}")
+                skipped.append({"line": line, "reason": f"AI error: {item}"})
+                continue
+            if item.get("intent") != "add_task":
+                skipped.append({"line": line, "reason": f"not a task (understood as {item.get('intent')})"})
+                continue
+            entities = self._normalize_entities(item.get("entities") or {})
+            if "reminder_offset" not in entities:
+                reminder_offset = extract_reminder_offset(line)
+                if reminder_offset is not None:
+                    entities["reminder_offset"] = reminder_offset
+            if self.query_builder.build("add_task", entities, self.current_user_id) is None:
+                skipped.append({"line": line, "reason": "no task title found"})
+                continue
+            operations.append({"intent": "add_task", "entities": entities})
+        
+        if not operations:
+            return {"imported": 0, "skipped": skipped, "response": "📋 Task Manager Mode\n❌ No tasks to import."}
+        
+        batch = self.query_builder.build_batch(operations, self.current_user_id)
+        summary = f"Imported {len(operations)} of {len(lines)} line(s)."
+        try:
+            # One transaction: either every parsed task is added or none is
+            result = yield DBStep(lambda: self._execute_sql_and_format("batch", batch, {}, summary))
+        except Exception as e:
+            logger.error(f"Error importing tasks: {e}")
+            return {"imported": 0, "skipped": skipped, "response": f"📋 Task Manager Mode\n❌ Error: {e}"}
+        return {"imported": len(operations), "skipped": skipped, "response": f"📋 Task Manager Mode\n✅ Result:\n{result}"}
+
+    def _pipeline(self, user_input: str, continuation_token: Optional[str] = None) -> Pipeline:
+        """The request pipeline shared by process_input and aprocess_input."""
         from utils.date_parser import get_current_time_str
         
         logger.info(f"Processing user input: {user_input[:100]}...")
+        self.continuation_token = None
         
-        # Get current time for LLM context
-        current_time = get_current_time_str()
+        # "Show more": the token fully describes the next page
+        if continuation_token:
+            compiled = self.query_builder.build_next_page(continuation_token, self.current_user_id)
+            if not compiled:
+                return "📋 Task Manager Mode\n❌ That page is no longer available. Please ask for your tasks again."
+            filters, _ = decode_continuation(continuation_token)
+            return (yield DBStep(lambda: self._run_task_query(
+                "list_tasks", compiled.statement, filters, "Here are more of your tasks.", compiled.params
+            )))
         
         # ============================================================
-        # STEP 1: AI DETECTS INTENT (existing logic)
+        # STEP 0: DETERMINISTIC FAST PATH (no LLM call)
         # ============================================================
         
-        system_prompt = f"""You are TaskJarvis, a productivity assistant.
-Analyze the user's input and extract the intent and entities.
-
-CURRENT TIME: {current_time}
-
-IMPORTANT: When extracting entities, convert all text fields to lowercase:
-- title: always lowercase
-- status: use 'pending', 'completed', 'in progress' (all lowercase)
-- priority: use 'low', 'medium', 'high' (all lowercase)
-
-RECURRENCE DETECTION:
-- Detect phrases like "every day", "daily", "every week", "weekly", "every month", "monthly"
-- Convert to recurrence_rule in RRULE format:
-  * "every day" or "daily" → "FREQ=DAILY;INTERVAL=1"
-  * "every week" or "weekly" → "FREQ=WEEKLY;INTERVAL=1"
-  * "every month" or "monthly" → "FREQ=MONTHLY;INTERVAL=1"
-  * "every Monday" → "FREQ=WEEKLY;BYDAY=MO"
-  * "every 2 days" → "FREQ=DAILY;INTERVAL=2"
-
-REMINDER DETECTION:
-- Detect phrases like "remind me X minutes/hours before", "with a X minute reminder", "alert me X before"
-- Convert to reminder_offset (integer, in minutes):
-  * "10 minutes before" → 10
-  * "with a 1 minute reminder" → 1
-  * "with a 5 minute reminder" → 5
-  * "1 hour before" → 60
-  * "2 hours before" → 120
-  * "remind me" (no time specified) → 15 (default)
-
-Intents:
-- add_task: Create a new task. Entities: title (REQUIRED, lowercase), deadline (optional), priority (optional, lowercase), recurrence_rule (optional), reminder_offset (optional, integer)
-- list_tasks: Show tasks. Entities: status (optional, lowercase), priority (optional, lowercase).
-- delete_task: Remove a task. Entities: id (int) or scope ("all").
-- complete_task: Mark task as done. Entities: id (int) or scope ("all").
-- analytics: Show stats.
-- unknown: If unclear or not task-related (normal conversation).
-
-CRITICAL: Respond with ONLY valid JSON. No markdown, no code blocks.
-
-JSON format:
-{{"intent": "intent_name", "entities": {{}}, "response": "message"}}
-
-Examples:
-{{"intent": "list_tasks", "entities": {{}}, "response": "Here are your tasks."}}
-{{"intent": "add_task", "entities": {{"title": "buy groceries"}}, "response": "I'll add that task."}}
-{{"intent": "add_task", "entities": {{"title": "team meeting", "recurrence_rule": "FREQ=WEEKLY;BYDAY=MO", "reminder_offset": 15}}, "response": "I'll add that recurring task with a reminder."}}
-{{"intent": "unknown", "entities": {{}}, "response": "I'm a task management assistant. How can I help with your tasks?"}}
-"""
+        if self.fast_path:
+            with timed("fast_path"):
+                fast_match = self.fast_path.match(user_input)
+                compiled = self.query_builder.build(
+                    fast_match.intent, fast_match.entities, self.current_user_id
+                ) if fast_match else None
+            if compiled:
+                logger.info(f"Task Manager Mode (fast path): {fast_match.intent}")
+                return (yield DBStep(lambda: self._run_task_query(
+                    fast_match.intent, compiled.statement, fast_match.entities, fast_match.response, compiled.params
+                )))
         
-        full_prompt = f"{system_prompt}\n\nUser Input: {user_input}"
+        # ============================================================
+        # STEP 1: AI DETECTS INTENT (existing logic)
+        # ============================================================
+        
+        # Static prefix + per-request suffix (time, user, input) keeps the prefix cacheable
+        combined_mode = self.mode == "COMBINED"
+        full_prompt = build_intent_prompt(
+            user_input, get_current_time_str(), self.current_user_id, combined=combined_mode
+        )
         
         try:
-            llm_response = self.llm_client.generate(full_prompt)
-            logger.debug(f"Raw LLM response: {llm_response[:500]}...")
-            
-            # Clean up response
-            cleaned_response = llm_response.strip()
-            
-            # Remove markdown code blocks
-            if "```json" in cleaned_response:
-                cleaned_response = cleaned_response.split("```json")[1].split("```")[0].strip()
-            elif "```" in cleaned_response:
-                cleaned_response = cleaned_response.split("```")[1].split("```")[0].strip()
-            
-            # Extract JSON if there's extra text
-            if not cleaned_response.startswith("{"):
-                start_idx = cleaned_response.find("{")
-                if start_idx != -1:
-                    end_idx = cleaned_response.rfind("}")
-                    if end_idx != -1:
-                        cleaned_response = cleaned_response[start_idx:end_idx+1]
+            # Identical phrasings within the same time bucket reuse the parsed intent
+            parsed = self.intent_cache.get(user_input) if self.intent_cache else None
             
-            logger.debug(f"Cleaned response: {cleaned_response[:500]}...")
+            if parsed is not None:
+                logger.info("Intent served from cache")
+            else:
+                schema = COMBINED_INTENT_SCHEMA if combined_mode else INTENT_SCHEMA
+                llm_response = yield LLMStep("intent", full_prompt, stream_field="response", schema=schema)
+                logger.debug(f"Raw LLM response: {llm_response.raw[:500]}...")
+                
+                parsed = llm_response.data
+                if self.intent_cache:
+                    self.intent_cache.put(user_input, parsed)
             
-            parsed = json.loads(cleaned_response)
             intent = parsed.get("intent")
             entities = parsed.get("entities", {})
             ai_response = parsed.get("response", "")
+            combined_sql = parsed.get("sql") if combined_mode else None
+            operations = [
+                {"intent": op.get("intent"), "entities": self._normalize_entities(op.get("entities") or {})}
+                for op in parsed.get("operations") or [] if isinstance(op, dict)
+            ]
             
             # Additional normalization as safety measure
             entities = self._normalize_entities(entities)
@@ -298,12 +434,16 @@ Examples:
                 if reminder_offset is not None:
                     entities["reminder_offset"] = reminder_offset
                     logger.info(f"Fallback extracted reminder_offset: {reminder_offset} minutes")
+                    # The combined SQL was written without it - regenerate
+                    combined_sql = None
             
             logger.info(f"AI detected intent: {intent} | Entities: {entities}")
             
-        except json.JSONDecodeError as e:
-            logger.error(f"Failed to parse LLM response as JSON: {e}")
-            logger.error(f"Raw response was: {llm_response[:1000]}")
+        except LLMCircuitOpenError as e:
+            logger.warning(f"AI unavailable, answering offline: {e}")
+            return OFFLINE_RESPONSE
+        except LLMInvalidResponseError as e:
+            logger.error(f"LLM response did not match the intent schema: {e}")
             return "💬 Normal Conversation Mode\n\nI'm having trouble understanding. Could you rephrase that?"
         except Exception as e:
             logger.error(f"Error processing request: {e}")
@@ -313,13 +453,26 @@ Examples:
         # STEP 2: MODE DETECTION
         # ============================================================
         
+        if intent == "batch" or len(operations) > 1:
+            # Several commands in one message: one transaction, one summary
+            if len(operations) == 1:
+                intent, entities = operations[0]["intent"], operations[0]["entities"]
+            else:
+                logger.info(f"Task Manager Mode: batch of {len(operations)} operations")
+                batch = self.query_builder.build_batch(operations, self.current_user_id) if operations else None
+                if not batch:
+                    return ("📋 Task Manager Mode\n❌ I couldn't run all of those together. "
+                            "Please send them one at a time.")
+                return (yield DBStep(lambda: self._run_task_query("batch", batch, entities, ai_response)))
+        
         is_task_mode = self._is_task_intent(intent)
         
         if not is_task_mode:
             # NORMAL CONVERSATION MODE
             if intent == "analytics":
                 # Special case: analytics
-                return f"📊 Analytics Mode\n\n{self._handle_analytics(ai_response)}"
+                analytics = yield DBStep(lambda: self._handle_analytics(ai_response))
+                return f"📊 Analytics Mode\n\n{analytics}"
             
             logger.info(f"Normal Conversation Mode: {intent}")
             return f"💬 Normal Conversation Mode\n\n{ai_response}"
@@ -329,19 +482,45 @@ Examples:
         # ============================================================
         
         logger.info(f"Task Manager Mode: {intent}")
-        sql_query = self._ask_ai_for_sql(intent, entities, user_input)
+        
+        # Core intents compile to bound, user-scoped statements - no AI-written SQL needed
+        compiled = self.query_builder.build(intent, entities, self.current_user_id)
+        if compiled:
+            return (yield DBStep(lambda: self._run_task_query(
+                intent, compiled.statement, entities, ai_response, compiled.params
+            )))
+        
+        # Free-form AI SQL for requests the query builder cannot express
+        sql_query = combined_sql.strip() if combined_sql and combined_sql.strip() else None
+        
+        if sql_query:
+            logger.info(f"Using SQL from combined response: {sql_query}")
+        else:
+            # TWO_STEP mode, or the combined response carried no usable SQL
+            try:
+                sql_query = yield from self._ask_ai_for_sql(intent, entities, user_input)
+            except LLMCircuitOpenError as e:
+                logger.warning(f"AI unavailable, answering offline: {e}")
+                return OFFLINE_RESPONSE
         
         if not sql_query:
             return f"❌ Failed to generate SQL query. Please try again."
         
-        sql_display = self._format_sql_output(sql_query) if self.show_sql else ""
-        
         # ============================================================
         # STEP 4: EXECUTE THE AI-GENERATED SQL
         # ============================================================
         
+        return (yield DBStep(lambda: self._run_task_query(intent, sql_query, entities, ai_response)))
+
+    def _run_task_query(self, intent: str, query: Union[str, Executable, CompiledBatch], entities: Dict[str, Any],
+                        ai_msg: str, params: Optional[Dict[str, Any]] = None) -> str:
+        """Execute a task query (AI-written SQL text, a compiled statement or batch) and wrap the result."""
+        is_ai_sql = isinstance(query, str)
+        sql_text = query.sql if isinstance(query, CompiledBatch) else str(query)
+        sql_display = self._format_sql_output(sql_text, generated_by_ai=is_ai_sql) if self.show_sql else ""
+        
         try:
-            result = self._execute_sql_and_format(intent, sql_query, entities, ai_response)
+            result = self._execute_sql_and_format(intent, query, entities, ai_msg, params)
             return f"📋 Task Manager Mode{sql_display}\n✅ Result:\n{result}"
             
         except Exception as e:
@@ -352,66 +531,118 @@ Examples:
     # SINGLE SQL EXECUTION FUNCTION
     # ============================================================
     
-    def _execute_sql_and_format(self, intent: str, sql_query: str, entities: Dict[str, Any], ai_msg: str) -> str:
+    def _execute_sql_and_format(self, intent: str, sql_query: Union[str, Executable, CompiledBatch],
+                                entities: Dict[str, Any], ai_msg: str,
+                                params: Optional[Dict[str, Any]] = None) -> str:
         """
-        Execute the AI-generated SQL query directly on the database.
+        Execute the SQL query (AI-generated text, a compiled statement or batch) directly on the database.
         Single function handles ALL operations - no routing needed!
         """
         try:
-            # Execute the AI-generated SQL using TaskDB's execute_query
-            result = self.db.execute_query(sql_query)
+            if isinstance(sql_query, CompiledBatch):
+                results = self.db.execute_batch([(query.statement, query.params) for query in sql_query.queries])
+                return self._format_batch_result(sql_query, results, ai_msg)
+            
+            timeout_ms = None
+            if isinstance(sql_query, str):
+                # AI-written SQL is scoped to the user, bounded and cost-checked first
+                with timed("sql_guard"):
+                    guarded = self.sql_guard.prepare(sql_query, self.current_user_id)
+                    self.sql_guard.check_cost(guarded, self.db.explain_cost(guarded.sql, guarded.params))
+                sql_query, params = guarded.sql, {**(params or {}), **guarded.params}
+                timeout_ms = self.sql_guard.statement_timeout_ms
             
             # Format response based on query type
-            sql_upper = sql_query.upper().strip()
+            sql_upper = str(sql_query).upper().strip()
+            
+            if sql_upper.startswith('SELECT'):
+                # Bounded fetch - never materialize a whole account's tasks
+                return self._fetch_and_format_rows(sql_query, entities, ai_msg, params, timeout_ms)
+            
+            statement = text(sql_query) if isinstance(sql_query, str) else sql_query
+            # RETURNING rows, or the number of affected rows
+            result = self.db.execute_statement(statement, params, statement_timeout_ms=timeout_ms)
+            affected = len(result) if isinstance(result, list) else result
             
             if sql_upper.startswith('INSERT'):
-                # For INSERT, we can't easily get the ID unless we use RETURNING
-                # But the AI might not generate RETURNING. 
-                # We'll just say task added.
+                # Compiled statements use RETURNING, so we can report the new ID.
+                # The AI might not generate RETURNING - then we just say task added.
+                if isinstance(result, list) and result:
+                    return f"{ai_msg}\n✓ Task added successfully (ID: {result[0][0]})"
                 return f"{ai_msg}\n✓ Task added successfully"
             
-            elif sql_upper.startswith('SELECT'):
-                # Fetch and format results
-                rows = result.fetchall()
-                
-                if not rows:
-                    return "No tasks found."
-                
-                # Format as a table
-                output = f"{ai_msg}\n\n"
-                output += "ID | Title | Status | Priority | Deadline | Created\n"
-                output += "-" * 70 + "\n"
-                
-                for row in rows:
-                    # SQLAlchemy rows are accessed by index or name
-                    task_id = row[0]
-                    title = row[1]
-                    status = row[2] if len(row) > 2 else 'pending'
-                    priority = row[3] if len(row) > 3 else 'medium'
-                    deadline = row[4] if len(row) > 4 else 'None'
-                    created = row[5] if len(row) > 5 else 'N/A'
-                    
-                    output += f"{task_id} | {title[:30]} | {status} | {priority} | {deadline} | {created}\n"
-                
-                return output
-            
             elif sql_upper.startswith('UPDATE'):
-                # Get number of updated rows
-                affected = result.rowcount
                 return f"{ai_msg}\n✓ {affected} task(s) updated successfully"
             
             elif sql_upper.startswith('DELETE'):
-                # Get number of deleted rows
-                affected = result.rowcount
                 return f"{ai_msg}\n✓ {affected} task(s) deleted successfully"
             
             else:
                 return f"{ai_msg}\n✓ Query executed successfully"
                 
+        except UnsafeSQLError as e:
+            logger.warning(f"Refused AI-generated SQL: {e}")
+            return f"❌ Refused to run the generated SQL: {e}"
         except Exception as e:
             logger.error(f"Unexpected error executing SQL: {e}")
             return f"❌ Error: {str(e)}"
 
+    def _fetch_and_format_rows(self, sql_query: Union[str, Executable], entities: Dict[str, Any], ai_msg: str,
+                               params: Optional[Dict[str, Any]] = None, timeout_ms: Optional[int] = None) -> str:
+        """
+        Fetch one page of a SELECT and format it as a table.
+        
+        Compiled list queries are keyset-paginated, so a truncated page leaves
+        a continuation token for the next one. AI-written SELECTs are simply
+        cut off after one page, and run read-only under a statement timeout.
+        """
+        page_size = self.query_builder.page_size
+        is_ai_sql = isinstance(sql_query, str)
+        rows = self.db.fetch_rows(sql_query, params, max_rows=page_size + 1,
+                                  read_only=is_ai_sql, statement_timeout_ms=timeout_ms)
+        
+        if not rows:
+            return "No tasks found."
+        
+        # Formatting is timed separately from the "db" step it runs in
+        with timed("format"):
+            has_more = len(rows) > page_size
+            rows = rows[:page_size]
+            
+            lines = [ai_msg, "", "ID | Title | Status | Priority | Deadline | Created", "-" * 70]
+            lines.extend(self._format_task_row(row) for row in rows)
+            
+            if has_more:
+                if is_ai_sql:
+                    lines.append(f"\nShowing the first {page_size} tasks.")
+                else:
+                    self.continuation_token = encode_continuation(entities, rows[-1][0])
+                    lines.append(f"\nShowing {page_size} tasks - ask for more to see the rest.")
+            
+            return "\n".join(lines)
+    
+    @staticmethod
+    def _format_task_row(row) -> str:
+        """One table line; SQLAlchemy rows are accessed by index."""
+        status = row[2] if len(row) > 2 else 'pending'
+        priority = row[3] if len(row) > 3 else 'medium'
+        deadline = row[4] if len(row) > 4 else 'None'
+        created = row[5] if len(row) > 5 else 'N/A'
+        return f"{row[0]} | {str(row[1])[:30]} | {status} | {priority} | {deadline} | {created}"
+
+    def _format_batch_result(self, batch: CompiledBatch, results: List[Any], ai_msg: str) -> str:
+        """One summary line per statement of an executed batch."""
+        lines = [ai_msg]
+        for query, result in zip(batch.queries, results):
+            if query.intent == "add_task":
+                ids = ", ".join(str(row[0]) for row in result)
+                lines.append(f"✓ {len(result)} task(s) added successfully (IDs: {ids})")
+            elif query.intent == "complete_task":
+                lines.append(f"✓ {result} task(s) updated successfully")
+            elif query.intent == "delete_task":
+                lines.append(f"✓ {result} task(s) deleted successfully")
+        return "\n".join(lines)
+
     def _handle_analytics(self, ai_msg: str) -> str:
         """Analytics is special - not a direct SQL operation"""
         tasks = self.db.get_tasks()
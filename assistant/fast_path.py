@@ -0,0 +1,181 @@
+"""Deterministic fast-path command recognizer for TaskJarvis.
+
+Common, unambiguous commands ("list my tasks", "delete task 3",
+"complete task 5", "show high priority tasks", "tasks for this week") are
+recognized with rules and compiled by the query builder, so they never
+reach the LLM. Anything the recognizer is not confident about falls
+through to the normal AI pipeline.
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+from assistant.time_parser import parse_time_range
+from utils.reminder_parser import extract_reminder_offset
+from taskjarvis_logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+PRIORITIES = ("low", "medium", "high")
+STATUSES = ("pending", "completed", "in progress")
+
+# "list my tasks", "show all tasks", "show me the high priority tasks"
+_LIST_PATTERN = re.compile(
+    r"^(?:please\s+)?(?:list|show|display|view|get)(?:\s+me)?(?:\s+all)?(?:\s+(?:my|the))?"
+    r"(?:\s+(?P<filter>low|medium|high|pending|completed|in progress))?"
+    r"(?:\s+priority)?\s+tasks?(?:\s+(?:for|due|from)?\s*(?P<period>.+))?$"
+)
+# "my tasks", "tasks for this week", "high priority tasks today"
+_BARE_LIST_PATTERN = re.compile(
+    r"^(?:my\s+|all\s+)?(?:(?P<filter>low|medium|high|pending|completed|in progress)(?:\s+priority)?\s+)?"
+    r"tasks?(?:\s+(?:for|due|from)?\s*(?P<period>.+))?$"
+)
+# Questions that always mean "list everything"
+_LIST_PHRASES = {"what do i need to do", "what are my tasks", "what is on my list", "what's on my list"}
+_DELETE_PATTERN = re.compile(r"^(?:please\s+)?(?:delete|remove)\s+task\s+#?(?P<id>\d+)$")
+_COMPLETE_PATTERN = re.compile(
+    r"^(?:please\s+)?(?:complete|finish|mark)\s+task\s+#?(?P<id>\d+)(?:\s+as\s+(?:done|complete|completed))?$"
+)
+_ADD_PATTERN = re.compile(r"^(?:please\s+)?(?:add|create|new)\s+(?:a\s+)?task(?:\s*:\s*|\s+)(?P<title>.+)$")
+
+# Reminder clauses stripped from a title once extract_reminder_offset has read them
+_REMINDER_CLAUSE = re.compile(
+    r"\s*(?:with\s+(?:a\s+)?|remind\s+me\s+)?\d+\s*(?:minute|hour)s?\s*(?:reminder|before)\s*"
+)
+# Words that mean a title carries scheduling details the LLM should resolve
+_AMBIGUOUS_TITLE_WORDS = re.compile(
+    r"\b(?:today|tomorrow|tonight|yesterday|at|by|on|before|after|next|every|daily|weekly|monthly|"
+    r"in\s+\d+|remind|deadline|due|priority|and)\b"
+)
+
+
+@dataclass
+class FastPathMatch:
+    """A command recognized without the LLM, in the same shape as a parsed intent."""
+
+    intent: str
+    entities: Dict[str, Any]
+    response: str
+
+
+class FastPathRecognizer:
+    """Rule-based recognizer that answers common commands without an LLM call."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def match(self, user_input: str) -> Optional[FastPathMatch]:
+        """
+        Try to recognize a command deterministically.
+
+        Args:
+            user_input: Raw user message
+
+        Returns:
+            FastPathMatch if the command was recognized confidently, None otherwise
+        """
+        text = self._normalize(user_input)
+        result = None
+
+        if text:
+            for matcher in (self._match_delete, self._match_complete, self._match_add, self._match_list):
+                result = matcher(text)
+                if result:
+                    break
+
+        self._record(result is not None)
+        if result:
+            logger.info(f"Fast path matched '{user_input[:100]}' → {result.intent} {result.entities}")
+        return result
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss counters and the share of traffic served without the LLM."""
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / total, 4) if total else 0.0,
+            }
+
+    # ============================================================
+    # MATCHERS
+    # ============================================================
+
+    def _match_delete(self, text: str) -> Optional[FastPathMatch]:
+        match = _DELETE_PATTERN.match(text)
+        if not match:
+            return None
+        task_id = int(match.group("id"))
+        return FastPathMatch(intent="delete_task", entities={"id": task_id}, response=f"Deleting task {task_id}.")
+
+    def _match_complete(self, text: str) -> Optional[FastPathMatch]:
+        match = _COMPLETE_PATTERN.match(text)
+        if not match:
+            return None
+        task_id = int(match.group("id"))
+        return FastPathMatch(
+            intent="complete_task", entities={"id": task_id}, response=f"Marking task {task_id} as completed."
+        )
+
+    def _match_add(self, text: str) -> Optional[FastPathMatch]:
+        match = _ADD_PATTERN.match(text)
+        if not match:
+            return None
+
+        title = match.group("title")
+        entities: Dict[str, Any] = {}
+
+        reminder_offset = extract_reminder_offset(title)
+        if reminder_offset is not None:
+            title = _REMINDER_CLAUSE.sub(" ", title).strip()
+            entities["reminder_offset"] = reminder_offset
+
+        # Deadlines, recurrence and multi-part requests need the LLM
+        if not title or _AMBIGUOUS_TITLE_WORDS.search(title):
+            return None
+
+        entities["title"] = title
+        return FastPathMatch(intent="add_task", entities=entities, response=f"I'll add '{title}' to your tasks.")
+
+    def _match_list(self, text: str) -> Optional[FastPathMatch]:
+        match = _LIST_PATTERN.match(text) or _BARE_LIST_PATTERN.match(text)
+        if not match and text not in _LIST_PHRASES:
+            return None
+
+        entities: Dict[str, Any] = {}
+
+        task_filter = match.group("filter") if match else None
+        if task_filter in PRIORITIES:
+            entities["priority"] = task_filter
+        elif task_filter in STATUSES:
+            entities["status"] = task_filter
+
+        period = match.group("period") if match else None
+        if period:
+            time_range = parse_time_range(period)
+            if not time_range:
+                # Unknown trailing words - not confident
+                return None
+            entities["time_range"] = time_range.to_dict()
+
+        return FastPathMatch(intent="list_tasks", entities=entities, response="Here are your tasks.")
+
+    # ============================================================
+    # HELPERS
+    # ============================================================
+
+    def _normalize(self, user_input: str) -> str:
+        """Lowercase, collapse whitespace and drop trailing punctuation."""
+        text = re.sub(r"\s+", " ", (user_input or "").lower()).strip()
+        return text.rstrip(".!?")
+
+    def _record(self, hit: bool):
+        with self._lock:
+            if hit:
+                self.hits += 1
+            else:
+                self.misses += 1
@@ -0,0 +1,141 @@
+"""Cold-start import benchmark for the CLI, the API worker and the assistant.
+
+Every CLI run and every uvicorn worker pays for its imports before doing any
+work. This measures them in fresh interpreters with ``python -X importtime``
+and fails when an entry point gets slower than its budget, or loads one of
+the heavy dependencies that are meant to be imported on first use only:
+
+    python -m assistant.import_time
+    python -m assistant.import_time --runs 10 --budget-ms 600 assistant.assistant
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Entry points measured by default, by name
+TARGETS: Dict[str, str] = {
+    "cli": "main",
+    "worker": "api.main",
+    "assistant": "assistant.assistant",
+}
+
+# Imported on first use; loading any of them at import time is a regression
+DEFERRED_MODULES: Tuple[str, ...] = ("openai", "matplotlib", "dateparser")
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class ImportProfile:
+    """Import cost of one module over several cold starts."""
+
+    module: str
+    import_ms: List[float] = field(default_factory=list)
+    wall_ms: List[float] = field(default_factory=list)
+    # Cumulative milliseconds of the module's direct imports, from the last run
+    children: List[Tuple[str, float]] = field(default_factory=list)
+    loaded: frozenset = frozenset()
+
+    @property
+    def median_ms(self) -> float:
+        return statistics.median(self.import_ms)
+
+    @property
+    def deferred_loaded(self) -> List[str]:
+        """Deferred modules that the import pulled in."""
+        return [name for name in DEFERRED_MODULES if name in self.loaded]
+
+
+def parse_importtime(output: str, module: str) -> Tuple[float, List[Tuple[str, float]], frozenset]:
+    """
+    Parse ``-X importtime`` output.
+
+    Returns:
+        (cumulative ms of ``module``, its direct imports with their cumulative ms, every module imported)
+    """
+    rows = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        depth = (len(name) - len(name.lstrip())) // 2
+        rows.append((depth, name.strip(), int(cumulative) / 1000))
+
+    total, children = 0.0, []
+    # importtime prints a module after its imports; a top-level entry closes the block above it
+    for i, (depth, name, ms) in enumerate(rows):
+        if depth == 0 and name == module:
+            total = ms
+            j = i - 1
+            while j >= 0 and rows[j][0] > 0:
+                if rows[j][0] == 1:
+                    children.append((rows[j][1], rows[j][2]))
+                j -= 1
+            break
+    return total, sorted(children, key=lambda child: child[1], reverse=True), frozenset(row[1] for row in rows)
+
+
+def measure(module: str, runs: int = 5, python: str = sys.executable) -> ImportProfile:
+    """Import ``module`` in ``runs`` fresh interpreters and collect the timings."""
+    profile = ImportProfile(module)
+    # The first, untimed run writes any missing bytecode caches, as a deployed install would have
+    for run in range(runs + 1):
+        start = time.perf_counter()
+        result = subprocess.run(
+            [python, "-X", "importtime", "-c", f"import {module}"],
+            cwd=PROJECT_ROOT, capture_output=True, text=True
+        )
+        wall = (time.perf_counter() - start) * 1000
+        if run == 0 and result.returncode == 0:
+            continue
+        if result.returncode != 0:
+            last_line = result.stderr.strip().splitlines()[-1:] or ["no output"]
+            raise RuntimeError(f"Importing {module} failed: {last_line[0]}")
+        import_ms, profile.children, profile.loaded = parse_importtime(result.stderr, module)
+        profile.import_ms.append(import_ms)
+        profile.wall_ms.append(wall)
+    return profile
+
+
+def report(profiles: Sequence[ImportProfile], budget_ms: Optional[float], top: int = 5) -> List[str]:
+    """Print a summary of each profile; returns the problems found."""
+    problems = []
+    for profile in profiles:
+        print(f"{profile.module}: import {profile.median_ms:.0f} ms median "
+              f"(min {min(profile.import_ms):.0f}, max {max(profile.import_ms):.0f}), "
+              f"process {statistics.median(profile.wall_ms):.0f} ms")
+        for name, ms in profile.children[:top]:
+            print(f"    {ms:8.1f} ms  {name}")
+        if budget_ms and profile.median_ms > budget_ms:
+            problems.append(f"{profile.module} imports in {profile.median_ms:.0f} ms (budget {budget_ms:.0f} ms)")
+        if profile.deferred_loaded:
+            problems.append(f"{profile.module} loads {', '.join(profile.deferred_loaded)} at import time")
+    return problems
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measure cold-start import time of TaskJarvis entry points.")
+    parser.add_argument("modules", nargs="*",
+                        help=f"Modules or target names ({', '.join(TARGETS)}); all targets by default")
+    parser.add_argument("--runs", type=int, default=5, help="Cold starts per module")
+    parser.add_argument("--budget-ms", type=float, default=0, help="Fail if a median import is slower (0: no budget)")
+    parser.add_argument("--top", type=int, default=5, help="Slowest direct imports shown per module")
+    args = parser.parse_args(argv)
+
+    modules = [TARGETS.get(name, name) for name in args.modules] or list(TARGETS.values())
+    problems = report([measure(module, args.runs) for module in modules], args.budget_ms, args.top)
+    for problem in problems:
+        print(f"FAIL: {problem}")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
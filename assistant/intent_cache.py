@@ -0,0 +1,158 @@
+"""LRU + TTL cache for LLM intent/entity extraction.
+
+Many users send identical phrasings ("show all tasks", "what do I need to
+do?"), and each one would otherwise pay a full LLM round trip. Parsed intent
+results are cached under the normalized input plus a coarse time bucket,
+because the intent prompt embeds the current time.
+
+Only the intent, entities, operations and response are cached - never SQL, which may
+embed a user's ID. Results carrying a deadline are not cached at all, since
+relative deadlines ("in 5 minutes") must be resolved against the current time.
+"""
+
+import copy
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional, Tuple
+from taskjarvis_logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+CACHED_FIELDS = ("intent", "entities", "response", "operations")
+
+
+def normalize_input(user_input: str) -> str:
+    """Lowercase, collapse whitespace and drop trailing punctuation."""
+    return re.sub(r"\s+", " ", (user_input or "").lower()).strip().rstrip(".!?")
+
+
+class IntentCache:
+    """Bounded, thread-safe intent cache with LRU eviction and per-entry TTL."""
+
+    def __init__(
+        self,
+        max_size: int = 1024,
+        ttl: float = 600.0,
+        bucket_seconds: int = 3600,
+        clock: Callable[[], float] = time.time
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            max_size: Maximum number of entries before LRU eviction
+            ttl: Seconds an entry stays valid
+            bucket_seconds: Width of the time bucket included in the key
+            clock: Time source (injectable for tests)
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.bucket_seconds = bucket_seconds
+        self._clock = clock
+        self._entries: "OrderedDict[Tuple[str, int], Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.bypassed = 0
+
+    def get(self, user_input: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached intent result.
+
+        Args:
+            user_input: Raw user message
+
+        Returns:
+            A copy of the cached intent dict, or None on a miss
+        """
+        key = self._make_key(user_input)
+        now = self._clock()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        logger.debug(f"Intent cache hit for: {user_input[:100]}")
+        return copy.deepcopy(value)
+
+    def put(self, user_input: str, parsed: Dict[str, Any]) -> bool:
+        """
+        Store a parsed intent result.
+
+        Args:
+            user_input: Raw user message
+            parsed: Parsed LLM response (intent, entities, response)
+
+        Returns:
+            True if the result was cached, False if it was bypassed
+        """
+        if not self._is_cacheable(parsed):
+            with self._lock:
+                self.bypassed += 1
+            return False
+
+        value = copy.deepcopy({field: parsed[field] for field in CACHED_FIELDS if field in parsed})
+        key = self._make_key(user_input)
+        expires_at = self._clock() + self.ttl
+
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+        return True
+
+    def clear(self):
+        """Drop all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """Return hit/miss/eviction counters and the current size."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "bypassed": self.bypassed,
+                "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+    # ============================================================
+    # HELPERS
+    # ============================================================
+
+    def _make_key(self, user_input: str) -> Tuple[str, int]:
+        """Normalized input plus the current coarse time bucket."""
+        bucket = int(self._clock() // self.bucket_seconds) if self.bucket_seconds else 0
+        return normalize_input(user_input), bucket
+
+    def _is_cacheable(self, parsed: Dict[str, Any]) -> bool:
+        """Skip results whose meaning depends on the exact current time."""
+        if not isinstance(parsed, dict) or not parsed.get("intent"):
+            return False
+        entity_sets = [parsed.get("entities") or {}]
+        entity_sets += [(op or {}).get("entities") or {} for op in parsed.get("operations") or []]
+        return not any(entities.get("deadline") for entities in entity_sets)
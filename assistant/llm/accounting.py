@@ -0,0 +1,250 @@
+"""Per-call accounting of LLM tokens, latency, retries and cost.
+
+The per-stage UsageTracker and the Prometheus counters only keep running
+totals, which cannot say which users or prompt types drive latency and
+spend. Provider clients add one CallRecord per logical call (all of its
+attempts) to the UsageLedger, tagged with the model, the llm_stage() and the
+llm_user() it was made for.
+
+Records are kept in a fixed-size ring buffer for recent-window summaries
+(with latency percentiles), and are folded into per-minute rollups keyed by
+model, stage and user. ``flush()`` hands the pending rollups to a sink - the
+scheduler writes them to the ``llm_usage_rollups`` table - so the buffer can
+stay small while the history is kept.
+"""
+
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+from taskjarvis_logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+# USD per million prompt / completion tokens; LLM_PRICES overrides or extends these
+DEFAULT_PRICES: Dict[str, Tuple[float, float]] = {
+    "anthropic/claude-3.5-sonnet": (3.0, 15.0),
+    "anthropic/claude-3-haiku": (0.25, 1.25),
+    "openai/gpt-4o": (2.5, 10.0),
+    "openai/gpt-4o-mini": (0.15, 0.6),
+    "google/gemini-flash-1.5": (0.075, 0.3),
+    "meta-llama/llama-3.1-70b-instruct": (0.4, 0.4),
+    "meta-llama/llama-3.1-8b-instruct": (0.05, 0.05),
+}
+
+GROUP_FIELDS = ("model", "stage", "user_id")
+
+
+class CallRecord:
+    """One logical LLM call; slotted to keep the ring buffer compact."""
+
+    __slots__ = ("ts", "model", "stage", "user_id", "prompt_tokens", "completion_tokens",
+                 "latency_ms", "attempts", "cost", "ok")
+
+    def __init__(self, ts: float, model: str, stage: str, user_id: Optional[int], prompt_tokens: int,
+                 completion_tokens: int, latency_ms: float, attempts: int, cost: float, ok: bool):
+        self.ts = ts
+        self.model = model
+        self.stage = stage
+        self.user_id = user_id
+        self.prompt_tokens = prompt_tokens
+        self.completion_tokens = completion_tokens
+        self.latency_ms = latency_ms
+        self.attempts = attempts
+        self.cost = cost
+        self.ok = ok
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int,
+                  prices: Dict[str, Tuple[float, float]]) -> float:
+    """USD cost of a call from per-million-token prices; 0.0 for models without a price."""
+    price = prices.get(model) or prices.get(model.split(":")[0])
+    if price is None or model.endswith(":free"):
+        return 0.0
+    return (prompt_tokens * price[0] + completion_tokens * price[1]) / 1_000_000
+
+
+def _new_totals() -> Dict[str, Any]:
+    return {"calls": 0, "errors": 0, "retries": 0, "prompt_tokens": 0, "completion_tokens": 0,
+            "cost_usd": 0.0, "latency_ms_sum": 0.0, "latency_ms_max": 0.0}
+
+
+def _add(totals: Dict[str, Any], record: CallRecord):
+    totals["calls"] += 1
+    totals["errors"] += 0 if record.ok else 1
+    totals["retries"] += max(0, record.attempts - 1)
+    totals["prompt_tokens"] += record.prompt_tokens
+    totals["completion_tokens"] += record.completion_tokens
+    totals["cost_usd"] += record.cost
+    totals["latency_ms_sum"] += record.latency_ms
+    totals["latency_ms_max"] = max(totals["latency_ms_max"], record.latency_ms)
+
+
+def check_group_by(group_by: Sequence[str]) -> Tuple[str, ...]:
+    unknown = [name for name in group_by if name not in GROUP_FIELDS]
+    if unknown:
+        raise ValueError(f"Cannot group LLM usage by {', '.join(unknown)}. Valid options: {', '.join(GROUP_FIELDS)}")
+    return tuple(group_by)
+
+
+class UsageLedger:
+    """Ring buffer of recent LLM calls plus per-minute rollups waiting to be flushed."""
+
+    def __init__(self, capacity: int = 10000, prices: Optional[Dict[str, Tuple[float, float]]] = None,
+                 bucket_seconds: int = 60):
+        """
+        Args:
+            capacity: Number of recent calls kept for summaries; older ones are dropped
+            prices: USD per million (prompt, completion) tokens per model; defaults to DEFAULT_PRICES
+            bucket_seconds: Width of the rollup time buckets
+        """
+        self.prices = dict(DEFAULT_PRICES if prices is None else prices)
+        self.bucket_seconds = bucket_seconds
+        self._records: Deque[CallRecord] = deque(maxlen=capacity)
+        self._pending: Dict[Tuple[float, str, str, Optional[int]], Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def set_prices(self, overrides: Dict[str, Sequence[float]]):
+        """Use DEFAULT_PRICES plus ``overrides`` (USD per million prompt, completion tokens per model)."""
+        self.prices = {**DEFAULT_PRICES, **{model: tuple(price) for model, price in overrides.items()}}
+
+    def record(self, model: str, stage: str, user_id: Optional[int], prompt_tokens: int, completion_tokens: int,
+               seconds: float, attempts: int = 1, ok: bool = True, cost: Optional[float] = None) -> CallRecord:
+        """
+        Add one call.
+
+        Args:
+            model: Model that answered
+            stage: Pipeline stage the call was made for
+            user_id: User the call was made for, if known
+            prompt_tokens: Prompt tokens reported by the provider
+            completion_tokens: Completion tokens reported by the provider
+            seconds: Latency across all attempts
+            attempts: Number of attempts made
+            ok: Whether the call returned a completion
+            cost: USD cost reported by the provider; estimated from ``prices`` if None
+        """
+        prompt_tokens, completion_tokens = prompt_tokens or 0, completion_tokens or 0
+        if cost is None:
+            cost = estimate_cost(model, prompt_tokens, completion_tokens, self.prices)
+        record = CallRecord(time.time(), model, stage, user_id, prompt_tokens, completion_tokens,
+                            seconds * 1000, attempts, cost, ok)
+        bucket = record.ts - record.ts % self.bucket_seconds
+        with self._lock:
+            self._records.append(record)
+            _add(self._pending.setdefault((bucket, model, stage, user_id), _new_totals()), record)
+        return record
+
+    def recent(self, since: Optional[float] = None) -> List[CallRecord]:
+        """Buffered calls, oldest first; only those at or after the ``since`` timestamp if given."""
+        with self._lock:
+            records = list(self._records)
+        return [record for record in records if since is None or record.ts >= since]
+
+    def summarize(self, group_by: Sequence[str] = ("model",), since: Optional[float] = None) -> List[Dict[str, Any]]:
+        """
+        Totals of the buffered calls per group, most expensive first.
+
+        Args:
+            group_by: Any of "model", "stage" and "user_id"
+            since: Only calls at or after this timestamp
+
+        Returns:
+            One dict per group with its key fields, totals, average and p95 latency
+        """
+        group_by = check_group_by(group_by)
+        groups: Dict[Tuple, Dict[str, Any]] = {}
+        latencies: Dict[Tuple, List[float]] = {}
+        for record in self.recent(since):
+            key = tuple(getattr(record, name) for name in group_by)
+            _add(groups.setdefault(key, _new_totals()), record)
+            latencies.setdefault(key, []).append(record.latency_ms)
+
+        rows = []
+        for key, totals in groups.items():
+            ordered = sorted(latencies[key])
+            rows.append({
+                **dict(zip(group_by, key)),
+                **summary_row(totals),
+                "p95_latency_ms": round(ordered[min(len(ordered) - 1, int(0.95 * len(ordered)))], 1),
+            })
+        return sorted(rows, key=lambda row: row["cost_usd"], reverse=True)
+
+    def drain(self) -> List[Dict[str, Any]]:
+        """Take the pending rollups: one row per time bucket, model, stage and user."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        return [
+            {"bucket_start": datetime.utcfromtimestamp(bucket), "model": model, "stage": stage,
+             "user_id": user_id, **totals}
+            for (bucket, model, stage, user_id), totals in pending.items()
+        ]
+
+    def restore(self, rows: Iterable[Dict[str, Any]]):
+        """Put drained rollups back, e.g. after the sink failed to store them."""
+        with self._lock:
+            for row in rows:
+                bucket = (row["bucket_start"] - datetime(1970, 1, 1)).total_seconds()
+                totals = self._pending.setdefault((bucket, row["model"], row["stage"], row["user_id"]), _new_totals())
+                for name in totals:
+                    if name == "latency_ms_max":
+                        totals[name] = max(totals[name], row[name])
+                    else:
+                        totals[name] += row[name]
+
+    def flush(self, sink: Callable[[List[Dict[str, Any]]], None]) -> int:
+        """
+        Hand the pending rollups to ``sink``; they are kept for the next flush if it raises.
+
+        Returns:
+            Number of rollup rows flushed
+        """
+        rows = self.drain()
+        if not rows:
+            return 0
+        try:
+            sink(rows)
+        except Exception:
+            self.restore(rows)
+            raise
+        logger.debug(f"Flushed {len(rows)} LLM usage rollups")
+        return len(rows)
+
+    def stats(self) -> Dict[str, Any]:
+        """Buffer occupancy and per-model totals of the buffered calls."""
+        with self._lock:
+            buffered, pending = len(self._records), len(self._pending)
+        return {
+            "buffered_calls": buffered,
+            "capacity": self._records.maxlen,
+            "pending_rollups": pending,
+            "models": self.summarize(("model",)),
+        }
+
+    def reset(self):
+        """Forget buffered calls and pending rollups."""
+        with self._lock:
+            self._records.clear()
+            self._pending.clear()
+
+
+def summary_row(totals: Dict[str, Any]) -> Dict[str, Any]:
+    """Rounded totals plus average latency, from raw rollup sums."""
+    calls = totals["calls"]
+    return {
+        "calls": calls,
+        "errors": totals["errors"],
+        "retries": totals["retries"],
+        "prompt_tokens": totals["prompt_tokens"],
+        "completion_tokens": totals["completion_tokens"],
+        "cost_usd": round(totals["cost_usd"], 6),
+        "avg_latency_ms": round(totals["latency_ms_sum"] / calls, 1) if calls else 0.0,
+        "max_latency_ms": round(totals["latency_ms_max"], 1),
+    }
+
+
+llm_ledger = UsageLedger()
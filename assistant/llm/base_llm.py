@@ -1,7 +1,12 @@
 """Base class for all LLM clients."""
 
+import asyncio
+import contextvars
+import functools
 from abc import ABC, abstractmethod
-from typing import Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence
+from assistant.llm.structured import ResponseSchema, StructuredResponse
 
 class BaseLLMClient(ABC):
     """
@@ -38,6 +43,25 @@ class BaseLLMClient(ABC):
         """Return the default model name for this provider."""
         pass
     
+    def swap_model(self, model_name: Optional[str]):
+        """
+        Switch the model used by subsequent calls.
+        
+        Calls already in flight finish on the model they started with.
+        
+        Args:
+            model_name: New model name; None selects the provider default
+        """
+        self._model_name = model_name
+    
+    def prewarm(self):
+        """Open connections ahead of the first request; a no-op for providers without a network transport."""
+        pass
+    
+    async def aprewarm(self):
+        """Async variant of prewarm(), warming the connections async calls on the running loop use."""
+        pass
+    
     @abstractmethod
     def generate(self, prompt: str) -> str:
         """
@@ -57,5 +81,116 @@ class BaseLLMClient(ABC):
         """
         pass
     
+    async def agenerate(self, prompt: str, **kwargs) -> str:
+        """
+        Async variant of generate.
+        
+        The default implementation runs generate in a worker thread; providers
+        with a native async API should override it so no thread is held while
+        waiting on the LLM.
+        
+        Args:
+            prompt: The input prompt to send to the LLM
+            **kwargs: Provider-specific generation parameters
+            
+        Returns:
+            The generated response as a string
+        """
+        return await asyncio.to_thread(functools.partial(self.generate, prompt, **kwargs))
+    
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """
+        Stream a response as text chunks.
+        
+        The default implementation yields the whole agenerate result as a
+        single chunk; providers with a streaming API should override it.
+        
+        Args:
+            prompt: The input prompt to send to the LLM
+            **kwargs: Provider-specific generation parameters
+            
+        Yields:
+            Pieces of the generated response, in order
+        """
+        yield await self.agenerate(prompt, **kwargs)
+    
+    def response_format_params(self, schema: ResponseSchema) -> Dict[str, Any]:
+        """
+        Extra generation parameters that make the provider answer with JSON
+        matching ``schema``.
+        
+        The default is no parameters (the prompt alone asks for JSON);
+        providers with a JSON mode / response_format API should override it.
+        """
+        return {}
+    
+    def generate_structured(self, prompt: str, schema: ResponseSchema, **kwargs) -> StructuredResponse:
+        """
+        Generate a JSON response and validate it against a schema.
+        
+        Args:
+            prompt: The input prompt to send to the LLM
+            schema: Expected shape of the response object
+            **kwargs: Provider-specific generation parameters
+            
+        Returns:
+            The validated response
+            
+        Raises:
+            LLMInvalidResponseError: If the output does not match the schema
+        """
+        raw = self.generate(prompt, **self.response_format_params(schema), **kwargs)
+        return schema.parse(raw)
+    
+    async def agenerate_structured(self, prompt: str, schema: ResponseSchema, **kwargs) -> StructuredResponse:
+        """Async variant of generate_structured."""
+        raw = await self.agenerate(prompt, **self.response_format_params(schema), **kwargs)
+        return schema.parse(raw)
+    
+    def generate_many(self, prompts: Sequence[str], concurrency: int = 8,
+                      schema: Optional[ResponseSchema] = None, **kwargs) -> List[Any]:
+        """
+        Generate completions for many prompts, up to ``concurrency`` at a time.
+        
+        One failing prompt does not affect the others: its slot in the result
+        holds the exception it raised instead of a completion.
+        
+        Args:
+            prompts: Input prompts
+            concurrency: Maximum number of calls in flight
+            schema: If given, each completion is validated into a StructuredResponse
+            **kwargs: Provider-specific generation parameters
+            
+        Returns:
+            One completion (or StructuredResponse, or exception) per prompt, in prompt order
+        """
+        def one(prompt: str) -> Any:
+            try:
+                if schema is not None:
+                    return self.generate_structured(prompt, schema, **kwargs)
+                return self.generate(prompt, **kwargs)
+            except Exception as e:
+                return e
+        
+        if not prompts:
+            return []
+        with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(prompts)))) as pool:
+            # Each call runs in a copy of the caller's context so llm_stage() and llm_user() carry over
+            futures = [pool.submit(contextvars.copy_context().run, one, prompt) for prompt in prompts]
+            return [future.result() for future in futures]
+    
+    async def agenerate_many(self, prompts: Sequence[str], concurrency: int = 8,
+                             schema: Optional[ResponseSchema] = None, **kwargs) -> List[Any]:
+        """Async variant of generate_many."""
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+        
+        async def one(prompt: str) -> Any:
+            async with semaphore:
+                if schema is not None:
+                    return await self.agenerate_structured(prompt, schema, **kwargs)
+                return await self.agenerate(prompt, **kwargs)
+        
+        return await asyncio.gather(*(one(prompt) for prompt in prompts), return_exceptions=True)
+    
     def __repr__(self) -> str:
         return f"{self.__class__.__name__}(provider={self.provider_name}, model={self.model_name})"
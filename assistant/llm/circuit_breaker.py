@@ -0,0 +1,139 @@
+"""Circuit breaker for LLM provider calls.
+
+During a provider outage every call would otherwise spend its whole retry
+budget before failing, holding the request (and a worker) for a minute or
+more. The breaker watches the outcome of recent calls and, once too many of
+them failed or were too slow, opens: calls fail immediately with
+LLMCircuitOpenError and the assistant answers from its deterministic paths
+(fast path, intent cache, compiled queries) instead. After a cool-down it
+half-opens and lets a single probe call through; the probe's outcome closes
+the breaker again or re-opens it for another cool-down. The probe is
+identified by the ticket before_call() hands it, so only that call can
+settle or release the half-open slot.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict
+from assistant.llm.errors import LLMCircuitOpenError
+from taskjarvis_logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """Trips on the error or slow-call rate over a sliding window of recent calls."""
+
+    def __init__(self, failure_rate: float = 0.5, slow_call_seconds: float = 20.0, window: int = 20,
+                 min_calls: int = 5, open_seconds: float = 30.0, name: str = "llm"):
+        """
+        Args:
+            failure_rate: Share of failed or slow calls in the window that trips the breaker
+            slow_call_seconds: Calls taking longer than this count as bad; 0 disables
+            window: Number of recent calls considered
+            min_calls: Calls needed in the window before the breaker may trip
+            open_seconds: Cool-down before a probe call is let through
+            name: Name used in logs and errors
+        """
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.min_calls = min_calls
+        self.open_seconds = open_seconds
+        self.name = name
+        self.state = CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._opened_at = 0.0
+        # Ticket of the probe in flight (0: none), and the last ticket handed out
+        self._probe = 0
+        self._tickets = 0
+        self._lock = threading.Lock()
+
+    def before_call(self) -> int:
+        """
+        Admit a call or fail fast.
+
+        Returns:
+            The probe ticket if this call is the half-open probe, else 0;
+            pass it on to record_success(), record_failure() or abandon()
+
+        Raises:
+            LLMCircuitOpenError: While the breaker is open, or half-open with a probe in flight
+        """
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self._opened_at + self.open_seconds - time.monotonic()
+                if remaining > 0:
+                    raise LLMCircuitOpenError(f"{self.name} circuit open; retrying in {remaining:.0f}s")
+                self._transition(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._probe:
+                    raise LLMCircuitOpenError(f"{self.name} circuit half-open; probe in flight")
+                self._tickets += 1
+                self._probe = self._tickets
+                return self._probe
+            return 0
+
+    def record_success(self, seconds: float, ticket: int = 0):
+        """Record a call that completed in ``seconds``; a slow success counts against the provider."""
+        slow = self.slow_call_seconds > 0 and seconds > self.slow_call_seconds
+        self._record(ok=not slow, ticket=ticket)
+
+    def record_failure(self, ticket: int = 0):
+        """Record a call that failed after all of its retries."""
+        self._record(ok=False, ticket=ticket)
+
+    def abandon(self, ticket: int = 0):
+        """Release the probe slot if the call holding ``ticket`` ended without an outcome (e.g. it was cancelled)."""
+        with self._lock:
+            if ticket and ticket == self._probe:
+                self._probe = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Current state and the share of bad calls in the window."""
+        with self._lock:
+            calls = len(self._outcomes)
+            return {
+                "state": self.state,
+                "calls": calls,
+                "failure_rate": round(self._outcomes.count(False) / calls, 3) if calls else 0.0,
+            }
+
+    def reset(self):
+        """Close the breaker and forget recent calls."""
+        with self._lock:
+            self._outcomes.clear()
+            self._probe = 0
+            self.state = CLOSED
+
+    def _record(self, ok: bool, ticket: int):
+        with self._lock:
+            if self.state == HALF_OPEN and ticket and ticket == self._probe:
+                self._probe = 0
+                if ok:
+                    self._outcomes.clear()
+                    self._transition(CLOSED)
+                else:
+                    self._open()
+                return
+            if self.state != CLOSED:
+                # Calls admitted before the breaker opened finishing late
+                return
+            self._outcomes.append(ok)
+            calls = len(self._outcomes)
+            if calls >= self.min_calls and self._outcomes.count(False) / calls >= self.failure_rate:
+                self._open()
+
+    def _open(self):
+        self._opened_at = time.monotonic()
+        self._outcomes.clear()
+        self._transition(OPEN)
+
+    def _transition(self, state: str):
+        if state != self.state:
+            logger.warning(f"{self.name} circuit breaker: {self.state} -> {state}")
+        self.state = state
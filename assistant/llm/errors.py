@@ -8,6 +8,10 @@ class LLMRateLimitError(LLMError):
     """Raised when the LLM provider rate limit is exceeded."""
     pass
 
+class LLMClientRateLimitError(LLMRateLimitError):
+    """Raised by the client-side rate limiter; no request was sent."""
+    pass
+
 class LLMAuthError(LLMError):
     """Raised when authentication with the LLM provider fails."""
     pass
@@ -19,3 +23,11 @@ class LLMConnectionError(LLMError):
 class LLMInvalidResponseError(LLMError):
     """Raised when the LLM returns an invalid or unexpected response."""
     pass
+
+class LLMCircuitOpenError(LLMError):
+    """Raised without calling the provider while its circuit breaker is open."""
+    pass
+
+class LLMCacheMissError(LLMError):
+    """Raised in replay mode when no completion was recorded for a prompt."""
+    pass
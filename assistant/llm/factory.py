@@ -1,24 +1,94 @@
-"""Factory for creating LLM clients - OpenRouter unified implementation."""
+"""Factory for creating LLM clients from a registry of provider plugins.
 
-import os
-from typing import Optional
+Providers are registered by import path and only imported when a client for
+them is first created, so importing the factory does not pull in any
+provider SDK. Packages can add providers through the
+``taskjarvis.llm_providers`` entry point group (``NAME = "module:Class"``);
+entry points are only scanned for names that are not registered.
+"""
+
+import importlib
+import inspect
+import threading
+from importlib.metadata import entry_points
+from typing import Dict, List, Optional, Type, Union
 from assistant.llm.base_llm import BaseLLMClient
 from assistant.llm.errors import LLMError
-from assistant.llm.mock_llm import MockLLMClient
+from assistant.llm.response_cache import CachingLLMClient, ResponseCache
+from assistant.llm.routing import ModelRouter, Route
+from taskjarvis_logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+ENTRY_POINT_GROUP = "taskjarvis.llm_providers"
+
+# Provider name -> "module:ClassName", or the class once it has been imported
+_providers: Dict[str, Union[str, Type[BaseLLMClient]]] = {
+    "OPENROUTER": "assistant.llm.openrouter_llm:OpenRouterLLMClient",
+    "MOCK": "assistant.llm.mock_llm:MockLLMClient",
+}
+_providers_lock = threading.Lock()
+
+# Response caches by file path, shared by every client the factory wraps
+_caches: Dict[str, ResponseCache] = {}
+_caches_lock = threading.Lock()
+
 
 class LLMFactory:
     """Factory class for creating LLM client instances."""
     
+    @staticmethod
+    def register(name: str, target: Union[str, Type[BaseLLMClient]]):
+        """
+        Register (or replace) a provider.
+        
+        Args:
+            name: Provider name, case-insensitive (e.g. "OPENROUTER")
+            target: The client class, or its "module:ClassName" path to import on first use
+        """
+        with _providers_lock:
+            _providers[name.upper()] = target
+    
+    @staticmethod
+    def providers() -> List[str]:
+        """Names of the registered providers."""
+        with _providers_lock:
+            return list(_providers)
+    
+    @staticmethod
+    def provider_class(name: str) -> Type[BaseLLMClient]:
+        """
+        The client class of a provider, importing its module on first use.
+        
+        Raises:
+            LLMError: If no such provider is registered or installed
+        """
+        name = name.upper()
+        with _providers_lock:
+            target = _providers.get(name)
+        if target is None:
+            target = _find_entry_point(name)
+            if target is None:
+                raise LLMError(f"Unknown provider: {name}. Valid options: {', '.join(LLMFactory.providers())}")
+        if isinstance(target, str):
+            module_name, _, class_name = target.partition(":")
+            target = getattr(importlib.import_module(module_name), class_name)
+            with _providers_lock:
+                _providers[name] = target
+        return target
+    
     @staticmethod
     def create(provider: str, api_key: Optional[str] = None, model_name: Optional[str] = None, **kwargs) -> BaseLLMClient:
         """
         Create an LLM client based on the provider name.
         
         Args:
-            provider: Name of the LLM provider (OPENROUTER, MOCK)
+            provider: Name of a registered provider (OPENROUTER, MOCK, ...)
             api_key: API key for the provider (optional, will try to get from env)
             model_name: Model name to use (optional, uses provider default)
-            **kwargs: Additional provider-specific arguments
+            **kwargs: Constructor arguments of the provider's client (unsupported ones
+                are ignored); ``cache_mode`` ("record" or "replay") with ``cache_path``
+                wraps the client in an on-disk response cache
             
         Returns:
             An instance of BaseLLMClient
@@ -28,26 +98,19 @@ class LLMFactory:
         """
         provider = provider.upper()
         
-        # Try to get API key from environment if not provided
-        if not api_key and provider == "OPENROUTER":
-            api_key = os.getenv("OPENROUTER_API_KEY")
-        
         try:
-            if provider == "OPENROUTER":
-                from assistant.llm.openrouter_llm import OpenRouterLLMClient
-                return OpenRouterLLMClient(
-                    api_key=api_key, 
-                    model_name=model_name,
-                    max_retries=kwargs.get("max_retries", 3),
-                    retry_delay=kwargs.get("retry_delay", 1.0),
-                    timeout=kwargs.get("timeout", 60)
-                )
-            
-            elif provider == "MOCK":
-                return MockLLMClient(api_key=api_key, model_name=model_name)
+            client_class = LLMFactory.provider_class(provider)
+            # Each provider takes the subset of options its constructor knows
+            accepted = inspect.signature(client_class.__init__).parameters
+            options = {key: value for key, value in kwargs.items() if key in accepted}
+            client = client_class(api_key=api_key, model_name=model_name, **options)
             
-            else:
-                raise LLMError(f"Unknown provider: {provider}. Valid options: OPENROUTER, MOCK")
+            cache_mode = kwargs.get("cache_mode", "passthrough")
+            if cache_mode.lower() == "passthrough":
+                return client
+            return LLMFactory.wrap_with_cache(
+                client, kwargs["cache_path"], mode=cache_mode, max_mb=kwargs.get("cache_max_mb", 100)
+            )
         
         except LLMError:
             # Re-raise LLM errors as-is
@@ -56,6 +119,52 @@ class LLMFactory:
             # Wrap other exceptions
             raise LLMError(f"Failed to create {provider} client: {e}")
     
+    @staticmethod
+    def wrap_with_cache(client: BaseLLMClient, path: str, mode: str = "record", max_mb: float = 100) -> BaseLLMClient:
+        """
+        Wrap a client in a persistent response cache.
+        
+        Args:
+            client: Any LLM client
+            path: SQLite cache file; clients using the same path share one cache
+            mode: "record", "replay" or "passthrough"
+            max_mb: Size cap in megabytes before least recently used entries are evicted
+            
+        Returns:
+            A CachingLLMClient around ``client``
+        """
+        with _caches_lock:
+            cache = _caches.get(path)
+            if cache is None:
+                cache = _caches[path] = ResponseCache(path, max_bytes=int(max_mb * 1024 * 1024))
+        return CachingLLMClient(client, cache, mode=mode)
+    
+    @staticmethod
+    def create_router(
+        stage_models: Dict[str, Optional[str]],
+        backup_models: Optional[Dict[str, Optional[str]]] = None,
+        p95_budget_ms: float = 0
+    ) -> Optional[ModelRouter]:
+        """
+        Build a per-stage model router.
+        
+        Args:
+            stage_models: Model per stage name; empty values leave the stage on the client's model
+            backup_models: Model per stage used while the stage's model is over budget
+            p95_budget_ms: Rolling p95 latency budget in milliseconds (0 disables failover)
+            
+        Returns:
+            A ModelRouter, or None if no stage has a model of its own
+        """
+        backup_models = backup_models or {}
+        routes = {
+            stage: Route(model, backup_models.get(stage) or None)
+            for stage, model in stage_models.items() if model
+        }
+        if not routes:
+            return None
+        return ModelRouter(routes, p95_budget=p95_budget_ms / 1000)
+    
     @staticmethod
     def create_with_fallback(provider: str, fallback_provider: str = "MOCK", **kwargs) -> BaseLLMClient:
         """
@@ -71,11 +180,23 @@ class LLMFactory:
         """
         try:
             client = LLMFactory.create(provider, **kwargs)
-            print(f"✅ AI Assistant: Online ({client.provider_name} - {client.model_name})")
+            logger.info(f"AI Assistant online ({client.provider_name} - {client.model_name})")
             return client
         except Exception as e:
-            print(f"⚠️  Warning: Failed to initialize {provider}: {e}")
-            print(f"🔄 Falling back to {fallback_provider}")
+            logger.warning(f"Failed to initialize {provider}: {e}; falling back to {fallback_provider}")
             client = LLMFactory.create(fallback_provider, **kwargs)
-            print(f"🤖 AI Assistant: Offline Mode ({client.provider_name})")
+            logger.warning(f"AI Assistant in offline mode ({client.provider_name})")
             return client
+
+
+def _find_entry_point(name: str) -> Optional[str]:
+    """Import path of an installed provider plugin called ``name``, registering it if found."""
+    try:
+        candidates = entry_points(group=ENTRY_POINT_GROUP)
+    except TypeError:  # Python < 3.10
+        candidates = entry_points().get(ENTRY_POINT_GROUP, [])
+    for entry_point in candidates:
+        if entry_point.name.upper() == name:
+            LLMFactory.register(name, entry_point.value)
+            return entry_point.value
+    return None
@@ -0,0 +1,277 @@
+"""Local OpenAI-compatible stand-in for the OpenRouter API.
+
+MockLLMClient answers in-process, so it never exercises the HTTP path of
+OpenRouterLLMClient: the shared transport, retries, timeouts and streaming.
+This server speaks the chat completions protocol (plain and SSE streaming)
+and replays canned responses, with configurable latency and injected 429 /
+5xx failures, so the whole assistant can be load-tested end-to-end without
+network access:
+
+    python -m assistant.llm.fake_server --port 8900 --latency lognormal:0.4,0.5 --rate-limit-rate 0.05
+    OPENROUTER_BASE_URL=http://127.0.0.1:8900/api/v1 OPENROUTER_API_KEY=fake uvicorn api.main:app
+
+Canned responses are rules tried in order; the first whose ``match`` regex
+is found in the last user message (and whose ``schema``, if given, is the
+requested response_format schema name) supplies the completion. A JSON file
+of rules can be passed with ``--responses``:
+
+    [{"match": "weather", "content": {"intent": "unknown", "response": "No idea!"}},
+     {"schema": "sql", "content": {"sql": "SELECT * FROM tasks WHERE user_id = 1"}}]
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import random
+import re
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+try:
+    import uvicorn
+    from fastapi import FastAPI, Request
+    from fastapi.responses import JSONResponse, StreamingResponse
+    FASTAPI_AVAILABLE = True
+except ImportError:
+    FASTAPI_AVAILABLE = False
+
+# Fallback replies per response_format schema name; without a schema the plain text is used
+DEFAULT_RESPONSES: Dict[Optional[str], Any] = {
+    # A core intent with no SQL: the assistant compiles the query itself and hits the database
+    "intent": {"intent": "list_tasks", "entities": {}, "response": "Here are your tasks."},
+    "intent_with_sql": {"intent": "list_tasks", "entities": {}, "response": "Here are your tasks.", "sql": None},
+    "sql": {"sql": "SELECT id, title FROM tasks LIMIT 10"},
+    None: "This is a canned reply from the local LLM stand-in.",
+}
+
+
+class LatencyModel:
+    """Per-request latency distribution in seconds."""
+
+    def __init__(self, kind: str = "fixed", params: Sequence[float] = (0.0,)):
+        """
+        Args:
+            kind: "fixed" (seconds), "uniform" (low, high) or "lognormal" (median, sigma)
+            params: Parameters of the distribution
+        """
+        if kind not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {kind}")
+        self.kind = kind
+        self.params = tuple(params)
+
+    @classmethod
+    def parse(cls, spec: str) -> "LatencyModel":
+        """Parse a spec such as ``"0.2"``, ``"uniform:0.1,0.5"`` or ``"lognormal:0.4,0.5"``."""
+        kind, _, args = spec.partition(":") if ":" in spec else ("fixed", "", spec)
+        return cls(kind, [float(arg) for arg in args.split(",")])
+
+    def sample(self, rng: random.Random) -> float:
+        if self.kind == "uniform":
+            return rng.uniform(*self.params)
+        if self.kind == "lognormal":
+            median, sigma = self.params
+            return rng.lognormvariate(math.log(median), sigma)
+        return self.params[0]
+
+
+@dataclass
+class FaultProfile:
+    """Injected failures: shares of requests answered with 429 or a 5xx status."""
+
+    rate_limit_rate: float = 0.0
+    server_error_rate: float = 0.0
+    retry_after: Optional[float] = 1.0
+
+    def pick(self, rng: random.Random) -> Optional[int]:
+        """Status code to fail this request with, or None to answer normally."""
+        roll = rng.random()
+        if roll < self.rate_limit_rate:
+            return 429
+        if roll < self.rate_limit_rate + self.server_error_rate:
+            return rng.choice((500, 502, 503))
+        return None
+
+
+class CannedResponses:
+    """Ordered response rules with per-schema defaults."""
+
+    def __init__(self, rules: Optional[List[Dict[str, Any]]] = None):
+        self.rules = [
+            {**rule, "pattern": re.compile(rule["match"], re.IGNORECASE) if rule.get("match") else None}
+            for rule in rules or []
+        ]
+
+    @classmethod
+    def load(cls, path: str) -> "CannedResponses":
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f))
+
+    def reply(self, user_message: str, schema_name: Optional[str]) -> str:
+        """Completion text for a request."""
+        for rule in self.rules:
+            if rule.get("schema") and rule["schema"] != schema_name:
+                continue
+            if rule["pattern"] and not rule["pattern"].search(user_message):
+                continue
+            return _as_text(rule["content"])
+        return _as_text(DEFAULT_RESPONSES.get(schema_name, DEFAULT_RESPONSES[None]))
+
+
+def _as_text(content: Any) -> str:
+    return content if isinstance(content, str) else json.dumps(content)
+
+
+def create_app(responses: Optional[CannedResponses] = None, latency: Optional[LatencyModel] = None,
+               faults: Optional[FaultProfile] = None, chunk_size: int = 8, seed: Optional[int] = None) -> "FastAPI":
+    """
+    Build the stand-in server.
+
+    Args:
+        responses: Canned response rules (defaults only if omitted)
+        latency: Time to first byte of each answer; streams spread it across chunks
+        faults: Share of requests failed with 429 / 5xx
+        chunk_size: Characters per streamed chunk
+        seed: Seed for latency and fault sampling, for reproducible runs
+
+    Returns:
+        A FastAPI app serving ``/api/v1/chat/completions`` and ``/api/v1/models``
+    """
+    responses = responses or CannedResponses()
+    latency = latency or LatencyModel()
+    faults = faults or FaultProfile()
+    rng = random.Random(seed)
+    counts = {"requests": 0, "rate_limited": 0, "server_errors": 0}
+    app = FastAPI(title="TaskJarvis LLM stand-in")
+
+    @app.api_route("/api/v1/models", methods=["GET", "HEAD"])
+    def models():
+        return {"data": [{"id": "fake/model", "object": "model"}]}
+
+    @app.get("/stats")
+    def stats():
+        return counts
+
+    @app.post("/api/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        counts["requests"] += 1
+        delay = latency.sample(rng)
+
+        status = faults.pick(rng)
+        if status is not None:
+            await asyncio.sleep(delay)
+            counts["rate_limited" if status == 429 else "server_errors"] += 1
+            headers = {"retry-after": f"{faults.retry_after:g}"} if status == 429 and faults.retry_after is not None else {}
+            return JSONResponse({"error": {"message": f"Injected {status}", "code": status}},
+                                status_code=status, headers=headers)
+
+        model = body.get("model", "fake/model")
+        schema = ((body.get("response_format") or {}).get("json_schema") or {}).get("name")
+        content = responses.reply(_last_user_message(body.get("messages", [])), schema)
+        usage = {
+            "prompt_tokens": len(json.dumps(body.get("messages", []))) // 4,
+            "completion_tokens": max(1, len(content) // 4),
+        }
+        usage["total_tokens"] = usage["prompt_tokens"] + usage["completion_tokens"]
+
+        if body.get("stream"):
+            return StreamingResponse(
+                _stream(model, content, usage, delay, chunk_size), media_type="text/event-stream"
+            )
+        await asyncio.sleep(delay)
+        return {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": usage,
+        }
+
+    return app
+
+
+async def _stream(model: str, content: str, usage: Dict[str, int], delay: float, chunk_size: int):
+    """SSE chunks in the OpenAI streaming format; half the latency before the first chunk."""
+    chunk_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+    pieces = [content[i:i + chunk_size] for i in range(0, len(content), chunk_size)] or [""]
+
+    def event(choices: List[Dict[str, Any]], **extra) -> str:
+        payload = {"id": chunk_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                   "model": model, "choices": choices, **extra}
+        return f"data: {json.dumps(payload)}\n\n"
+
+    await asyncio.sleep(delay / 2)
+    for piece in pieces:
+        yield event([{"index": 0, "delta": {"content": piece}, "finish_reason": None}])
+        await asyncio.sleep(delay / 2 / len(pieces))
+    yield event([{"index": 0, "delta": {}, "finish_reason": "stop"}])
+    yield event([], usage=usage)
+    yield "data: [DONE]\n\n"
+
+
+def _last_user_message(messages: List[Dict[str, Any]]) -> str:
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            content = message.get("content")
+            if isinstance(content, list):
+                return " ".join(part.get("text", "") for part in content if isinstance(part, dict))
+            return content or ""
+    return ""
+
+
+@contextmanager
+def serve_in_background(app: "FastAPI", host: str = "127.0.0.1", port: int = 0) -> Iterator[str]:
+    """
+    Run the app on a background thread for the duration of the block.
+
+    Yields:
+        The OpenAI-compatible base URL (``http://host:port/api/v1``)
+    """
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError("LLM stand-in server failed to start")
+        time.sleep(0.01)
+    bound_port = server.servers[0].sockets[0].getsockname()[1]
+    try:
+        yield f"http://{host}:{bound_port}/api/v1"
+    finally:
+        server.should_exit = True
+        thread.join(timeout=5)
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Local OpenAI-compatible LLM stand-in for load tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900)
+    parser.add_argument("--responses", help="JSON file of canned response rules")
+    parser.add_argument("--latency", default="0", help='"0.2", "uniform:0.1,0.5" or "lognormal:median,sigma"')
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--server-error-rate", type=float, default=0.0, help="Share of requests answered with 5xx")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After seconds sent with 429s")
+    parser.add_argument("--chunk-size", type=int, default=8, help="Characters per streamed chunk")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    if not FASTAPI_AVAILABLE:
+        raise SystemExit("fastapi and uvicorn are required: pip install fastapi uvicorn")
+    app = create_app(
+        responses=CannedResponses.load(args.responses) if args.responses else None,
+        latency=LatencyModel.parse(args.latency),
+        faults=FaultProfile(args.rate_limit_rate, args.server_error_rate, args.retry_after),
+        chunk_size=args.chunk_size,
+        seed=args.seed
+    )
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
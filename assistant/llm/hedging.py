@@ -0,0 +1,119 @@
+"""Hedged LLM requests for tail-latency control.
+
+Most completions arrive quickly, but a few take many times longer, and those
+dominate p99 chat latency. With a HedgePolicy, a call that has not answered
+within a percentile of recent latencies gets a duplicate request (to the same
+or a backup model); whichever answers first wins and the other is cancelled.
+Since only the slowest few percent of calls are duplicated, the extra load
+is small.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional
+from assistant.metrics import llm_hedges
+from taskjarvis_logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+
+class HedgePolicy:
+    """When to send a duplicate request, and bookkeeping of how often it helped."""
+
+    def __init__(self, percentile: float = 0.95, min_delay: float = 0.5, backup_model: Optional[str] = None,
+                 window: int = 200, min_samples: int = 20):
+        """
+        Args:
+            percentile: Recent-latency percentile after which the hedge is sent
+            min_delay: Never hedge earlier than this many seconds
+            backup_model: Model for the hedge; None duplicates the call on the same model
+            window: Number of recent call latencies kept
+            min_samples: Latencies needed before hedging starts
+        """
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.backup_model = backup_model
+        self.min_samples = min_samples
+        self._latencies: Deque[float] = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.hedged = 0
+        self.hedge_wins = 0
+
+    def delay(self) -> Optional[float]:
+        """Seconds to wait for the first request before hedging, or None until enough latencies are known."""
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            latencies = sorted(self._latencies)
+        index = min(len(latencies) - 1, int(self.percentile * len(latencies)))
+        return max(self.min_delay, latencies[index])
+
+    def observe(self, seconds: float):
+        """Record the latency of a completed request."""
+        with self._lock:
+            self._latencies.append(seconds)
+
+    async def run(self, primary: Callable[[], Awaitable[Any]], hedge: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Run ``primary``, adding ``hedge`` if it is slower than the hedge delay.
+
+        The first request to succeed wins and the other is cancelled. If one
+        fails, the other is still awaited; the call only fails if both do.
+
+        Returns:
+            The winning request's result
+        """
+        delay = self.delay()
+        with self._lock:
+            self.calls += 1
+        llm_hedges.inc("calls")
+
+        start = time.perf_counter()
+        tasks = [asyncio.ensure_future(primary())]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                result = tasks[0].result()
+                self.observe(time.perf_counter() - start)
+                return result
+
+            with self._lock:
+                self.hedged += 1
+            llm_hedges.inc("hedged")
+            logger.info(f"LLM call slower than {delay:.2f}s; sending hedge request")
+            tasks.append(asyncio.ensure_future(hedge()))
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                winner = next((task for task in done if task.exception() is None), None)
+                if winner is not None:
+                    hedge_won = winner is tasks[1]
+                    if hedge_won:
+                        with self._lock:
+                            self.hedge_wins += 1
+                        llm_hedges.inc("hedge_wins")
+                    # The latency the caller saw; the hedge's own would pull the delay down with every win
+                    self.observe(time.perf_counter() - start)
+                    return winner.result()
+            # Both failed: report the original request's error
+            return tasks[0].result()
+        finally:
+            # The loser (or both, if this call was cancelled) must not keep running
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    def stats(self) -> Dict[str, Any]:
+        """Share of calls that were hedged and share of hedges that won."""
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "hedged": self.hedged,
+                "hedge_wins": self.hedge_wins,
+                "hedge_rate": round(self.hedged / self.calls, 3) if self.calls else 0.0,
+                "win_rate": round(self.hedge_wins / self.hedged, 3) if self.hedged else 0.0,
+            }
@@ -70,3 +70,7 @@ class MockLLMClient(BaseLLMClient):
             "entities": {},
             "response": "I didn't understand that (Mock)."
         })
+    
+    async def agenerate(self, prompt: str, **kwargs) -> str:
+        """Mock responses are instant, so no worker thread is needed."""
+        return self.generate(prompt)
@@ -5,22 +5,37 @@ through a single interface. It uses the OpenAI SDK configured for OpenRouter's
 base URL for compatibility.
 """
 
+import asyncio
 import os
 import time
-from typing import List, Dict, Any, Optional
+from contextlib import contextmanager
+from typing import AsyncIterator, Iterator, List, Dict, Any, Optional, Sequence
+from assistant.llm.accounting import UsageLedger
 from assistant.llm.base_llm import BaseLLMClient
+from assistant.llm.circuit_breaker import CircuitBreaker
+from assistant.llm.hedging import HedgePolicy
+from assistant.llm.prompt import SplitPrompt
+from assistant.llm.structured import ResponseSchema
+from assistant.llm.singleflight import flight_key, llm_singleflight
+from assistant.llm.rate_limit import TokenBucketRateLimiter, estimate_tokens
+from assistant.llm.retry import RetryBudget, RetryPolicy, status_code_of
+from assistant.llm.routing import ModelRouter
+from assistant.llm.transport import OPENROUTER_BASE_URL, get_transport
+from assistant.llm.usage import current_stage, current_user, usage_tracker
+from assistant.metrics import record_llm_call, record_llm_tokens
 from assistant.llm.errors import (
     LLMError, 
     LLMAuthError, 
     LLMRateLimitError, 
+    LLMClientRateLimitError, 
     LLMConnectionError
 )
-from taskjarvis_logging.logger import get_logger
+from taskjarvis_logging.logger import get_logger, log_llm_request, log_llm_response
 
 logger = get_logger(__name__)
 
 try:
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI, APIConnectionError
     OPENAI_AVAILABLE = True
 except ImportError:
     OPENAI_AVAILABLE = False
@@ -35,7 +50,17 @@ class OpenRouterLLMClient(BaseLLMClient):
         model_name: Optional[str] = None,
         max_retries: int = 3,
         retry_delay: float = 1.0,
-        timeout: int = 60
+        timeout: int = 60,
+        response_format: str = "json_schema",
+        retry_deadline: float = 90.0,
+        retry_policy: Optional[RetryPolicy] = None,
+        coalesce: bool = True,
+        router: Optional[ModelRouter] = None,
+        breaker: Optional[CircuitBreaker] = None,
+        base_url: Optional[str] = None,
+        rate_limiter: Optional[TokenBucketRateLimiter] = None,
+        hedge: Optional[HedgePolicy] = None,
+        ledger: Optional[UsageLedger] = None
     ):
         """
         Initialize OpenRouter client.
@@ -43,9 +68,21 @@ class OpenRouterLLMClient(BaseLLMClient):
         Args:
             api_key: OpenRouter API key
             model_name: Model to use (e.g., 'anthropic/claude-3.5-sonnet')
-            max_retries: Maximum number of retry attempts
-            retry_delay: Initial delay between retries (exponential backoff)
+            max_retries: Maximum number of attempts per call
+            retry_delay: Smallest delay between attempts (decorrelated jitter grows it)
             timeout: Request timeout in seconds
+            response_format: How structured responses are requested: "json_schema"
+                (schema-constrained output), "json_object" (plain JSON mode) or "none"
+            retry_deadline: Seconds one call may take across all attempts and waits
+            retry_policy: Custom RetryPolicy; overrides max_retries, retry_delay and retry_deadline
+            coalesce: Share one upstream request among identical concurrent calls
+            router: Per-stage model routing; stages without a route use model_name
+            breaker: Circuit breaker that fails calls fast while the provider is down
+            base_url: API base URL (e.g. a local stand-in server); defaults to
+                OPENROUTER_BASE_URL from the environment, then openrouter.ai
+            rate_limiter: Client-side requests/tokens per minute limits; calls queue when exhausted
+            hedge: Send a duplicate of slow async calls and keep the first answer
+            ledger: Records each call's tokens, latency, retries and cost per model, stage and user
             
         Raises:
             LLMError: If OpenAI SDK is not installed
@@ -65,20 +102,81 @@ class OpenRouterLLMClient(BaseLLMClient):
         self.max_retries = max_retries
         self.retry_delay = retry_delay
         self.timeout = timeout
+        self.response_format = response_format.lower()
+        self.coalesce = coalesce
+        self.router = router
+        self.breaker = breaker
+        self.rate_limiter = rate_limiter
+        self.hedge = hedge
+        self.ledger = ledger
+        self.retry_policy = retry_policy or RetryPolicy(
+            max_attempts=max_retries,
+            base_delay=retry_delay,
+            deadline=retry_deadline,
+            connection_errors=(APIConnectionError, ConnectionError, TimeoutError)
+        )
         
-        # Initialize OpenAI client configured for OpenRouter
-        self.client = OpenAI(
+        # OpenAI SDK clients (sync and async) configured for OpenRouter. They are
+        # thin wrappers: connections live in the process-wide shared transport.
+        self.base_url = base_url or os.getenv("OPENROUTER_BASE_URL") or OPENROUTER_BASE_URL
+        self.transport = get_transport(self.base_url, self.timeout)
+        self._client_kwargs = dict(
             api_key=self.api_key,
-            base_url="https://openrouter.ai/api/v1",
+            base_url=self.base_url,
             timeout=self.timeout,
+            # Retries are handled by retry_policy, not the SDK
+            max_retries=0,
             default_headers={
                 "HTTP-Referer": "https://github.com/yourusername/TaskJarvis",  # Optional
                 "X-Title": "TaskJarvis"  # Optional - shows in OpenRouter dashboard
             }
         )
+        # Built on first use, so creating a client opens no connection pool
+        self._client = None
+        self._async_client = None
+        # (pool, SDK client on it) for the loop that used it last
+        self._async_cached = None
+        self._async_pinned = False
         
         logger.info(f"OpenRouter client initialized with model: {self.model_name}")
     
+    @property
+    def client(self) -> "OpenAI":
+        """Sync SDK client on the shared transport's pool."""
+        if self._client is None:
+            self._client = OpenAI(**self._client_kwargs, http_client=self.transport.http_client)
+        return self._client
+    
+    @client.setter
+    def client(self, client):
+        self._client = client
+    
+    @property
+    def async_client(self) -> "AsyncOpenAI":
+        """Async SDK client on the shared transport's pool for the running event loop."""
+        if self._async_pinned:
+            return self._async_client
+        http_client = self.transport.async_http_client()
+        # Read and replaced as one tuple, so a call never gets another loop's client
+        cached = self._async_cached
+        if cached is None or cached[0] is not http_client:
+            cached = self._async_cached = (http_client, AsyncOpenAI(**self._client_kwargs, http_client=http_client))
+        return cached[1]
+    
+    @async_client.setter
+    def async_client(self, client):
+        # Pin a specific client (tests, custom transports) regardless of event loop
+        self._async_client = client
+        self._async_pinned = True
+    
+    def prewarm(self):
+        """Open a keep-alive connection to OpenRouter before the first request."""
+        self.transport.prewarm()
+    
+    async def aprewarm(self):
+        """Open a keep-alive connection in the running event loop's pool, which async calls use."""
+        await self.transport.aprewarm()
+    
     @property
     def provider_name(self) -> str:
         """Return the provider name."""
@@ -89,6 +187,22 @@ class OpenRouterLLMClient(BaseLLMClient):
         """Return the default model name."""
         return "anthropic/claude-3.5-sonnet"
     
+    def response_format_params(self, schema: ResponseSchema) -> Dict[str, Any]:
+        """
+        OpenRouter's response_format for a schema.
+        
+        Not every routed model supports JSON mode; OpenRouter drops the
+        parameter for those, and the schema validation still catches bad output.
+        """
+        if self.response_format == "json_schema":
+            return {"response_format": {
+                "type": "json_schema",
+                "json_schema": {"name": schema.name, "strict": False, "schema": schema.to_json_schema()},
+            }}
+        if self.response_format == "json_object":
+            return {"response_format": {"type": "json_object"}}
+        return {}
+    
     def generate(
         self, 
         prompt: str, 
@@ -114,78 +228,349 @@ class OpenRouterLLMClient(BaseLLMClient):
             LLMConnectionError: If connection fails
             LLMError: For other errors
         """
-        messages = [{"role": "user", "content": prompt}]
+        # Snapshot the model: a concurrent swap_model() only affects later calls
+        model = self._model_for_call()
+        if not self.coalesce:
+            return self._generate(model, prompt, max_tokens, temperature, **kwargs)
+        # Identical calls already in flight share one upstream request
+        key = flight_key(model, prompt, max_tokens=max_tokens, temperature=temperature, **kwargs)
+        return llm_singleflight.do(key, lambda: self._generate(model, prompt, max_tokens, temperature, **kwargs))
+    
+    def _generate(self, model: str, prompt: str, max_tokens: int, temperature: float, **kwargs) -> str:
+        """One upstream call (with retries) on a fixed model."""
+        messages = self._build_messages(prompt, model)
+        timeout = kwargs.pop("timeout", self.timeout)
         
-        # Retry logic with exponential backoff
-        last_exception = None
-        for attempt in range(self.max_retries):
-            try:
-                logger.debug(f"OpenRouter API call attempt {attempt + 1}/{self.max_retries}")
-                
-                response = self.client.chat.completions.create(
-                    model=self.model_name,
-                    messages=messages,
-                    max_tokens=max_tokens,
-                    temperature=temperature,
-                    **kwargs
-                )
-                
-                content = response.choices[0].message.content
-                
-                # Log usage if available
-                if hasattr(response, 'usage'):
-                    logger.debug(
-                        f"OpenRouter usage - "
-                        f"prompt: {response.usage.prompt_tokens}, "
-                        f"completion: {response.usage.completion_tokens}, "
-                        f"total: {response.usage.total_tokens}"
+        tokens = estimate_tokens(messages, max_tokens)
+        
+        with self._instrument(model, prompt, max_tokens=max_tokens, temperature=temperature) as call:
+            budget = self.retry_policy.begin()
+            while True:
+                call["attempts"] = budget.attempts + 1
+                queued = self._rate_limit_delay(tokens, budget)
+                if queued:
+                    time.sleep(queued)
+                try:
+                    logger.debug(f"OpenRouter API call attempt {call['attempts']}/{self.retry_policy.max_attempts}")
+                    
+                    response = self.client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        timeout=budget.request_timeout(timeout),
+                        **kwargs
                     )
-                
-                return content
-                
-            except Exception as e:
-                last_exception = e
-                error_str = str(e).lower()
-                
-                # Classify error types
-                if "401" in error_str or "unauthorized" in error_str or "invalid api key" in error_str:
-                    logger.error(f"OpenRouter authentication failed: {e}")
-                    raise LLMAuthError(f"OpenRouter authentication failed. Check your OPENROUTER_API_KEY: {e}")
-                
-                elif "429" in error_str or "rate limit" in error_str:
-                    logger.warning(f"OpenRouter rate limit hit on attempt {attempt + 1}")
-                    if attempt < self.max_retries - 1:
-                        # Exponential backoff
-                        delay = self.retry_delay * (2 ** attempt)
-                        logger.info(f"Retrying in {delay} seconds...")
-                        time.sleep(delay)
-                        continue
-                    else:
-                        raise LLMRateLimitError(f"OpenRouter rate limit exceeded after {self.max_retries} attempts: {e}")
-                
-                elif "timeout" in error_str or "connection" in error_str:
-                    logger.warning(f"OpenRouter connection error on attempt {attempt + 1}: {e}")
-                    if attempt < self.max_retries - 1:
-                        delay = self.retry_delay * (2 ** attempt)
-                        logger.info(f"Retrying in {delay} seconds...")
-                        time.sleep(delay)
-                        continue
-                    else:
-                        raise LLMConnectionError(f"OpenRouter connection failed after {self.max_retries} attempts: {e}")
-                
-                else:
-                    # Unknown error - retry if we have attempts left
-                    logger.error(f"OpenRouter error on attempt {attempt + 1}: {e}")
-                    if attempt < self.max_retries - 1:
-                        delay = self.retry_delay * (2 ** attempt)
-                        logger.info(f"Retrying in {delay} seconds...")
-                        time.sleep(delay)
+                    call["response"] = self._extract_content(response)
+                    call["usage"] = getattr(response, "usage", None)
+                    self._refund_rate_limit(tokens, call["usage"])
+                    return call["response"]
+                    
+                except Exception as e:
+                    delay = self._retry_delay_for(e, budget)
+                    logger.info(f"Retrying in {delay:.2f} seconds...")
+                    time.sleep(delay)
+    
+    async def agenerate(
+        self, 
+        prompt: str, 
+        max_tokens: int = 2000, 
+        temperature: float = 0.7,
+        **kwargs
+    ) -> str:
+        """
+        Generate a response using OpenRouter without blocking a thread.
+        
+        Same contract as generate(); the request and any retry backoff are
+        awaited on the event loop. With a hedge policy, a slow request is
+        raced against a duplicate (sync generate() is never hedged).
+        """
+        # Snapshot the model: a concurrent swap_model() only affects later calls
+        model = self._model_for_call()
+        if self.hedge is None:
+            upstream = lambda: self._agenerate(model, prompt, max_tokens, temperature, **kwargs)
+        else:
+            # A duplicate request goes out if this one is slower than recent calls
+            upstream = lambda: self.hedge.run(
+                lambda: self._agenerate(model, prompt, max_tokens, temperature, **kwargs),
+                lambda: self._agenerate(self.hedge.backup_model or model, prompt, max_tokens, temperature, **kwargs)
+            )
+        if not self.coalesce:
+            return await upstream()
+        # Identical calls already in flight share one upstream request
+        key = flight_key(model, prompt, max_tokens=max_tokens, temperature=temperature, **kwargs)
+        return await llm_singleflight.ado(key, upstream)
+    
+    async def _agenerate(self, model: str, prompt: str, max_tokens: int, temperature: float, **kwargs) -> str:
+        """One upstream call (with retries) on a fixed model."""
+        messages = self._build_messages(prompt, model)
+        timeout = kwargs.pop("timeout", self.timeout)
+        
+        tokens = estimate_tokens(messages, max_tokens)
+        
+        with self._instrument(model, prompt, max_tokens=max_tokens, temperature=temperature) as call:
+            budget = self.retry_policy.begin()
+            while True:
+                call["attempts"] = budget.attempts + 1
+                queued = self._rate_limit_delay(tokens, budget)
+                if queued:
+                    await asyncio.sleep(queued)
+                try:
+                    logger.debug(f"OpenRouter async API call attempt {call['attempts']}/{self.retry_policy.max_attempts}")
+                    
+                    response = await self.async_client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        timeout=budget.request_timeout(timeout),
+                        **kwargs
+                    )
+                    call["response"] = self._extract_content(response)
+                    call["usage"] = getattr(response, "usage", None)
+                    self._refund_rate_limit(tokens, call["usage"])
+                    return call["response"]
+                    
+                except Exception as e:
+                    delay = self._retry_delay_for(e, budget)
+                    logger.info(f"Retrying in {delay:.2f} seconds...")
+                    await asyncio.sleep(delay)
+    
+    def generate_many(self, prompts: Sequence[str], concurrency: int = 8,
+                      schema: Optional[ResponseSchema] = None, **kwargs) -> List[Any]:
+        """
+        Generate completions for many prompts concurrently.
+        
+        Outside an event loop the calls run as async requests on one loop, so
+        they share the pooled (HTTP/2 when available) connections without a
+        thread per call; otherwise this falls back to the threaded default.
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            return asyncio.run(self._agenerate_many_then_close(prompts, concurrency, schema, **kwargs))
+        return super().generate_many(prompts, concurrency=concurrency, schema=schema, **kwargs)
+    
+    async def _agenerate_many_then_close(self, prompts: Sequence[str], concurrency: int,
+                                         schema: Optional[ResponseSchema], **kwargs) -> List[Any]:
+        """agenerate_many() on a loop of its own, closing that loop's pool before it ends."""
+        try:
+            return await self.agenerate_many(prompts, concurrency=concurrency, schema=schema, **kwargs)
+        finally:
+            await self.transport.aclose_loop_pool()
+    
+    async def astream(
+        self, 
+        prompt: str, 
+        max_tokens: int = 2000, 
+        temperature: float = 0.7,
+        **kwargs
+    ) -> AsyncIterator[str]:
+        """
+        Stream a response using the chat completions streaming API.
+        
+        Opening the stream is retried like agenerate(); once the first chunk
+        has been yielded, errors are raised as-is since the output cannot be
+        replayed. Streams are never coalesced.
+        
+        Yields:
+            Content deltas as they arrive
+        """
+        # Snapshot the model: a concurrent swap_model() only affects later calls
+        model = self._model_for_call()
+        messages = self._build_messages(prompt, model)
+        timeout = kwargs.pop("timeout", self.timeout)
+        
+        tokens = estimate_tokens(messages, max_tokens)
+        
+        with self._instrument(model, prompt, max_tokens=max_tokens, temperature=temperature, stream=True) as call:
+            budget = self.retry_policy.begin()
+            while True:
+                call["attempts"] = budget.attempts + 1
+                queued = self._rate_limit_delay(tokens, budget)
+                if queued:
+                    await asyncio.sleep(queued)
+                try:
+                    logger.debug(f"OpenRouter stream attempt {call['attempts']}/{self.retry_policy.max_attempts}")
+                    stream = await self.async_client.chat.completions.create(
+                        model=model,
+                        messages=messages,
+                        max_tokens=max_tokens,
+                        temperature=temperature,
+                        stream=True,
+                        stream_options={"include_usage": True},
+                        timeout=budget.request_timeout(timeout),
+                        **kwargs
+                    )
+                    break
+                except Exception as e:
+                    delay = self._retry_delay_for(e, budget)
+                    logger.info(f"Retrying in {delay:.2f} seconds...")
+                    await asyncio.sleep(delay)
+            
+            deltas = []
+            try:
+                async for chunk in stream:
+                    if getattr(chunk, "usage", None):
+                        call["usage"] = chunk.usage
+                        self._record_usage(chunk.usage)
+                        self._refund_rate_limit(tokens, chunk.usage)
+                    if not chunk.choices:
                         continue
-                    else:
-                        raise LLMError(f"OpenRouter error after {self.max_retries} attempts: {e}")
+                    delta = chunk.choices[0].delta.content
+                    if delta:
+                        deltas.append(delta)
+                        yield delta
+            except Exception as e:
+                logger.error(f"OpenRouter stream interrupted: {e}")
+                raise LLMConnectionError(f"OpenRouter stream interrupted: {e}")
+            call["response"] = "".join(deltas)
+    
+    @contextmanager
+    def _instrument(self, model: str, prompt: str, **params) -> Iterator[Dict[str, Any]]:
+        """
+        Log and time one logical LLM call, including all of its attempts.
         
-        # If we get here, all retries failed
-        raise LLMError(f"OpenRouter request failed after {self.max_retries} attempts: {last_exception}")
+        The caller updates the yielded dict with the current attempt number
+        and, on success, the response text and the provider's token usage.
+        A call that is cancelled (a hedge loser, a client that went away) or
+        a stream closed early has no outcome: it is neither counted as an
+        error in the ledger nor used as a latency sample.
+        """
+        ticket = 0
+        if self.breaker:
+            # Fails fast with LLMCircuitOpenError while the provider is considered down
+            ticket = self.breaker.before_call()
+        log_llm_request(logger, self.provider_name, model, prompt, **params)
+        call: Dict[str, Any] = {"attempts": 0, "response": "", "usage": None}
+        start = time.perf_counter()
+        recorded = ok = cancelled = False
+        try:
+            yield call
+        except (asyncio.CancelledError, GeneratorExit):
+            cancelled = True
+            raise
+        except Exception as e:
+            log_llm_response(logger, self.provider_name, "", time.perf_counter() - start, error=str(e))
+            # A rejection by our own rate limiter says nothing about the provider
+            if self.breaker and not isinstance(e, LLMClientRateLimitError):
+                self.breaker.record_failure(ticket)
+                recorded = True
+            raise
+        else:
+            log_llm_response(logger, self.provider_name, call["response"] or "", time.perf_counter() - start)
+            ok = True
+            if self.breaker:
+                self.breaker.record_success(time.perf_counter() - start, ticket)
+                recorded = True
+        finally:
+            if self.breaker and not recorded:
+                self.breaker.abandon(ticket)
+            elapsed = time.perf_counter() - start
+            record_llm_call(model, elapsed, call["attempts"])
+            if self.router and not cancelled:
+                self.router.observe(model, elapsed)
+            if self.ledger and not cancelled:
+                usage = call["usage"]
+                self.ledger.record(
+                    model, current_stage.get(), current_user.get(),
+                    getattr(usage, "prompt_tokens", 0), getattr(usage, "completion_tokens", 0),
+                    elapsed, attempts=call["attempts"], ok=ok,
+                    # OpenRouter reports the actual charge when usage accounting is on
+                    cost=getattr(usage, "cost", None)
+                )
+    
+    def _model_for_call(self, stage: Optional[str] = None) -> str:
+        """Model for a call in ``stage`` (default: the current llm_stage()), per the router if there is one."""
+        if self.router is None:
+            return self.model_name
+        return self.router.model_for(stage or current_stage.get(), self.model_name)
+    
+    def _build_messages(self, prompt: str, model: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Build the chat messages for a prompt.
+        
+        A SplitPrompt's static prefix goes into its own system message so the
+        provider can serve it from its prompt cache; Anthropic models need an
+        explicit cache breakpoint for that, other providers cache prefixes
+        automatically.
+        """
+        if not isinstance(prompt, SplitPrompt) or not prompt.prefix:
+            return [{"role": "user", "content": prompt}]
+        
+        system_content: Any = prompt.prefix
+        if (model or self.model_name).startswith("anthropic/"):
+            system_content = [{"type": "text", "text": prompt.prefix, "cache_control": {"type": "ephemeral"}}]
+        return [
+            {"role": "system", "content": system_content},
+            {"role": "user", "content": prompt.suffix},
+        ]
+    
+    def _extract_content(self, response) -> str:
+        """Return the completion text, recording token usage if available."""
+        content = response.choices[0].message.content
+        
+        if getattr(response, 'usage', None):
+            self._record_usage(response.usage)
+        
+        return content
+    
+    def _record_usage(self, usage):
+        """Log a response's token usage and add it to the per-stage totals."""
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached_tokens = getattr(details, "cached_tokens", 0) or 0
+        logger.debug(
+            f"OpenRouter usage - "
+            f"prompt: {usage.prompt_tokens} (cached: {cached_tokens}), "
+            f"completion: {usage.completion_tokens}, "
+            f"total: {usage.total_tokens}"
+        )
+        usage_tracker.record(usage.prompt_tokens, usage.completion_tokens, cached_tokens)
+        record_llm_tokens(usage.prompt_tokens, usage.completion_tokens)
+    
+    def _rate_limit_delay(self, tokens: int, budget: RetryBudget) -> float:
+        """
+        Reserve an attempt with the client-side rate limiter.
+        
+        Returns:
+            Seconds to queue before sending the attempt
+            
+        Raises:
+            LLMClientRateLimitError: If the queue is longer than the limiter's
+                max_wait or the call's remaining deadline
+        """
+        if self.rate_limiter is None:
+            return 0.0
+        delay = self.rate_limiter.reserve(tokens, max_wait=min(self.rate_limiter.max_wait, budget.remaining()))
+        if delay:
+            logger.info(f"Client-side rate limit reached; queueing for {delay:.2f} seconds")
+        return delay
+    
+    def _refund_rate_limit(self, reserved: int, usage):
+        """Give back reserved tokens the call did not use."""
+        if self.rate_limiter is not None and getattr(usage, "total_tokens", None):
+            self.rate_limiter.refund(reserved - usage.total_tokens)
+    
+    def _retry_delay_for(self, e: Exception, budget: RetryBudget) -> float:
+        """
+        Classify a failed attempt with the retry policy.
+        
+        Returns:
+            Seconds to wait before the next attempt
+            
+        Raises:
+            LLMAuthError: On authentication failures (never retried)
+            LLMRateLimitError, LLMConnectionError, LLMError: When the failure is
+                not retryable or the attempts / deadline are exhausted
+        """
+        status = status_code_of(e)
+        try:
+            delay = budget.delay_after(e)
+        except LLMError as error:
+            logger.error(f"OpenRouter request failed on attempt {budget.attempts} (status {status}): {error}")
+            raise
+        logger.warning(f"OpenRouter attempt {budget.attempts} failed (status {status}): {e}")
+        return delay
     
     def generate_with_history(
         self, 
@@ -207,8 +592,9 @@ class OpenRouterLLMClient(BaseLLMClient):
             Generated text response
         """
         try:
+            model = self._model_for_call("conversation")
             response = self.client.chat.completions.create(
-                model=self.model_name,
+                model=model,
                 messages=messages,
                 max_tokens=max_tokens,
                 temperature=temperature,
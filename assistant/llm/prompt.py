@@ -0,0 +1,25 @@
+"""Prompt type that marks the request-independent part of a prompt."""
+
+from typing import Optional
+
+
+class SplitPrompt(str):
+    """
+    A prompt made of a static ``prefix`` followed by a per-request ``suffix``.
+
+    It is a plain ``str`` (the full prompt), so every client can use it as-is.
+    Providers that support prompt caching can send the prefix separately so
+    identical prefixes are served from the provider's cache.
+
+    ``identity`` optionally stands in for the suffix when coalescing calls:
+    everything in it that determines the answer, minus the clock. Calls in
+    flight together with the same prefix and identity are asked seconds
+    apart, so they can share one completion.
+    """
+
+    def __new__(cls, prefix: str, suffix: str, identity: Optional[str] = None):
+        prompt = super().__new__(cls, prefix + suffix)
+        prompt.prefix = prefix
+        prompt.suffix = suffix
+        prompt.identity = identity
+        return prompt
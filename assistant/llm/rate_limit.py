@@ -0,0 +1,171 @@
+"""Client-side rate limiting of LLM calls.
+
+Each uvicorn worker has its own LLM client, so during a burst all of them hit
+the provider at once, collect 429s and burn their retries. A
+TokenBucketRateLimiter keeps two buckets, requests per minute and tokens per
+minute. Every call reserves its share before it is sent. When the buckets
+are empty the call waits for its turn (queues briefly) instead of failing.
+
+Bucket state lives in a BucketStore. FileBucketStore keeps it in a small
+file under an exclusive ``flock``, so every worker on the host draws from
+the same buckets; LocalBucketStore is per-process.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+from assistant.llm.errors import LLMClientRateLimitError
+
+try:
+    import fcntl
+except ImportError:  # Windows: no flock, buckets are per-process
+    fcntl = None
+
+# Rough prompt size estimate used before the provider reports actual usage
+CHARS_PER_TOKEN = 4
+
+
+class LocalBucketStore:
+    """Bucket state shared by the threads of one process."""
+
+    def __init__(self):
+        self._state: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def transaction(self) -> Iterator[Dict[str, Any]]:
+        """Exclusive access to the mutable bucket state."""
+        with self._lock:
+            yield self._state
+
+
+class FileBucketStore:
+    """Bucket state in a file, shared by every process on the host."""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: State file; created on first use
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def transaction(self) -> Iterator[Dict[str, Any]]:
+        """Exclusive access to the bucket state; changes are written back when the block exits."""
+        with self._lock, open(self.path, "a+", encoding="utf-8") as f:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read() or "{}")
+                except ValueError:
+                    state = {}
+                yield state
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps(state))
+                f.flush()
+            finally:
+                if fcntl:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+
+class TokenBucketRateLimiter:
+    """Requests-per-minute and tokens-per-minute buckets with queueing."""
+
+    def __init__(self, requests_per_minute: float = 0, tokens_per_minute: float = 0, max_wait: float = 10.0,
+                 store=None):
+        """
+        Args:
+            requests_per_minute: Request budget; 0 disables the request bucket
+            tokens_per_minute: Prompt + completion token budget; 0 disables the token bucket
+            max_wait: Longest a call may queue before failing with LLMRateLimitError
+            store: LocalBucketStore (default) or FileBucketStore for cross-process limits
+        """
+        self.limits = {
+            name: float(per_minute)
+            for name, per_minute in (("requests", requests_per_minute), ("tokens", tokens_per_minute))
+            if per_minute > 0
+        }
+        self.max_wait = max_wait
+        self.store = store or LocalBucketStore()
+
+    def reserve(self, tokens: int, max_wait: Optional[float] = None) -> float:
+        """
+        Reserve one request and ``tokens`` tokens.
+
+        The reservation is taken immediately, even if the buckets have to go
+        into debt, so concurrent callers queue in arrival order.
+
+        Args:
+            tokens: Estimated tokens of the call
+            max_wait: Longest acceptable wait; defaults to the limiter's max_wait
+
+        Returns:
+            Seconds the caller must wait before sending the request
+
+        Raises:
+            LLMClientRateLimitError: If the wait would exceed ``max_wait``
+        """
+        max_wait = self.max_wait if max_wait is None else max_wait
+        costs = {"requests": 1, "tokens": tokens}
+        with self.store.transaction() as state:
+            levels = self._refill(state)
+            wait = 0.0
+            for name, per_minute in self.limits.items():
+                # A call bigger than the whole bucket only has to wait for a full bucket
+                cost = min(costs[name], per_minute)
+                wait = max(wait, (cost - levels[name]) / (per_minute / 60))
+            if wait > max_wait:
+                raise LLMClientRateLimitError(f"Client-side rate limit: call would queue for {wait:.1f}s")
+            for name, per_minute in self.limits.items():
+                state[name] = levels[name] - min(costs[name], per_minute)
+        return wait
+
+    def refund(self, tokens: int):
+        """Return tokens reserved but not used (actual usage below the estimate)."""
+        if tokens <= 0 or "tokens" not in self.limits:
+            return
+        with self.store.transaction() as state:
+            levels = self._refill(state)
+            state["tokens"] = min(self.limits["tokens"], levels["tokens"] + tokens)
+
+    def _refill(self, state: Dict[str, Any]) -> Dict[str, float]:
+        """Top the buckets up for the time since the last update; stores the new timestamp."""
+        now = time.time()
+        elapsed = max(0.0, now - state.get("updated", now))
+        state["updated"] = now
+        levels = {}
+        for name, per_minute in self.limits.items():
+            levels[name] = min(per_minute, state.get(name, per_minute) + elapsed * per_minute / 60)
+            state[name] = levels[name]
+        return levels
+
+
+def estimate_tokens(messages: Any, max_tokens: int) -> int:
+    """Upper estimate of a call's tokens: the prompt's size plus the completion budget."""
+    return len(json.dumps(messages, default=str)) // CHARS_PER_TOKEN + max_tokens
+
+
+def create_rate_limiter(requests_per_minute: float, tokens_per_minute: float, max_wait: float = 10.0,
+                        state_file: Optional[str] = None) -> Optional[TokenBucketRateLimiter]:
+    """
+    Build a limiter, or None when both limits are disabled.
+
+    Args:
+        requests_per_minute: Request budget (0 disables)
+        tokens_per_minute: Token budget (0 disables)
+        max_wait: Longest a call may queue
+        state_file: Shared state file for cross-process limits; per-process if empty
+    """
+    if requests_per_minute <= 0 and tokens_per_minute <= 0:
+        return None
+    if state_file:
+        os.makedirs(os.path.dirname(os.path.abspath(state_file)), exist_ok=True)
+    store = FileBucketStore(state_file) if state_file else LocalBucketStore()
+    return TokenBucketRateLimiter(requests_per_minute, tokens_per_minute, max_wait=max_wait, store=store)
@@ -0,0 +1,233 @@
+"""Persistent on-disk cache of LLM completions with record/replay modes.
+
+Regression suites and ``testRunner.py`` send the same prompts every run.
+CachingLLMClient wraps any client and stores each completion in a SQLite
+file keyed by a hash of the model (the one routed for the call's stage),
+prompt and generation parameters:
+
+- ``record``: serve cached completions, call the wrapped client on a miss
+  and store the result
+- ``replay``: serve cached completions only; a miss raises LLMCacheMissError
+  without touching the network
+- ``passthrough``: no caching
+
+Prompts embed the current time, which would make every run a miss, so text
+matching ``ignore_pattern`` (the prompts' ``CURRENT TIME:`` line by default)
+is left out of the key. The cache is capped in size; the least recently
+used completions are evicted first.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Optional
+from assistant.llm.base_llm import BaseLLMClient
+from assistant.llm.errors import LLMCacheMissError
+from assistant.llm.singleflight import flight_key
+from assistant.llm.structured import ResponseSchema
+from assistant.llm.usage import current_stage
+from taskjarvis_logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+MODES = ("record", "replay", "passthrough")
+DEFAULT_IGNORE_PATTERN = r"CURRENT TIME: [^\n]*"
+
+
+class ResponseCache:
+    """SQLite table of completions with LRU eviction under a size cap."""
+
+    def __init__(self, path: str, max_bytes: int = 100 * 1024 * 1024):
+        """
+        Args:
+            path: SQLite file; created on first use
+            max_bytes: Cap on the stored keys and completions; 0 means unbounded
+        """
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        if os.path.dirname(os.path.abspath(path)):
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS completions ("
+            " key TEXT PRIMARY KEY, model TEXT, completion TEXT NOT NULL,"
+            " size INTEGER NOT NULL, created REAL NOT NULL, last_used REAL NOT NULL)"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS completions_last_used ON completions (last_used)")
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """Cached completion for ``key``, or None."""
+        with self._lock:
+            row = self._conn.execute("SELECT completion FROM completions WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._conn.execute("UPDATE completions SET last_used = ? WHERE key = ?", (time.time(), key))
+            return row[0]
+
+    def put(self, key: str, model: str, completion: str):
+        """Store a completion, evicting least recently used ones beyond the size cap."""
+        now = time.time()
+        size = len(key) + len(completion.encode("utf-8"))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO completions (key, model, completion, size, created, last_used)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (key, model, completion, size, now, now)
+            )
+            if self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM completions").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        # Evict down to 90% of the cap so every insert near the cap doesn't evict again
+        target, freed, evicted = total - int(self.max_bytes * 0.9), 0, []
+        for key, size in self._conn.execute("SELECT key, size FROM completions ORDER BY last_used"):
+            if freed >= target:
+                break
+            evicted.append((key,))
+            freed += size
+        self._conn.executemany("DELETE FROM completions WHERE key = ?", evicted)
+        logger.info(f"LLM response cache evicted {len(evicted)} entries ({freed} bytes)")
+
+    def stats(self) -> Dict[str, Any]:
+        """Entries, stored bytes and hit ratio."""
+        with self._lock:
+            entries, size = self._conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM completions").fetchone()
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "bytes": size,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            }
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM completions")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class CachingLLMClient(BaseLLMClient):
+    """Wraps any client with a ResponseCache in record, replay or passthrough mode."""
+
+    def __init__(self, client: BaseLLMClient, cache: ResponseCache, mode: str = "record",
+                 ignore_pattern: Optional[str] = DEFAULT_IGNORE_PATTERN):
+        """
+        Args:
+            client: The client that answers cache misses
+            cache: Where completions are stored
+            mode: "record", "replay" or "passthrough"
+            ignore_pattern: Regex of prompt text left out of the cache key
+        """
+        mode = mode.lower()
+        if mode not in MODES:
+            raise ValueError(f"Unknown LLM cache mode: {mode}. Valid options: {', '.join(MODES)}")
+        super().__init__(client.api_key)
+        self.client = client
+        self.cache = cache
+        self.mode = mode
+        self.ignore = re.compile(ignore_pattern) if ignore_pattern else None
+
+    def __getattr__(self, name: str) -> Any:
+        # Anything else (router, breaker, ...) belongs to the wrapped client
+        if name == "client":
+            raise AttributeError(name)
+        return getattr(self.client, name)
+
+    @property
+    def provider_name(self) -> str:
+        return self.client.provider_name
+
+    @property
+    def default_model(self) -> str:
+        return self.client.default_model
+
+    @property
+    def model_name(self) -> str:
+        return self.client.model_name
+
+    def swap_model(self, model_name: Optional[str]):
+        self.client.swap_model(model_name)
+
+    def prewarm(self):
+        if self.mode != "replay":
+            self.client.prewarm()
+
+    async def aprewarm(self):
+        if self.mode != "replay":
+            await self.client.aprewarm()
+
+    def response_format_params(self, schema: ResponseSchema) -> Dict[str, Any]:
+        return self.client.response_format_params(schema)
+
+    def call_model(self) -> str:
+        """Model the wrapped client will use in the current llm_stage(), per its router if it has one."""
+        router = getattr(self.client, "router", None)
+        if router is None:
+            return self.client.model_name
+        return router.model_for(current_stage.get(), self.client.model_name)
+
+    def cache_key(self, prompt: str, **kwargs) -> str:
+        """Key of a call: model, prompt (minus ignored text) and parameters."""
+        text = self.ignore.sub("", str(prompt)) if self.ignore else str(prompt)
+        return flight_key(self.call_model(), text, **kwargs)
+
+    def generate(self, prompt: str, **kwargs) -> str:
+        if self.mode == "passthrough":
+            return self.client.generate(prompt, **kwargs)
+        key = self.cache_key(prompt, **kwargs)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        completion = self.client.generate(prompt, **kwargs)
+        self.cache.put(key, self.call_model(), completion)
+        return completion
+
+    async def agenerate(self, prompt: str, **kwargs) -> str:
+        if self.mode == "passthrough":
+            return await self.client.agenerate(prompt, **kwargs)
+        key = self.cache_key(prompt, **kwargs)
+        cached = self._lookup(key)
+        if cached is not None:
+            return cached
+        completion = await self.client.agenerate(prompt, **kwargs)
+        self.cache.put(key, self.call_model(), completion)
+        return completion
+
+    async def astream(self, prompt: str, **kwargs) -> AsyncIterator[str]:
+        """Cached completions are replayed as one chunk; misses are streamed and stored once complete."""
+        if self.mode == "passthrough":
+            async for chunk in self.client.astream(prompt, **kwargs):
+                yield chunk
+            return
+        key = self.cache_key(prompt, **kwargs)
+        cached = self._lookup(key)
+        if cached is not None:
+            yield cached
+            return
+        chunks = []
+        async for chunk in self.client.astream(prompt, **kwargs):
+            chunks.append(chunk)
+            yield chunk
+        self.cache.put(key, self.call_model(), "".join(chunks))
+
+    def _lookup(self, key: str) -> Optional[str]:
+        cached = self.cache.get(key)
+        if cached is None and self.mode == "replay":
+            raise LLMCacheMissError(f"No recorded completion for this prompt (key {key[:12]}) in replay mode")
+        return cached
@@ -0,0 +1,164 @@
+"""Retry policy for LLM provider calls.
+
+Failed attempts are classified by HTTP status code (or, for transport
+failures, by exception type) rather than by the exception text. Retryable
+failures wait with decorrelated jitter, so throttled workers do not retry in
+lockstep, unless the server sent a Retry-After header, which is honoured. A
+total deadline bounds the time spent on one logical call across all of its
+attempts; callers sleep with ``time.sleep`` or ``asyncio.sleep`` as fits their
+execution model.
+"""
+
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional, Tuple, Type
+from assistant.llm.errors import LLMError, LLMAuthError, LLMConnectionError, LLMRateLimitError
+
+AUTH = "auth"
+RATE_LIMIT = "rate_limit"
+CONNECTION = "connection"
+SERVER = "server"
+FATAL = "fatal"
+
+RETRYABLE = {RATE_LIMIT, CONNECTION, SERVER}
+
+
+class RetryPolicy:
+    """Classifies failures and decides how long to wait before the next attempt."""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 1.0,
+        max_delay: float = 20.0,
+        deadline: float = 60.0,
+        connection_errors: Tuple[Type[BaseException], ...] = (ConnectionError, TimeoutError),
+        rng: Optional[random.Random] = None
+    ):
+        """
+        Args:
+            max_attempts: Attempts per call, including the first
+            base_delay: Smallest backoff delay in seconds
+            max_delay: Largest backoff delay in seconds
+            deadline: Seconds one call may take across all attempts and waits
+            connection_errors: Exception types that mean the request never got a response
+            rng: Random source for jitter (tests pass a seeded one)
+        """
+        self.max_attempts = max(1, max_attempts)
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+        self.connection_errors = connection_errors
+        self.rng = rng or random.Random()
+
+    def begin(self) -> "RetryBudget":
+        """Start tracking one logical call."""
+        return RetryBudget(self)
+
+    def classify(self, e: Exception) -> str:
+        """
+        Map a failed attempt to AUTH, RATE_LIMIT, CONNECTION, SERVER or FATAL.
+
+        Only throttling, transport failures and server-side errors (408, 409,
+        5xx) are worth retrying; other 4xx responses will fail the same way again.
+        """
+        status = status_code_of(e)
+        if status is not None:
+            if status in (401, 403):
+                return AUTH
+            if status == 429:
+                return RATE_LIMIT
+            if status in (408, 409) or status >= 500:
+                return SERVER
+            return FATAL
+        if isinstance(e, self.connection_errors):
+            return CONNECTION
+        return FATAL
+
+    def backoff(self, previous: float) -> float:
+        """Decorrelated jitter: uniform between the base delay and three times the previous delay."""
+        return min(self.max_delay, self.rng.uniform(self.base_delay, max(self.base_delay, previous * 3)))
+
+
+class RetryBudget:
+    """Attempts and elapsed time of one logical call."""
+
+    def __init__(self, policy: RetryPolicy):
+        self.policy = policy
+        self.attempts = 0
+        self.started = time.monotonic()
+        self._previous_delay = policy.base_delay
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline."""
+        return max(0.0, self.policy.deadline - (time.monotonic() - self.started))
+
+    def request_timeout(self, timeout: float) -> float:
+        """Per-attempt timeout, shortened so the attempt cannot outlive the deadline."""
+        return max(0.001, min(timeout, self.remaining()))
+
+    def delay_after(self, e: Exception) -> float:
+        """
+        Record a failed attempt and return how long to wait before the next one.
+
+        Raises:
+            LLMAuthError: On authentication failures (never retried)
+            LLMRateLimitError, LLMConnectionError, LLMError: When the failure is
+                not retryable, attempts are exhausted or the wait would pass the deadline
+        """
+        self.attempts += 1
+        kind = self.policy.classify(e)
+
+        if kind == AUTH:
+            raise LLMAuthError(f"Authentication failed. Check your API key: {e}")
+        if kind not in RETRYABLE:
+            raise LLMError(f"Request failed: {e}")
+
+        retry_after = retry_after_of(e)
+        if retry_after is not None:
+            delay = retry_after
+        else:
+            delay = self.policy.backoff(self._previous_delay)
+            self._previous_delay = delay
+
+        if self.attempts >= self.policy.max_attempts:
+            raise _exhausted(kind, f"after {self.attempts} attempts: {e}")
+        if delay >= self.remaining():
+            raise _exhausted(kind, f"within the {self.policy.deadline:g}s deadline: {e}")
+        return delay
+
+
+def _exhausted(kind: str, detail: str) -> LLMError:
+    if kind == RATE_LIMIT:
+        return LLMRateLimitError(f"Rate limit exceeded {detail}")
+    if kind == CONNECTION:
+        return LLMConnectionError(f"Connection failed {detail}")
+    return LLMError(f"Server error {detail}")
+
+
+def status_code_of(e: Exception) -> Optional[int]:
+    """HTTP status of a failed request, if the exception carries one."""
+    status = getattr(e, "status_code", None)
+    if status is None:
+        status = getattr(getattr(e, "response", None), "status_code", None)
+    return status if isinstance(status, int) else None
+
+
+def retry_after_of(e: Exception) -> Optional[float]:
+    """Seconds requested by a Retry-After (or retry-after-ms) response header, if any."""
+    headers = getattr(getattr(e, "response", None), "headers", None)
+    if not headers:
+        return None
+    try:
+        if headers.get("retry-after-ms"):
+            return max(0.0, float(headers["retry-after-ms"]) / 1000)
+        value = headers.get("retry-after")
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
@@ -0,0 +1,106 @@
+"""Per-stage model routing for LLM clients.
+
+Not every assistant stage needs the same model: intent classification is a
+short, constrained task a small fast model handles well, while SQL and
+free-form conversation benefit from a larger one. A ModelRouter binds each
+stage (as set by ``llm_stage()``) to its own model, falling back to the
+client's model for stages without a route.
+
+With a latency budget, a stage whose primary model's rolling p95 exceeds the
+budget is moved to its backup model. The window is time-based: once the
+slow samples age out, the stage returns to its primary.
+"""
+
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, Optional, Tuple
+
+
+@dataclass(frozen=True)
+class Route:
+    """Model for one stage, and the model to use while it is too slow."""
+
+    model: str
+    backup: Optional[str] = None
+
+
+class ModelRouter:
+    """Chooses the model for each LLM call from its stage and recent latencies."""
+
+    def __init__(self, routes: Dict[str, Route], p95_budget: float = 0.0, window: float = 300.0,
+                 min_samples: int = 10, max_samples: int = 200):
+        """
+        Args:
+            routes: Route per stage name ("intent", "sql", "conversation", ...)
+            p95_budget: Seconds a primary's rolling p95 may reach before its
+                stages move to their backups; 0 disables latency-aware routing
+            window: Seconds of latency samples kept per model
+            min_samples: Samples needed before a model's p95 is trusted
+            max_samples: Upper bound on samples kept per model
+        """
+        self.routes = dict(routes)
+        self.p95_budget = p95_budget
+        self.window = window
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self._samples: Dict[str, Deque[Tuple[float, float]]] = {}
+        self._lock = threading.Lock()
+
+    def model_for(self, stage: str, default: str) -> str:
+        """
+        Model for a call made in ``stage``.
+
+        Args:
+            stage: Current pipeline stage
+            default: The client's own model, used for stages without a route
+
+        Returns:
+            The route's model, its backup while the model is over budget, or ``default``
+        """
+        route = self.routes.get(stage)
+        if route is None:
+            return default
+        if route.backup and self.p95_budget > 0:
+            p95 = self.p95(route.model)
+            if p95 is not None and p95 > self.p95_budget:
+                return route.backup
+        return route.model
+
+    def observe(self, model: str, seconds: float):
+        """Record the latency of one call (all attempts) to ``model``."""
+        now = time.monotonic()
+        with self._lock:
+            samples = self._samples.setdefault(model, deque(maxlen=self.max_samples))
+            samples.append((now, seconds))
+            self._expire(samples, now)
+
+    def p95(self, model: str) -> Optional[float]:
+        """Rolling p95 latency of ``model`` in seconds, or None without enough recent samples."""
+        with self._lock:
+            samples = self._samples.get(model)
+            if not samples:
+                return None
+            self._expire(samples, time.monotonic())
+            if len(samples) < self.min_samples:
+                return None
+            latencies = sorted(seconds for _, seconds in samples)
+        return latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+
+    def stats(self) -> Dict[str, Any]:
+        """Configured and currently selected model per stage."""
+        stats = {}
+        for stage, route in self.routes.items():
+            p95 = self.p95(route.model)
+            stats[stage] = {
+                "model": route.model,
+                "backup": route.backup,
+                "active": self.model_for(stage, route.model),
+                "p95_ms": round(p95 * 1000, 1) if p95 is not None else None,
+            }
+        return stats
+
+    def _expire(self, samples: Deque[Tuple[float, float]], now: float):
+        while samples and now - samples[0][0] > self.window:
+            samples.popleft()
@@ -0,0 +1,129 @@
+"""Coalescing of identical in-flight LLM calls ("singleflight").
+
+When several requests send the same prompt to the same model at the same
+moment, only the first (the leader) goes upstream; the others wait for it and
+share its result or exception. Nothing is cached: once the leader finishes,
+the next identical call goes upstream again.
+
+Prompts embed the current time to the second, so prompt builders give each
+SplitPrompt an ``identity`` (the normalized request and, where the answer
+depends on it, the user) that replaces the dynamic suffix in the key.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional, Tuple
+from assistant.metrics import llm_flights
+
+
+def flight_key(model: str, prompt: str, **params) -> str:
+    """
+    Hash of everything that determines an LLM call's output.
+
+    A SplitPrompt with an ``identity`` is keyed by its prefix and identity
+    instead of its full text, so identical requests that embed different
+    timestamps still coalesce.
+    """
+    identity = getattr(prompt, "identity", None)
+    text = [prompt.prefix, identity] if identity is not None else str(prompt)
+    payload = json.dumps([model, text, params], sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    """One in-flight synchronous call."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight:
+    """Thread- and asyncio-safe call coalescer keyed by ``flight_key``."""
+
+    def __init__(self):
+        self._flights: Dict[Hashable, _Flight] = {}
+        self._tasks: Dict[Tuple[int, Hashable], "asyncio.Future"] = {}
+        self._lock = threading.Lock()
+        self.leaders = 0
+        self.coalesced = 0
+
+    def do(self, key: Hashable, fn: Callable[[], Any]) -> Any:
+        """
+        Run ``fn`` unless an identical call is already in flight, in which case wait for it.
+
+        Args:
+            key: Identity of the call
+            fn: The upstream call
+
+        Returns:
+            The leader's result (its exception is raised in every waiter)
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            self._count(leader)
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = fn()
+            return flight.result
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+
+    async def ado(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Any:
+        """
+        Async variant of do().
+
+        The upstream call runs as its own task, so a waiter that is cancelled
+        (e.g. a client disconnecting) does not cancel it for the others.
+        """
+        loop_key = (id(asyncio.get_running_loop()), key)
+        with self._lock:
+            task = self._tasks.get(loop_key)
+            leader = task is None
+            if leader:
+                task = self._tasks[loop_key] = asyncio.ensure_future(fn())
+                task.add_done_callback(lambda _: self._forget(loop_key))
+            self._count(leader)
+        return await asyncio.shield(task)
+
+    def stats(self) -> Dict[str, Any]:
+        """Upstream vs. coalesced calls and the share of calls that were coalesced."""
+        with self._lock:
+            total = self.leaders + self.coalesced
+            return {
+                "upstream_calls": self.leaders,
+                "coalesced_calls": self.coalesced,
+                "coalescing_ratio": round(self.coalesced / total, 3) if total else 0.0,
+            }
+
+    def _count(self, leader: bool):
+        if leader:
+            self.leaders += 1
+        else:
+            self.coalesced += 1
+        llm_flights.inc("leader" if leader else "coalesced")
+
+    def _forget(self, loop_key: Tuple[int, Hashable]):
+        with self._lock:
+            self._tasks.pop(loop_key, None)
+
+
+# Shared by every LLM client in the process
+llm_singleflight = SingleFlight()
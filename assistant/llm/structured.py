@@ -0,0 +1,138 @@
+"""Structured (JSON) responses from LLM clients.
+
+A ResponseSchema describes the JSON object a prompt asks for. Providers that
+support it are asked to constrain their output to the schema (JSON mode), and
+every completion is validated against it, so callers receive a checked
+StructuredResponse instead of re-parsing free text. Completions from models
+without JSON mode are still accepted when the object is wrapped in markdown
+fences or surrounding prose.
+"""
+
+import json
+from dataclasses import dataclass, field
+from typing import Any, Dict, Optional, Sequence, Tuple
+from assistant.llm.errors import LLMInvalidResponseError
+
+# JSON Schema type name -> Python types accepted for it
+_JSON_TYPES = {
+    "string": (str,),
+    "integer": (int,),
+    "number": (int, float),
+    "boolean": (bool,),
+    "object": (dict,),
+    "array": (list,),
+    "null": (type(None),),
+}
+
+
+@dataclass(frozen=True)
+class Field:
+    """
+    One top-level property of a response object.
+
+    ``types`` are JSON Schema type names; ``enum`` restricts string values.
+    Optional fields that are missing are filled in with ``default``.
+    """
+
+    name: str
+    types: Tuple[str, ...]
+    required: bool = True
+    enum: Optional[Tuple[str, ...]] = None
+    default: Any = None
+
+
+@dataclass(frozen=True)
+class ResponseSchema:
+    """The JSON object a prompt expects back."""
+
+    name: str
+    fields: Tuple[Field, ...]
+
+    def to_json_schema(self) -> Dict[str, Any]:
+        """JSON Schema for the provider's response_format."""
+        properties = {}
+        for item in self.fields:
+            prop: Dict[str, Any] = {"type": list(item.types) if len(item.types) > 1 else item.types[0]}
+            if item.enum:
+                prop["enum"] = list(item.enum)
+            properties[item.name] = prop
+        return {
+            "type": "object",
+            "properties": properties,
+            "required": [item.name for item in self.fields if item.required],
+        }
+
+    def parse(self, text: str) -> "StructuredResponse":
+        """
+        Decode and validate a completion.
+
+        Args:
+            text: Raw completion text
+
+        Returns:
+            StructuredResponse with missing optional fields defaulted
+
+        Raises:
+            LLMInvalidResponseError: If the text holds no JSON object or it
+                does not match the schema
+        """
+        data = _load_object(text)
+        for item in self.fields:
+            if item.name not in data:
+                if item.required:
+                    raise LLMInvalidResponseError(f"{self.name}: missing field '{item.name}'")
+                data[item.name] = item.default() if callable(item.default) else item.default
+                continue
+            value = data[item.name]
+            if not _matches(value, item.types):
+                raise LLMInvalidResponseError(
+                    f"{self.name}: field '{item.name}' should be {' or '.join(item.types)}, got {type(value).__name__}"
+                )
+            if item.enum and value is not None and value not in item.enum:
+                raise LLMInvalidResponseError(f"{self.name}: field '{item.name}' has unexpected value {value!r}")
+        return StructuredResponse(data, text)
+
+
+@dataclass
+class StructuredResponse:
+    """A validated response object plus the completion it came from."""
+
+    data: Dict[str, Any]
+    raw: str = field(repr=False, default="")
+
+    def __getitem__(self, key: str) -> Any:
+        return self.data[key]
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self.data.get(key, default)
+
+
+def _matches(value: Any, types: Sequence[str]) -> bool:
+    # bool is an int subclass, but JSON true is not a number
+    if isinstance(value, bool):
+        return "boolean" in types
+    return any(isinstance(value, _JSON_TYPES[name]) for name in types)
+
+
+def _load_object(text: str) -> Dict[str, Any]:
+    """Parse the JSON object in a completion, tolerating fences and surrounding prose."""
+    if text is None:
+        raise LLMInvalidResponseError("empty completion")
+    cleaned = text.strip()
+    try:
+        data = json.loads(cleaned)
+    except json.JSONDecodeError:
+        # No JSON mode on this model: strip markdown fences and any extra text
+        if "```" in cleaned:
+            cleaned = cleaned.split("```", 2)[1]
+            cleaned = cleaned[4:] if cleaned.startswith("json") else cleaned
+        start, end = cleaned.find("{"), cleaned.rfind("}")
+        if start == -1 or end < start:
+            raise LLMInvalidResponseError(f"no JSON object in completion: {text[:200]!r}")
+        try:
+            data = json.loads(cleaned[start:end + 1])
+        except json.JSONDecodeError as e:
+            raise LLMInvalidResponseError(f"malformed JSON in completion: {e}")
+    if not isinstance(data, dict):
+        raise LLMInvalidResponseError(f"expected a JSON object, got {type(data).__name__}")
+    return data
@@ -0,0 +1,181 @@
+"""Process-wide pooled HTTP transport for LLM providers.
+
+Building an OpenAI SDK client per LLM client means a new connection pool, a
+fresh TLS handshake and cold keep-alive connections every time the assistant
+is reconfigured. Instead, every client for the same base URL shares one
+HTTPTransport from the registry: a keep-alive pool (HTTP/2 when the ``h2``
+package is installed) that outlives any individual client or model choice.
+The OpenAI SDK is only imported once a pool is first needed.
+"""
+
+import asyncio
+import importlib.util
+import threading
+from typing import Any, Dict, Optional, Tuple
+from taskjarvis_logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+try:
+    import httpx
+except ImportError:
+    httpx = None
+
+HTTP2_AVAILABLE = importlib.util.find_spec("h2") is not None
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+
+class HTTPTransport:
+    """
+    Shared keep-alive connection pools (sync and async) for one base URL.
+
+    An async pool is bound to the event loop it was created on, so there is
+    one per loop: the server's loop keeps its pool while a worker thread runs
+    its own loop (``asyncio.run``) next to it. Pools of loops that have
+    closed are dropped on the next lookup.
+    """
+
+    def __init__(self, base_url: str, timeout: float = 60, max_connections: int = 20,
+                 max_keepalive_connections: int = 10, keepalive_expiry: float = 120.0):
+        """
+        Args:
+            base_url: API base URL the pools connect to
+            timeout: Request timeout in seconds
+            max_connections: Upper bound on open connections per pool
+            max_keepalive_connections: Idle connections kept open for reuse
+            keepalive_expiry: Seconds an idle connection is kept open
+        """
+        self.base_url = base_url
+        self.timeout = timeout
+        self.http2 = HTTP2_AVAILABLE
+        self._client_kwargs: Dict[str, Any] = {"timeout": timeout, "http2": self.http2}
+        if httpx is not None:
+            self._client_kwargs["limits"] = httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry
+            )
+        self._http_client = None
+        self._async_http_clients: Dict[Optional[asyncio.AbstractEventLoop], Any] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def http_client(self):
+        """The shared synchronous HTTP client."""
+        with self._lock:
+            if self._http_client is None:
+                from openai import DefaultHttpxClient
+                self._http_client = DefaultHttpxClient(**self._client_kwargs)
+            return self._http_client
+
+    def async_http_client(self):
+        """The shared asynchronous HTTP client for the running event loop."""
+        loop = _running_loop()
+        with self._lock:
+            for closed in [other for other in self._async_http_clients if other is not None and other.is_closed()]:
+                # Its connections went with the loop; nothing is left to await
+                del self._async_http_clients[closed]
+            client = self._async_http_clients.get(loop)
+            if client is None:
+                from openai import DefaultAsyncHttpxClient
+                client = self._async_http_clients[loop] = DefaultAsyncHttpxClient(**self._client_kwargs)
+            return client
+
+    def prewarm(self, path: str = "/models"):
+        """
+        Open a pooled connection ahead of the first real request.
+
+        The response itself is ignored; only the TLS handshake and the
+        keep-alive connection it leaves behind matter.
+        """
+        try:
+            self.http_client.head(f"{self.base_url}{path}")
+            logger.info(f"Pre-warmed connection to {self.base_url} (http2={self.http2})")
+        except Exception as e:
+            logger.warning(f"Pre-warming {self.base_url} failed: {e}")
+
+    async def aprewarm(self, path: str = "/models"):
+        """Async variant of prewarm, warming the event loop's pool."""
+        try:
+            await self.async_http_client().head(f"{self.base_url}{path}")
+            logger.info(f"Pre-warmed async connection to {self.base_url} (http2={self.http2})")
+        except Exception as e:
+            logger.warning(f"Pre-warming {self.base_url} failed: {e}")
+
+    async def aclose_loop_pool(self):
+        """Close the running loop's async pool, e.g. before an ``asyncio.run`` loop ends."""
+        with self._lock:
+            client = self._async_http_clients.pop(_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    def close(self):
+        """Close the sync pool and every async pool, each on its own event loop."""
+        with self._lock:
+            if self._http_client is not None:
+                self._http_client.close()
+            self._http_client = None
+            async_clients, self._async_http_clients = self._async_http_clients, {}
+        for loop, client in async_clients.items():
+            _close_on_loop(loop, client)
+
+
+def _running_loop() -> Optional[asyncio.AbstractEventLoop]:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _close_on_loop(loop: Optional[asyncio.AbstractEventLoop], client):
+    """Close an async pool on the loop it belongs to."""
+    try:
+        if loop is None or loop.is_closed():
+            return
+        if loop.is_running():
+            asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+        else:
+            loop.run_until_complete(client.aclose())
+    except Exception as e:
+        logger.warning(f"Closing an async connection pool failed: {e}")
+
+
+_transports: Dict[Tuple[str, float], HTTPTransport] = {}
+_registry_lock = threading.Lock()
+
+
+def get_transport(base_url: str = OPENROUTER_BASE_URL, timeout: float = 60) -> HTTPTransport:
+    """
+    Return the process-wide transport for a base URL, creating it on first use.
+
+    Args:
+        base_url: API base URL
+        timeout: Request timeout in seconds
+
+    Returns:
+        The shared HTTPTransport
+    """
+    key = (base_url, float(timeout))
+    with _registry_lock:
+        transport = _transports.get(key)
+        if transport is None:
+            transport = _transports[key] = HTTPTransport(base_url, timeout=timeout)
+        return transport
+
+
+async def aclose_transports():
+    """close_transports() from the serving event loop, awaiting the close of that loop's pools."""
+    with _registry_lock:
+        transports = list(_transports.values())
+    for transport in transports:
+        await transport.aclose_loop_pool()
+    close_transports()
+
+
+def close_transports():
+    """Close every registered transport (application shutdown)."""
+    with _registry_lock:
+        for transport in _transports.values():
+            transport.close()
+        _transports.clear()
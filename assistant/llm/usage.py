@@ -0,0 +1,92 @@
+"""Per-stage token accounting for LLM calls.
+
+The assistant pipeline tags each LLM call with its stage ("intent", "sql")
+and the user it is made for through context variables; provider clients
+report the token usage of each response to the shared tracker, which
+aggregates it per stage.
+"""
+
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Optional
+
+current_stage: ContextVar[str] = ContextVar("llm_stage", default="other")
+current_user: ContextVar[Optional[int]] = ContextVar("llm_user", default=None)
+
+
+@contextmanager
+def llm_stage(stage: str):
+    """Attribute LLM usage inside the block to ``stage``."""
+    token = current_stage.set(stage)
+    try:
+        yield
+    finally:
+        current_stage.reset(token)
+
+
+@contextmanager
+def llm_user(user_id: Optional[int]):
+    """Attribute LLM calls inside the block to ``user_id``."""
+    token = current_user.set(user_id)
+    try:
+        yield
+    finally:
+        current_user.reset(token)
+
+
+class UsageTracker:
+    """Thread-safe running totals of prompt/completion tokens per stage."""
+
+    def __init__(self):
+        self._stages: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        prompt_tokens: int,
+        completion_tokens: int,
+        cached_tokens: int = 0,
+        stage: Optional[str] = None
+    ):
+        """
+        Add one completion's usage.
+
+        Args:
+            prompt_tokens: Tokens in the prompt (including cached ones)
+            completion_tokens: Tokens generated
+            cached_tokens: Prompt tokens served from the provider's prompt cache
+            stage: Stage name; defaults to the current llm_stage()
+        """
+        stage = stage or current_stage.get()
+        with self._lock:
+            totals = self._stages.setdefault(
+                stage, {"calls": 0, "prompt_tokens": 0, "completion_tokens": 0, "cached_tokens": 0}
+            )
+            totals["calls"] += 1
+            totals["prompt_tokens"] += prompt_tokens or 0
+            totals["completion_tokens"] += completion_tokens or 0
+            totals["cached_tokens"] += cached_tokens or 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Totals and per-call averages for each stage."""
+        with self._lock:
+            stats = {}
+            for stage, totals in self._stages.items():
+                calls = totals["calls"]
+                stats[stage] = {
+                    **totals,
+                    "avg_prompt_tokens": round(totals["prompt_tokens"] / calls, 1),
+                    "avg_completion_tokens": round(totals["completion_tokens"] / calls, 1),
+                    "cache_hit_ratio": round(totals["cached_tokens"] / totals["prompt_tokens"], 3)
+                    if totals["prompt_tokens"] else 0.0,
+                }
+            return stats
+
+    def reset(self):
+        """Clear all totals."""
+        with self._lock:
+            self._stages.clear()
+
+
+usage_tracker = UsageTracker()
@@ -0,0 +1,207 @@
+"""Latency instrumentation for the assistant pipeline.
+
+Each stage of a request (fast path, intent and SQL generation, database work,
+formatting) runs inside a ``timed()`` span. Spans feed process-wide latency
+histograms, exported in the Prometheus text format, and - when the request
+opened ``collect_request_metrics()`` - a per-request breakdown that can be
+returned to the caller. LLM clients report each call's latency, attempts and
+token usage the same way.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+# Upper bounds in seconds; the last bucket is +Inf
+LATENCY_BUCKETS: Tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram of observations, one series per label value."""
+
+    def __init__(self, name: str, label: str, description: str, buckets: Tuple[float, ...] = LATENCY_BUCKETS):
+        self.name = name
+        self.label = label
+        self.description = description
+        self.buckets = buckets
+        self._series: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, label_value: str, value: float):
+        """Add one observation to the series for ``label_value``."""
+        with self._lock:
+            series = self._series.setdefault(
+                label_value, {"counts": [0] * (len(self.buckets) + 1), "sum": 0.0, "count": 0}
+            )
+            index = next((i for i, bound in enumerate(self.buckets) if value <= bound), len(self.buckets))
+            series["counts"][index] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Count, mean and approximate p50/p95 (bucket upper bounds) per series."""
+        with self._lock:
+            return {
+                label_value: {
+                    "count": series["count"],
+                    "avg_ms": round(series["sum"] / series["count"] * 1000, 1),
+                    "p50_ms": self._quantile_ms(series, 0.5),
+                    "p95_ms": self._quantile_ms(series, 0.95),
+                }
+                for label_value, series in self._series.items()
+            }
+
+    def render(self) -> List[str]:
+        """Prometheus text exposition lines."""
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for label_value, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), series["counts"]):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else repr(bound)
+                    lines.append(f'{self.name}_bucket{{{self.label}="{label_value}",le="{le}"}} {cumulative}')
+                lines.append(f'{self.name}_sum{{{self.label}="{label_value}"}} {series["sum"]:.6f}')
+                lines.append(f'{self.name}_count{{{self.label}="{label_value}"}} {series["count"]}')
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._series.clear()
+
+    def _quantile_ms(self, series: Dict[str, Any], q: float) -> Optional[float]:
+        target, cumulative = q * series["count"], 0
+        for bound, count in zip(self.buckets, series["counts"]):
+            cumulative += count
+            if cumulative >= target:
+                return bound * 1000
+        return None
+
+
+class Counter:
+    """Monotonic counter, one series per label value."""
+
+    def __init__(self, name: str, label: str, description: str):
+        self.name = name
+        self.label = label
+        self.description = description
+        self._values: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, label_value: str, amount: float = 1):
+        with self._lock:
+            self._values[label_value] = self._values.get(label_value, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for label_value, value in sorted(self._values.items()):
+                lines.append(f'{self.name}{{{self.label}="{label_value}"}} {value:g}')
+        return lines
+
+    def reset(self):
+        with self._lock:
+            self._values.clear()
+
+
+stage_latency = Histogram(
+    "taskjarvis_assistant_stage_seconds", "stage", "Time spent in each assistant pipeline stage."
+)
+llm_latency = Histogram(
+    "taskjarvis_llm_request_seconds", "model", "LLM call latency including retries."
+)
+llm_retries = Counter("taskjarvis_llm_retries_total", "model", "LLM call attempts that were retried.")
+llm_tokens = Counter("taskjarvis_llm_tokens_total", "type", "Prompt and completion tokens used.")
+llm_flights = Counter(
+    "taskjarvis_llm_singleflight_total", "role",
+    "LLM calls that went upstream (leader) or shared an identical in-flight call (coalesced)."
+)
+llm_hedges = Counter(
+    "taskjarvis_llm_hedge_total", "event", "Hedge-eligible LLM calls, hedge requests sent and hedges that won."
+)
+
+
+@dataclass
+class RequestMetrics:
+    """Timing and LLM usage of one assistant request."""
+
+    stages_ms: Dict[str, float] = field(default_factory=dict)
+    llm_calls: int = 0
+    llm_retries: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "stages_ms": {stage: round(ms, 1) for stage, ms in self.stages_ms.items()},
+            "llm_calls": self.llm_calls,
+            "llm_retries": self.llm_retries,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+        }
+
+
+current_request_metrics: ContextVar[Optional[RequestMetrics]] = ContextVar("request_metrics", default=None)
+
+
+@contextmanager
+def collect_request_metrics() -> Iterator[RequestMetrics]:
+    """Collect the spans and LLM calls made inside the block into a new RequestMetrics."""
+    metrics = RequestMetrics()
+    token = current_request_metrics.set(metrics)
+    try:
+        yield metrics
+    finally:
+        current_request_metrics.reset(token)
+
+
+@contextmanager
+def timed(stage: str):
+    """Time the block as ``stage``; repeated stages in one request add up."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        stage_latency.observe(stage, elapsed)
+        metrics = current_request_metrics.get()
+        if metrics is not None:
+            metrics.stages_ms[stage] = metrics.stages_ms.get(stage, 0.0) + elapsed * 1000
+
+
+def record_llm_call(model: str, seconds: float, attempts: int):
+    """Record one LLM call (all of its attempts) made by a provider client."""
+    llm_latency.observe(model, seconds)
+    if attempts > 1:
+        llm_retries.inc(model, attempts - 1)
+    metrics = current_request_metrics.get()
+    if metrics is not None:
+        metrics.llm_calls += 1
+        metrics.llm_retries += attempts - 1
+
+
+def record_llm_tokens(prompt_tokens: int, completion_tokens: int):
+    """Record one completion's token usage."""
+    llm_tokens.inc("prompt", prompt_tokens or 0)
+    llm_tokens.inc("completion", completion_tokens or 0)
+    metrics = current_request_metrics.get()
+    if metrics is not None:
+        metrics.prompt_tokens += prompt_tokens or 0
+        metrics.completion_tokens += completion_tokens or 0
+
+
+def render_metrics() -> str:
+    """All assistant metrics in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for metric in (stage_latency, llm_latency, llm_retries, llm_tokens, llm_flights, llm_hedges):
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+def reset_metrics():
+    """Clear all process-wide metrics."""
+    for metric in (stage_latency, llm_latency, llm_retries, llm_tokens, llm_flights, llm_hedges):
+        metric.reset()
@@ -0,0 +1,180 @@
+"""Step protocol shared by the sync and async assistant drivers.
+
+TaskAssistant writes its request pipeline once, as a generator that yields
+the I/O it needs (LLM completions, single or batched, and blocking database
+work) and receives the results back. The sync driver performs each step inline. The async driver
+awaits LLM calls on the event loop and pushes database work to a worker
+thread, so a chat request only holds the loop while it waits on I/O. The
+streaming driver additionally streams completions and emits the user-facing
+text as it arrives. All drivers time each step: LLM steps under their stage
+name, database steps as "db".
+"""
+
+import asyncio
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Callable, Generator, List, Optional
+from assistant.llm.base_llm import BaseLLMClient
+from assistant.llm.structured import ResponseSchema
+from assistant.llm.usage import llm_stage
+from assistant.metrics import timed
+from assistant.streaming import JSONStringFieldStreamer, StreamEvent
+
+Pipeline = Generator[Any, Any, Any]
+
+
+@dataclass
+class LLMStep:
+    """
+    Ask the LLM for a completion of ``prompt``; ``stage`` names the pipeline
+    stage and is used to attribute token usage.
+    
+    With a ``schema`` the step's result is a validated StructuredResponse
+    instead of the raw completion text. ``stream_field`` names a JSON string
+    field of the completion that the streaming driver forwards to the user
+    while the completion is generated.
+    """
+
+    stage: str
+    prompt: str
+    stream_field: Optional[str] = None
+    schema: Optional[ResponseSchema] = None
+
+
+@dataclass
+class LLMBatchStep:
+    """
+    Ask the LLM for completions of many ``prompts`` at once, up to
+    ``concurrency`` in flight.
+    
+    The result is a list in prompt order holding each completion (a
+    StructuredResponse with a ``schema``) or the exception its call raised.
+    """
+
+    stage: str
+    prompts: List[str]
+    schema: Optional[ResponseSchema] = None
+    concurrency: int = 8
+
+
+@dataclass
+class DBStep:
+    """Run blocking database work (and anything that formats its results)."""
+
+    fn: Callable[[], Any]
+
+
+def run_sync(pipeline: Pipeline, llm_client: BaseLLMClient) -> Any:
+    """
+    Drive a pipeline to completion, performing every step inline.
+
+    Exceptions raised by a step are thrown back into the pipeline so its own
+    error handling applies.
+
+    Returns:
+        The pipeline's return value
+    """
+    value, error = None, None
+    while True:
+        try:
+            step = pipeline.throw(error) if error else pipeline.send(value)
+        except StopIteration as stop:
+            return stop.value
+
+        value, error = None, None
+        try:
+            if isinstance(step, LLMBatchStep):
+                with llm_stage(step.stage), timed(step.stage):
+                    value = llm_client.generate_many(step.prompts, step.concurrency, step.schema)
+            elif isinstance(step, LLMStep) and step.schema:
+                with llm_stage(step.stage), timed(step.stage):
+                    value = llm_client.generate_structured(step.prompt, step.schema)
+            elif isinstance(step, LLMStep):
+                with llm_stage(step.stage), timed(step.stage):
+                    value = llm_client.generate(step.prompt)
+            else:
+                with timed("db"):
+                    value = step.fn()
+        except Exception as e:
+            error = e
+
+
+async def run_async(pipeline: Pipeline, llm_client: BaseLLMClient) -> Any:
+    """
+    Drive a pipeline on the event loop.
+
+    LLM steps use the client's async API; database steps run in a worker
+    thread.
+
+    Returns:
+        The pipeline's return value
+    """
+    value, error = None, None
+    while True:
+        try:
+            step = pipeline.throw(error) if error else pipeline.send(value)
+        except StopIteration as stop:
+            return stop.value
+
+        value, error = None, None
+        try:
+            if isinstance(step, LLMBatchStep):
+                with llm_stage(step.stage), timed(step.stage):
+                    value = await llm_client.agenerate_many(step.prompts, step.concurrency, step.schema)
+            elif isinstance(step, LLMStep) and step.schema:
+                with llm_stage(step.stage), timed(step.stage):
+                    value = await llm_client.agenerate_structured(step.prompt, step.schema)
+            elif isinstance(step, LLMStep):
+                with llm_stage(step.stage), timed(step.stage):
+                    value = await llm_client.agenerate(step.prompt)
+            else:
+                with timed("db"):
+                    value = await asyncio.to_thread(step.fn)
+        except Exception as e:
+            error = e
+
+
+async def run_stream(pipeline: Pipeline, llm_client: BaseLLMClient) -> AsyncIterator[StreamEvent]:
+    """
+    Drive a pipeline on the event loop, streaming user-facing text.
+
+    Yields "delta" events with text decoded from each LLM step's
+    ``stream_field`` as chunks arrive, then one "result" event carrying the
+    pipeline's return value.
+    """
+    value, error = None, None
+    while True:
+        try:
+            step = pipeline.throw(error) if error else pipeline.send(value)
+        except StopIteration as stop:
+            yield StreamEvent("result", stop.value)
+            return
+
+        value, error = None, None
+        try:
+            if isinstance(step, LLMStep) and step.stream_field:
+                extractor = JSONStringFieldStreamer(step.stream_field)
+                params = llm_client.response_format_params(step.schema) if step.schema else {}
+                chunks = []
+                with llm_stage(step.stage), timed(step.stage):
+                    async for chunk in llm_client.astream(step.prompt, **params):
+                        chunks.append(chunk)
+                        text = extractor.feed(chunk)
+                        if text:
+                            yield StreamEvent("delta", text)
+                value = "".join(chunks)
+                if step.schema:
+                    value = step.schema.parse(value)
+            elif isinstance(step, LLMBatchStep):
+                with llm_stage(step.stage), timed(step.stage):
+                    value = await llm_client.agenerate_many(step.prompts, step.concurrency, step.schema)
+            elif isinstance(step, LLMStep) and step.schema:
+                with llm_stage(step.stage), timed(step.stage):
+                    value = await llm_client.agenerate_structured(step.prompt, step.schema)
+            elif isinstance(step, LLMStep):
+                with llm_stage(step.stage), timed(step.stage):
+                    value = await llm_client.agenerate(step.prompt)
+            else:
+                with timed("db"):
+                    value = await asyncio.to_thread(step.fn)
+        except Exception as e:
+            error = e
@@ -0,0 +1,201 @@
+"""Prompt templates for the assistant's LLM stages.
+
+Every prompt is a static prefix (instructions, schema, examples) followed by
+a short dynamic suffix (current time, user id, the request itself). The
+prefixes are built once at import time and are byte-identical across
+requests, so providers with prompt caching only process the suffix anew.
+Nothing that varies per request may be added to a prefix.
+"""
+
+import json
+from typing import Any, Dict, Optional
+from assistant.intent_cache import normalize_input
+from assistant.llm.prompt import SplitPrompt
+from assistant.llm.structured import Field, ResponseSchema
+
+INTENT_PREFIX = """You are TaskJarvis, a productivity assistant.
+Analyze the user's input and extract the intent and entities.
+
+ENTITIES:
+- All text fields are lowercase
+- status: 'pending', 'completed' or 'in progress'; priority: 'low', 'medium' or 'high'
+- recurrence_rule (RRULE): "daily" → "FREQ=DAILY;INTERVAL=1", "weekly" → "FREQ=WEEKLY;INTERVAL=1",
+  "monthly" → "FREQ=MONTHLY;INTERVAL=1", "every Monday" → "FREQ=WEEKLY;BYDAY=MO", "every 2 days" → "FREQ=DAILY;INTERVAL=2"
+- reminder_offset (integer minutes) for "remind me X before", "with a X minute reminder", "alert me X before":
+  "10 minutes before" → 10, "1 hour before" → 60; a reminder without a time → 15
+
+INTENTS:
+- add_task: Create a new task. Entities: title (REQUIRED), deadline, priority, recurrence_rule, reminder_offset
+- list_tasks: Show tasks. Entities: status, priority
+- delete_task: Remove a task. Entities: id (int) or scope ("all")
+- complete_task: Mark task as done. Entities: id (int) or scope ("all")
+- analytics: Show stats
+- unknown: Unclear or not task-related (normal conversation)
+
+MULTIPLE COMMANDS:
+If the message asks for several add/complete/delete operations, set intent to "batch" and list
+each one in "operations" (same intents and entities as above), with one "response" covering all.
+
+Respond with ONLY valid JSON, no markdown:
+{"intent": "intent_name", "entities": {}, "response": "message"}
+
+Examples:
+{"intent": "add_task", "entities": {"title": "team meeting", "recurrence_rule": "FREQ=WEEKLY;BYDAY=MO", "reminder_offset": 15}, "response": "I'll add that recurring task with a reminder."}
+{"intent": "list_tasks", "entities": {}, "response": "Here are your tasks."}
+{"intent": "batch", "entities": {}, "operations": [{"intent": "add_task", "entities": {"title": "buy milk"}}, {"intent": "add_task", "entities": {"title": "call the bank"}}, {"intent": "complete_task", "entities": {"id": 4}}], "response": "I'll add both tasks and complete task 4."}
+{"intent": "unknown", "entities": {}, "response": "I'm a task management assistant. How can I help with your tasks?"}
+"""
+
+COMBINED_SQL_SECTION = """
+SQL GENERATION (rare):
+The app builds the SQL for add_task, list_tasks, delete_task and complete_task from
+the entities itself. Only when such a request needs something the entities cannot
+express (e.g. matching words in a title), also include a "sql" field containing
+ONE PostgreSQL statement for this schema:
+tasks(id SERIAL PRIMARY KEY, title TEXT NOT NULL, status TEXT DEFAULT 'pending',
+      priority TEXT DEFAULT 'medium', deadline TIMESTAMP, recurrence_rule TEXT,
+      reminder_offset INTEGER, last_reminded_at TIMESTAMP, created_at TIMESTAMP,
+      updated_at TIMESTAMP, user_id INTEGER, workspace_id INTEGER, assigned_to_id INTEGER)
+
+SQL RULES:
+- ALL string values must be lowercase; use single quotes for strings
+- For INSERT: include title, user_id (the CURRENT USER ID), created_at and updated_at with NOW(); DO NOT include id
+- For INSERT: include deadline, priority, status, recurrence_rule, reminder_offset (integer, no quotes) when present
+- For relative deadlines use NOW() + INTERVAL 'X minutes' (always quoted, never decimals)
+- For SELECT: use WHERE clauses with lowercase values (status, priority)
+- For UPDATE: set status = 'completed' and ALWAYS set updated_at = NOW()
+- For DELETE: use WHERE id = X or delete all if scope is "all"
+- In every other case set "sql" to null
+
+Combined examples (CURRENT USER ID 42):
+{"intent": "add_task", "entities": {"title": "buy milk"}, "response": "I'll add that task.", "sql": null}
+{"intent": "list_tasks", "entities": {"title": "report"}, "response": "Here are your report tasks.", "sql": "SELECT * FROM tasks WHERE title LIKE '%report%';"}
+"""
+
+SQL_PREFIX = """You are an SQL expert. Generate ONLY the SQL query for this task management operation.
+
+DATABASE SCHEMA (PostgreSQL):
+CREATE TABLE tasks (
+    id SERIAL PRIMARY KEY,
+    title TEXT NOT NULL,
+    status TEXT DEFAULT 'pending',
+    priority TEXT DEFAULT 'medium',
+    deadline TIMESTAMP,
+    recurrence_rule TEXT,
+    reminder_offset INTEGER,
+    last_reminded_at TIMESTAMP,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    user_id INTEGER,
+    workspace_id INTEGER,
+    assigned_to_id INTEGER
+);
+
+RULES:
+- Respond with ONLY valid JSON, no markdown or explanations: {"sql": "<one SQL statement>"}
+- Use single quotes for strings; ALL string values are lowercase ('pending', 'completed', 'low', 'medium', 'high')
+- For relative deadlines use NOW() + INTERVAL 'X minutes' / 'X hours' / 'X day' - always quoted, never decimals
+- For INSERT: include title, user_id (the CURRENT USER ID), created_at and updated_at with NOW(); DO NOT include id
+- For INSERT: include deadline, priority, status, recurrence_rule (quoted) and reminder_offset (integer, no quotes) when provided
+- For SELECT: use WHERE clauses with lowercase values (status, priority)
+- For UPDATE: set status = 'completed' for complete operations and ALWAYS set updated_at = NOW()
+- For DELETE: use WHERE id = X or delete all if scope is "all"
+"""
+
+# Few-shot examples, one block per intent; only the detected intent's block is sent
+SQL_EXAMPLES = {
+    "add_task": """
+Examples (CURRENT USER ID 42):
+Entities: {"title": "buy milk"}
+Response: {"sql": "INSERT INTO tasks (title, status, priority, user_id, created_at, updated_at) VALUES ('buy milk', 'pending', 'medium', 42, NOW(), NOW());"}
+Entities: {"title": "test reminder", "reminder_offset": 1}
+Response: {"sql": "INSERT INTO tasks (title, status, priority, reminder_offset, user_id, created_at, updated_at) VALUES ('test reminder', 'pending', 'medium', 1, 42, NOW(), NOW());"}
+""",
+    "list_tasks": """
+Example:
+Entities: {"status": "pending"}
+Response: {"sql": "SELECT * FROM tasks WHERE LOWER(status) = 'pending';"}
+""",
+    "delete_task": """
+Example:
+Entities: {"id": 5}
+Response: {"sql": "DELETE FROM tasks WHERE id = 5;"}
+""",
+    "complete_task": """
+Example:
+Entities: {"id": 3}
+Response: {"sql": "UPDATE tasks SET status = 'completed', updated_at = NOW() WHERE id = 3;"}
+""",
+}
+
+# Response objects the prompts ask for; validated on every completion
+_INTENT_FIELDS = (
+    Field("intent", ("string",)),
+    Field("entities", ("object",), required=False, default=dict),
+    Field("response", ("string",), required=False, default=""),
+    Field("operations", ("array", "null"), required=False),
+)
+INTENT_SCHEMA = ResponseSchema("intent", _INTENT_FIELDS)
+COMBINED_INTENT_SCHEMA = ResponseSchema(
+    "intent_with_sql", _INTENT_FIELDS + (Field("sql", ("string", "null"), required=False),)
+)
+SQL_SCHEMA = ResponseSchema("sql", (Field("sql", ("string",)),))
+
+# Prefixes are assembled once so every request sends the exact same bytes
+_INTENT_PREFIXES = {
+    False: INTENT_PREFIX,
+    True: INTENT_PREFIX + COMBINED_SQL_SECTION,
+}
+_SQL_PREFIXES = {intent: SQL_PREFIX + examples for intent, examples in SQL_EXAMPLES.items()}
+
+
+def build_intent_prompt(user_input: str, current_time: str, user_id: Optional[int],
+                        combined: bool = False) -> SplitPrompt:
+    """
+    Build the intent-detection prompt.
+
+    Args:
+        user_input: The user's message
+        current_time: Current time string for resolving relative dates
+        user_id: Current user's ID (used by COMBINED mode SQL)
+        combined: Also ask for the SQL statement (COMBINED mode)
+
+    Returns:
+        SplitPrompt with the shared prefix and the request-specific suffix
+    """
+    suffix = (
+        f"\nCURRENT TIME: {current_time}\n"
+        f"CURRENT USER ID: {user_id if user_id is not None else 'NULL'}\n\n"
+        f"User Input: {user_input}"
+    )
+    # Only COMBINED mode answers with SQL, which embeds the user's ID
+    identity = json.dumps([user_id if combined else None, normalize_input(user_input)])
+    return SplitPrompt(_INTENT_PREFIXES[combined], suffix, identity)
+
+
+def build_sql_prompt(user_input: str, intent: str, entities: Dict[str, Any], current_time: str,
+                     user_id: Optional[int]) -> SplitPrompt:
+    """
+    Build the SQL-generation prompt for a detected intent.
+
+    Args:
+        user_input: The user's message
+        intent: Detected intent; selects the few-shot examples
+        entities: Extracted (normalized) entities
+        current_time: Current time string
+        user_id: Current user's ID
+
+    Returns:
+        SplitPrompt with the per-intent prefix and the request-specific suffix
+    """
+    prefix = _SQL_PREFIXES.get(intent, SQL_PREFIX)
+    suffix = (
+        f"\nCURRENT TIME: {current_time}\n"
+        f"CURRENT USER ID: {user_id if user_id is not None else 'NULL'}\n"
+        f"DETECTED INTENT: {intent}\n"
+        f"EXTRACTED ENTITIES: {json.dumps(entities)}\n"
+        f"USER REQUEST: {user_input}\n\n"
+        f"Now generate the SQL query:"
+    )
+    identity = json.dumps([user_id, intent, entities, normalize_input(user_input)], sort_keys=True, default=str)
+    return SplitPrompt(prefix, suffix, identity)
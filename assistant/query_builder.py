@@ -0,0 +1,416 @@
+"""Compiled, parameterized SQL for the core assistant intents.
+
+Instead of asking the LLM to write SQL text for add_task, list_tasks,
+delete_task and complete_task, the query builder compiles the detected
+intent plus entities into SQLAlchemy Core statements with bound parameters,
+always scoped to the current user. Statements are cached per "shape" (which
+filters are present), so the same SQL text is reused across requests and
+Postgres can reuse its plans. Intents or entities the builder cannot
+express return None, and the caller falls back to LLM-generated SQL.
+
+List queries are paginated: each page is capped at ``page_size`` rows and
+later pages continue after the last seen id (keyset pagination), which
+stays cheap however deep the user pages. The position is handed to clients
+as an opaque continuation token carrying only the list filters - the user
+scope always comes from the request.
+
+Messages carrying several commands compile into a CompiledBatch: all new
+tasks become one multi-row INSERT and all completions / deletions one
+``id IN (...)`` statement each, executed together in a single transaction.
+"""
+
+import base64
+import json
+from dataclasses import dataclass, field
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, FrozenSet, List, Optional, Union
+from sqlalchemy import DateTime, Integer, String, bindparam, column, delete, func, insert, select, table, update
+from sqlalchemy.sql import Executable
+from taskjarvis_logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Lightweight table definition - avoids importing the ORM models
+tasks_table = table(
+    "tasks",
+    column("id", Integer),
+    column("title", String),
+    column("status", String),
+    column("priority", String),
+    column("deadline", DateTime),
+    column("recurrence_rule", String),
+    column("reminder_offset", Integer),
+    column("user_id", Integer),
+    column("created_at", DateTime),
+    column("updated_at", DateTime),
+)
+
+LIST_COLUMNS = ("id", "title", "status", "priority", "deadline", "created_at")
+
+# Entities each intent knows how to compile; anything else goes to the LLM
+_SUPPORTED_ENTITIES = {
+    "add_task": {"title", "deadline", "priority", "status", "recurrence_rule", "reminder_offset"},
+    "list_tasks": {"status", "priority", "time_range"},
+    "delete_task": {"id", "scope"},
+    "complete_task": {"id", "scope"},
+}
+
+# Intents that can be combined in one batch, in execution order
+BATCH_INTENTS = ("add_task", "complete_task", "delete_task")
+
+
+@dataclass
+class CompiledQuery:
+    """A bound SQLAlchemy Core statement ready for TaskDB.execute_statement."""
+
+    intent: str
+    statement: Executable
+    # A list of parameter sets executes the statement once per set (executemany)
+    params: Union[Dict[str, Any], List[Dict[str, Any]]] = field(default_factory=dict)
+
+    @property
+    def sql(self) -> str:
+        """SQL text with named placeholders, for display and logging."""
+        return str(self.statement)
+
+
+@dataclass
+class CompiledBatch:
+    """Statements for a multi-command message, to run in one transaction."""
+
+    queries: List[CompiledQuery]
+
+    @property
+    def sql(self) -> str:
+        """SQL text of every statement, for display and logging."""
+        return "\n".join(f"{query.sql};" for query in self.queries)
+
+
+class TaskQueryBuilder:
+    """Compile assistant intents and entities into cached, user-scoped statements."""
+
+    def __init__(self, page_size: int = 50):
+        """
+        Args:
+            page_size: Maximum rows per list page
+        """
+        self.page_size = page_size
+
+    def build(self, intent: str, entities: Dict[str, Any], user_id: Optional[int]) -> Optional[CompiledQuery]:
+        """
+        Compile an intent into a bound statement.
+
+        Args:
+            intent: Detected intent name
+            entities: Extracted (normalized) entities
+            user_id: Current user's ID; statements are restricted to their rows
+
+        Returns:
+            CompiledQuery, or None if the builder cannot express this request
+        """
+        supported = _SUPPORTED_ENTITIES.get(intent)
+        if supported is None:
+            return None
+
+        present = {key for key, value in (entities or {}).items() if value not in (None, "")}
+        if present - supported:
+            logger.debug(f"Query builder cannot express {intent} with entities {sorted(present - supported)}")
+            return None
+
+        builder = getattr(self, f"_build_{intent}")
+        compiled = builder(entities, user_id)
+        if compiled:
+            logger.info(f"Query builder compiled {intent}: {compiled.sql}")
+        return compiled
+
+    def build_batch(self, operations: List[Dict[str, Any]], user_id: Optional[int]) -> Optional[CompiledBatch]:
+        """
+        Compile several operations into as few statements as possible.
+
+        Args:
+            operations: List of {"intent": ..., "entities": {...}} dicts
+            user_id: Current user's ID; statements are restricted to their rows
+
+        Returns:
+            CompiledBatch with at most one statement per intent, or None if any
+            operation cannot be compiled (nothing is run partially)
+        """
+        grouped: Dict[str, List[CompiledQuery]] = {}
+        for operation in operations:
+            intent = operation.get("intent")
+            if intent not in BATCH_INTENTS:
+                logger.debug(f"Query builder cannot batch intent {intent}")
+                return None
+            compiled = self.build(intent, operation.get("entities") or {}, user_id)
+            if compiled is None:
+                return None
+            grouped.setdefault(intent, []).append(compiled)
+
+        queries = []
+        if grouped.get("add_task"):
+            queries.append(CompiledQuery(
+                "add_task", _insert_statement(), [compiled.params for compiled in grouped["add_task"]]
+            ))
+
+        for intent, many_statement in (("complete_task", _complete_many_statement),
+                                       ("delete_task", _delete_many_statement)):
+            targets = grouped.get(intent)
+            if not targets:
+                continue
+            if any("task_id" not in compiled.params for compiled in targets):
+                # One of them targets every task - the others are subsumed
+                queries.append(next(compiled for compiled in targets if "task_id" not in compiled.params))
+                continue
+            params: Dict[str, Any] = {"task_ids": sorted({compiled.params["task_id"] for compiled in targets})}
+            if user_id is not None:
+                params["owner_id"] = user_id
+            queries.append(CompiledQuery(intent, many_statement(user_id is not None), params))
+
+        batch = CompiledBatch(queries)
+        logger.info(f"Query builder compiled batch of {len(operations)} operations: {batch.sql}")
+        return batch
+
+    # ============================================================
+    # INTENT BUILDERS
+    # ============================================================
+
+    def _build_add_task(self, entities: Dict[str, Any], user_id: Optional[int]) -> Optional[CompiledQuery]:
+        title = entities.get("title")
+        if not title:
+            return None
+
+        deadline = None
+        if entities.get("deadline"):
+            deadline = _resolve_deadline(entities["deadline"])
+            if deadline is None:
+                return None
+
+        reminder_offset = entities.get("reminder_offset")
+        if reminder_offset is not None:
+            try:
+                reminder_offset = int(reminder_offset)
+            except (TypeError, ValueError):
+                return None
+
+        params = {
+            "title": title,
+            "status": entities.get("status") or "pending",
+            "priority": entities.get("priority") or "medium",
+            "deadline": deadline,
+            "recurrence_rule": entities.get("recurrence_rule"),
+            "reminder_offset": reminder_offset,
+            "user_id": user_id,
+        }
+        return CompiledQuery("add_task", _insert_statement(), params)
+
+    def _build_list_tasks(self, entities: Dict[str, Any], user_id: Optional[int],
+                          after_id: Optional[int] = None) -> Optional[CompiledQuery]:
+        params: Dict[str, Any] = {}
+        filters = set()
+
+        for key in ("status", "priority"):
+            if entities.get(key):
+                params[key] = entities[key]
+                filters.add(key)
+
+        time_range = entities.get("time_range")
+        if time_range:
+            try:
+                params["start"] = datetime.strptime(time_range["start"], "%Y-%m-%d %H:%M:%S")
+                params["end"] = datetime.strptime(time_range["end"], "%Y-%m-%d %H:%M:%S")
+            except (KeyError, TypeError, ValueError):
+                return None
+            filters.add("time_range")
+
+        if after_id is not None:
+            params["after_id"] = after_id
+            filters.add("after_id")
+
+        if user_id is not None:
+            params["owner_id"] = user_id
+
+        # One extra row tells the caller whether another page exists
+        statement = _select_statement(frozenset(filters), user_id is not None, self.page_size + 1)
+        return CompiledQuery("list_tasks", statement, params)
+
+    def build_next_page(self, token: str, user_id: Optional[int]) -> Optional[CompiledQuery]:
+        """
+        Compile the list page a continuation token points to.
+
+        Args:
+            token: Token from encode_continuation()
+            user_id: Current user's ID (never taken from the token)
+
+        Returns:
+            CompiledQuery for the next page, or None if the token is invalid
+        """
+        try:
+            entities, after_id = decode_continuation(token)
+        except ValueError as e:
+            logger.warning(f"Invalid continuation token: {e}")
+            return None
+        if set(entities) - _SUPPORTED_ENTITIES["list_tasks"]:
+            return None
+        return self._build_list_tasks(entities, user_id, after_id)
+
+    def _build_delete_task(self, entities: Dict[str, Any], user_id: Optional[int]) -> Optional[CompiledQuery]:
+        target = _resolve_target(entities)
+        if target is None:
+            return None
+        params = _target_params(target, user_id)
+        return CompiledQuery("delete_task", _delete_statement(target == "all", user_id is not None), params)
+
+    def _build_complete_task(self, entities: Dict[str, Any], user_id: Optional[int]) -> Optional[CompiledQuery]:
+        target = _resolve_target(entities)
+        if target is None:
+            return None
+        params = _target_params(target, user_id)
+        return CompiledQuery("complete_task", _complete_statement(target == "all", user_id is not None), params)
+
+
+# ============================================================
+# CACHED STATEMENT SHAPES
+# ============================================================
+
+@lru_cache(maxsize=None)
+def _insert_statement():
+    t = tasks_table.c
+    return insert(tasks_table).values(
+        title=bindparam("title"),
+        status=bindparam("status"),
+        priority=bindparam("priority"),
+        deadline=bindparam("deadline", type_=DateTime),
+        recurrence_rule=bindparam("recurrence_rule"),
+        reminder_offset=bindparam("reminder_offset", type_=Integer),
+        user_id=bindparam("user_id", type_=Integer),
+        created_at=func.now(),
+        updated_at=func.now(),
+    ).returning(t.id)
+
+
+@lru_cache(maxsize=None)
+def _select_statement(filters: FrozenSet[str], scoped: bool, limit: int):
+    t = tasks_table.c
+    statement = select(*(t[name] for name in LIST_COLUMNS))
+    if "after_id" in filters:
+        statement = statement.where(t.id > bindparam("after_id"))
+    if "status" in filters:
+        statement = statement.where(func.lower(t.status) == bindparam("status"))
+    if "priority" in filters:
+        statement = statement.where(func.lower(t.priority) == bindparam("priority"))
+    if "time_range" in filters:
+        statement = statement.where(t.deadline.between(bindparam("start"), bindparam("end")))
+    if scoped:
+        statement = statement.where(t.user_id == bindparam("owner_id"))
+    return statement.order_by(t.id).limit(limit)
+
+
+@lru_cache(maxsize=None)
+def _delete_statement(all_tasks: bool, scoped: bool):
+    return delete(tasks_table).where(*_target_clauses(all_tasks, scoped))
+
+
+@lru_cache(maxsize=None)
+def _complete_statement(all_tasks: bool, scoped: bool):
+    return (
+        update(tasks_table)
+        .where(*_target_clauses(all_tasks, scoped))
+        .values(status="completed", updated_at=func.now())
+    )
+
+
+@lru_cache(maxsize=None)
+def _delete_many_statement(scoped: bool):
+    return delete(tasks_table).where(*_target_many_clauses(scoped))
+
+
+@lru_cache(maxsize=None)
+def _complete_many_statement(scoped: bool):
+    return (
+        update(tasks_table)
+        .where(*_target_many_clauses(scoped))
+        .values(status="completed", updated_at=func.now())
+    )
+
+
+# ============================================================
+# HELPERS
+# ============================================================
+
+def _target_clauses(all_tasks: bool, scoped: bool):
+    # WHERE binds must not reuse column names, or UPDATE ... SET would claim them
+    t = tasks_table.c
+    clauses = []
+    if not all_tasks:
+        clauses.append(t.id == bindparam("task_id"))
+    if scoped:
+        clauses.append(t.user_id == bindparam("owner_id"))
+    return clauses
+
+
+def _target_many_clauses(scoped: bool):
+    t = tasks_table.c
+    clauses = [t.id.in_(bindparam("task_ids", expanding=True))]
+    if scoped:
+        clauses.append(t.user_id == bindparam("owner_id"))
+    return clauses
+
+
+def _resolve_target(entities: Dict[str, Any]):
+    """Return a task id, "all", or None when the target is unclear."""
+    if entities.get("id") not in (None, ""):
+        try:
+            return int(entities["id"])
+        except (TypeError, ValueError):
+            return None
+    if str(entities.get("scope", "")).lower() == "all":
+        return "all"
+    return None
+
+
+def _target_params(target, user_id: Optional[int]) -> Dict[str, Any]:
+    params: Dict[str, Any] = {}
+    if target != "all":
+        params["task_id"] = target
+    if user_id is not None:
+        params["owner_id"] = user_id
+    return params
+
+
+def encode_continuation(entities: Dict[str, Any], after_id: int) -> str:
+    """Opaque token for the list page after ``after_id`` with the same filters."""
+    filters = {key: value for key, value in entities.items() if key in _SUPPORTED_ENTITIES["list_tasks"] and value}
+    payload = json.dumps({"f": filters, "a": after_id}, separators=(",", ":"), sort_keys=True)
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_continuation(token: str):
+    """
+    Inverse of encode_continuation.
+
+    Returns:
+        (filters, after_id)
+
+    Raises:
+        ValueError: If the token is malformed
+    """
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        filters, after_id = payload["f"], int(payload["a"])
+    except (TypeError, KeyError, ValueError, AttributeError) as e:
+        raise ValueError(f"malformed continuation token: {e}") from e
+    if not isinstance(filters, dict):
+        raise ValueError("malformed continuation token: filters must be an object")
+    return filters, after_id
+
+
+def _resolve_deadline(deadline: Any) -> Optional[datetime]:
+    """Resolve a natural-language or absolute deadline against the current time."""
+    from utils.date_parser import parse_deadline
+
+    formatted = parse_deadline(str(deadline))
+    if not formatted:
+        return None
+    return datetime.strptime(formatted, "%Y-%m-%d %H:%M:%S")
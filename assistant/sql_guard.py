@@ -0,0 +1,308 @@
+"""Guard rails for SQL written by the LLM.
+
+Compiled statements from the query builder are safe by construction, but the
+free-form fallback runs whatever text the model produced. Before such SQL
+reaches the database, SQLGuard:
+
+- accepts exactly one SELECT / INSERT / UPDATE / DELETE on the tasks table
+  alone (no joins or comma-separated FROM lists, comments, subqueries, set
+  operations, DDL or server functions);
+- scopes SELECTs to the current user with the same rule as the REST task
+  routes (own tasks plus tasks of workspaces they belong to), UPDATEs and
+  DELETEs to the user's own tasks like the query builder, and forces INSERTs
+  to use the current user's id;
+- caps SELECTs with a LIMIT;
+- rejects statements whose EXPLAIN cost estimate exceeds a threshold.
+
+Execution then happens with a statement_timeout, and SELECTs in a read-only
+transaction (see TaskDB), so one bad completion cannot take the database down.
+"""
+
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+from taskjarvis_logging.logger import get_logger
+
+logger = get_logger(__name__)
+
+USER_PARAM = "guard_user_id"
+
+# Same visibility rule as backend.tasks.routes
+SCOPE_CLAUSE = (
+    f"(user_id = :{USER_PARAM} OR workspace_id IN "
+    f"(SELECT workspace_id FROM workspace_members WHERE user_id = :{USER_PARAM}))"
+)
+# Chat writes only touch the user's own tasks, as compiled statements do
+WRITE_SCOPE_CLAUSE = f"user_id = :{USER_PARAM}"
+
+_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_FORBIDDEN = re.compile(
+    r"--|/\*|\b(?:DROP|ALTER|TRUNCATE|CREATE|GRANT|REVOKE|COPY|VACUUM|ANALYZE|EXECUTE|CALL|"
+    r"UNION|INTERSECT|EXCEPT|WITH|INTO\s+OUTFILE|pg_\w+|dblink\w*|lo_\w+)\b",
+    re.IGNORECASE
+)
+_TABLE_REF = re.compile(r"\b(?:FROM|JOIN|INTO|UPDATE)\s+([\w.\"]+)", re.IGNORECASE)
+# What follows FROM / INTO / UPDATE at the top level, up to the next clause
+_FROM_LIST = re.compile(
+    r"\b(?:FROM|INTO|UPDATE)\b(.*?)(?=\b(?:WHERE|SET|GROUP\s+BY|HAVING|ORDER\s+BY|LIMIT|OFFSET|RETURNING|"
+    r"FOR\s+UPDATE|VALUES)\b|\(|$)",
+    re.IGNORECASE | re.DOTALL
+)
+# The only acceptable FROM list: the tasks table, optionally aliased
+_TASKS_ITEM = re.compile(r'^"?tasks"?(?:\s+(?:AS\s+)?\w+)?$', re.IGNORECASE)
+_SET_CLAUSE = re.compile(r"\bSET\b(.*?)(?=\b(?:WHERE|RETURNING)\b|$)", re.IGNORECASE | re.DOTALL)
+_TAIL_CLAUSE = re.compile(r"\b(?:GROUP\s+BY|ORDER\s+BY|LIMIT|OFFSET|RETURNING|FOR\s+UPDATE)\b", re.IGNORECASE)
+_LIMIT = re.compile(r"\bLIMIT\s+(\S+)", re.IGNORECASE)
+_INSERT = re.compile(
+    r"^INSERT\s+INTO\s+tasks\s*\((?P<columns>[^()]*)\)\s*VALUES\s*(?P<values>.+?)"
+    r"(?P<returning>\s+RETURNING\s+.+)?$",
+    re.IGNORECASE | re.DOTALL
+)
+
+
+class UnsafeSQLError(Exception):
+    """Generated SQL was rejected by the guard."""
+    pass
+
+
+@dataclass
+class GuardedSQL:
+    """A rewritten statement plus the bind parameters the guard added."""
+
+    kind: str
+    sql: str
+    params: Dict[str, Any] = field(default_factory=dict)
+
+
+class SQLGuard:
+    """Validate, scope and bound LLM-generated SQL."""
+
+    def __init__(self, row_limit: int = 50, max_cost: float = 10000.0, statement_timeout_ms: int = 5000):
+        """
+        Args:
+            row_limit: LIMIT forced onto SELECTs
+            max_cost: Highest acceptable EXPLAIN total cost (0 disables the check)
+            statement_timeout_ms: statement_timeout applied when executing
+        """
+        self.row_limit = row_limit
+        self.max_cost = max_cost
+        self.statement_timeout_ms = statement_timeout_ms
+
+    def prepare(self, sql: str, user_id: Optional[int]) -> GuardedSQL:
+        """
+        Validate and rewrite one generated statement.
+
+        Args:
+            sql: SQL text from the LLM
+            user_id: Current user's ID; None (single-user CLI) skips scoping
+
+        Returns:
+            GuardedSQL ready to execute
+
+        Raises:
+            UnsafeSQLError: If the statement is not allowed
+        """
+        masked, literals = _mask_literals(sql.strip().rstrip(";").strip())
+        if not masked:
+            raise UnsafeSQLError("empty statement")
+        if ";" in masked:
+            raise UnsafeSQLError("only one statement is allowed")
+        if _FORBIDDEN.search(masked):
+            raise UnsafeSQLError(f"forbidden construct: {_FORBIDDEN.search(masked).group(0)}")
+
+        kind = masked.split(None, 1)[0].upper()
+        if kind not in ("SELECT", "INSERT", "UPDATE", "DELETE"):
+            raise UnsafeSQLError(f"{kind} statements are not allowed")
+        if len(re.findall(r"\bSELECT\b", masked, re.IGNORECASE)) > (kind == "SELECT"):
+            raise UnsafeSQLError("subqueries are not allowed")
+        tables = {name.strip('"').lower() for name in _TABLE_REF.findall(masked)}
+        if tables != {"tasks"}:
+            raise UnsafeSQLError(f"only the tasks table may be used (found: {', '.join(sorted(tables)) or 'none'})")
+        # The scope clause only covers the tasks rows, so nothing may be joined to them
+        for item in _FROM_LIST.findall(_blank_parentheses(masked)):
+            if not _TASKS_ITEM.match(item.strip()):
+                raise UnsafeSQLError(f"only the tasks table alone may be queried (found: {item.strip() or 'nothing'})")
+
+        params: Dict[str, Any] = {}
+        if kind == "INSERT":
+            masked = self._rewrite_insert(masked, user_id)
+        else:
+            if kind == "UPDATE" and {"user_id", "workspace_id"} & _set_targets(masked):
+                raise UnsafeSQLError("changing a task's owner or workspace is not allowed")
+            if user_id is not None:
+                masked = _add_condition(masked, SCOPE_CLAUSE if kind == "SELECT" else WRITE_SCOPE_CLAUSE)
+            if kind == "SELECT":
+                masked = self._apply_limit(masked)
+
+        if user_id is not None:
+            params[USER_PARAM] = user_id
+
+        guarded = GuardedSQL(kind, _unmask_literals(masked, literals), params)
+        logger.info(f"SQL guard rewrote {kind}: {guarded.sql}")
+        return guarded
+
+    def check_cost(self, guarded: GuardedSQL, cost: Optional[float]):
+        """
+        Enforce the cost threshold on an EXPLAIN estimate.
+
+        Args:
+            guarded: The prepared statement
+            cost: EXPLAIN total cost, or None if the database cannot estimate it
+
+        Raises:
+            UnsafeSQLError: If the estimate exceeds max_cost
+        """
+        if cost is None or not self.max_cost:
+            return
+        if cost > self.max_cost:
+            logger.warning(f"SQL guard rejected {guarded.kind} with estimated cost {cost:.0f}: {guarded.sql}")
+            raise UnsafeSQLError(f"estimated cost {cost:.0f} exceeds the limit of {self.max_cost:.0f}")
+
+    # ============================================================
+    # REWRITES
+    # ============================================================
+
+    def _apply_limit(self, masked: str) -> str:
+        match = _LIMIT.search(masked)
+        if not match:
+            return f"{masked} LIMIT {self.row_limit}"
+        value = match.group(1)
+        if value.isdigit() and int(value) <= self.row_limit:
+            return masked
+        return masked[:match.start(1)] + str(self.row_limit) + masked[match.end(1):]
+
+    def _rewrite_insert(self, masked: str, user_id: Optional[int]) -> str:
+        match = _INSERT.match(masked)
+        if not match:
+            raise UnsafeSQLError("INSERT must be INSERT INTO tasks (columns) VALUES (...)")
+        columns = [column.strip() for column in match.group("columns").split(",")]
+        rows = _split_tuples(match.group("values"))
+        owner = f":{USER_PARAM}" if user_id is not None else "NULL"
+
+        lowered = [column.strip('"').lower() for column in columns]
+        if "workspace_id" in lowered:
+            raise UnsafeSQLError("adding tasks to a workspace is not allowed from chat")
+        if "user_id" in lowered:
+            index = lowered.index("user_id")
+            for row in rows:
+                if len(row) != len(columns):
+                    raise UnsafeSQLError("INSERT column and value counts differ")
+                row[index] = owner
+        else:
+            columns.append("user_id")
+            for row in rows:
+                row.append(owner)
+
+        values = ", ".join(f"({', '.join(row)})" for row in rows)
+        return f"INSERT INTO tasks ({', '.join(columns)}) VALUES {values}{match.group('returning') or ''}"
+
+
+# ============================================================
+# HELPERS
+# ============================================================
+
+def _mask_literals(sql: str) -> Tuple[str, List[str]]:
+    """Replace string literals with placeholders so keywords inside them are ignored."""
+    literals: List[str] = []
+
+    def _stash(match):
+        literals.append(match.group(0))
+        return f"'{len(literals) - 1}'"
+
+    return _LITERAL.sub(_stash, sql), literals
+
+
+def _unmask_literals(masked: str, literals: List[str]) -> str:
+    return re.sub(r"'(\d+)'", lambda match: literals[int(match.group(1))], masked)
+
+
+def _blank_parentheses(masked: str) -> str:
+    """Blank out everything inside parentheses, leaving the top-level clauses."""
+    depth, chars = 0, []
+    for char in masked:
+        if char == ")":
+            depth = max(0, depth - 1)
+        chars.append(" " if depth and char != ")" else char)
+        if char == "(":
+            depth += 1
+    return "".join(chars)
+
+
+def _split_top_level(text: str) -> List[str]:
+    """Split on commas outside parentheses."""
+    parts, depth, current = [], 0, ""
+    for char in text:
+        depth += (char == "(") - (char == ")")
+        if char == "," and depth == 0:
+            parts.append(current)
+            current = ""
+        else:
+            current += char
+    return parts + [current]
+
+
+def _set_targets(masked: str) -> Set[str]:
+    """
+    Column names an UPDATE assigns to, lowercased and unquoted.
+
+    Handles quoted and qualified names and row constructors such as
+    ``SET (user_id, title) = (1, 'x')``.
+    """
+    match = _SET_CLAUSE.search(masked)
+    if not match:
+        return set()
+    targets = set()
+    for assignment in _split_top_level(match.group(1)):
+        target = assignment.split("=", 1)[0].replace("(", " ").replace(")", " ")
+        for name in target.split(","):
+            name = name.strip().split(".")[-1].strip().strip('"').lower()
+            if name:
+                targets.add(name)
+    return targets
+
+
+def _add_condition(masked: str, condition: str) -> str:
+    """AND a condition into the WHERE clause (or add one) ahead of any trailing clause."""
+    where = re.search(r"\bWHERE\b", masked, re.IGNORECASE)
+    search_from = where.end() if where else 0
+    tail = _TAIL_CLAUSE.search(masked, search_from)
+    tail_start = tail.start() if tail else len(masked)
+
+    if where:
+        existing = masked[where.end():tail_start].strip()
+        body = f"{masked[:where.start()]}WHERE {condition} AND ({existing})"
+    else:
+        body = f"{masked[:tail_start].rstrip()} WHERE {condition}"
+    rest = masked[tail_start:].strip()
+    return f"{body} {rest}" if rest else body
+
+
+def _split_tuples(values: str) -> List[List[str]]:
+    """Split "(a, f(b, c)), (d, e)" into [["a", "f(b, c)"], ["d", "e"]]."""
+    rows: List[List[str]] = []
+    depth, current, row = 0, "", None
+    for char in values:
+        if char == "(":
+            depth += 1
+            if depth == 1:
+                row, current = [], ""
+                continue
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                row.append(current.strip())
+                rows.append(row)
+                row = None
+                continue
+        if depth == 0:
+            if char not in ", \n\t":
+                raise UnsafeSQLError("INSERT ... VALUES must be a list of tuples")
+            continue
+        if depth == 1 and char == ",":
+            row.append(current.strip())
+            current = ""
+        else:
+            current += char
+    if depth != 0 or not rows:
+        raise UnsafeSQLError("unbalanced INSERT values")
+    return rows
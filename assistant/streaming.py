@@ -0,0 +1,116 @@
+"""Incremental extraction of conversational text from a streamed JSON completion.
+
+The intent prompt asks the model for a JSON object whose "response" field is
+the user-facing message. When the completion is streamed, that message can be
+shown to the user as soon as its characters arrive - long before the JSON
+object is complete and the task query has run.
+"""
+
+import json
+from dataclasses import dataclass
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+@dataclass
+class StreamEvent:
+    """
+    One server-sent event: "delta" carries streamed text, "result" the final
+    reply, "continuation" a next-page token and "error" a failure.
+    """
+
+    type: str
+    data: str
+
+    def to_sse(self) -> str:
+        """Encode as a text/event-stream frame."""
+        key = {"delta": "text", "result": "response", "continuation": "continuation_token"}.get(self.type, "detail")
+        return f"event: {self.type}\ndata: {json.dumps({key: self.data})}\n\n"
+
+
+class JSONStringFieldStreamer:
+    """
+    Feed raw completion chunks, get back newly decoded characters of one string field.
+
+    Only the first occurrence of the field is decoded. Chunk boundaries may fall
+    anywhere, including inside the key or an escape sequence.
+    """
+
+    def __init__(self, field: str):
+        self._key = f'"{field}"'
+        self._buffer = ""
+        self._pos = 0
+        self._state = "key"  # key -> colon -> open_quote -> value -> done
+
+    def feed(self, chunk: str) -> str:
+        """
+        Consume a chunk of the completion.
+
+        Args:
+            chunk: Next piece of raw model output
+
+        Returns:
+            Decoded field text that became available with this chunk (may be empty)
+        """
+        self._buffer += chunk
+        out = []
+
+        while self._state != "done":
+            if self._state == "key":
+                idx = self._buffer.find(self._key, self._pos)
+                if idx == -1:
+                    # Keep a tail in case the key is split across chunks
+                    self._pos = max(self._pos, len(self._buffer) - len(self._key) + 1)
+                    break
+                self._pos = idx + len(self._key)
+                self._state = "colon"
+
+            elif self._state in ("colon", "open_quote"):
+                self._skip_whitespace()
+                if self._pos >= len(self._buffer):
+                    break
+                expected = ":" if self._state == "colon" else '"'
+                if self._buffer[self._pos] != expected:
+                    # The key text appeared somewhere else (e.g. inside a value) - keep looking
+                    self._state = "key"
+                    continue
+                self._pos += 1
+                self._state = "open_quote" if self._state == "colon" else "value"
+
+            else:  # value
+                if self._pos >= len(self._buffer):
+                    break
+                char = self._buffer[self._pos]
+                if char == '"':
+                    self._pos += 1
+                    self._state = "done"
+                elif char == "\\":
+                    decoded, consumed = self._decode_escape()
+                    if consumed == 0:
+                        break  # incomplete escape - wait for more input
+                    out.append(decoded)
+                    self._pos += consumed
+                else:
+                    out.append(char)
+                    self._pos += 1
+
+        return "".join(out)
+
+    def _skip_whitespace(self):
+        while self._pos < len(self._buffer) and self._buffer[self._pos].isspace():
+            self._pos += 1
+
+    def _decode_escape(self):
+        """Decode the escape at the current position; returns (text, chars consumed) or ("", 0)."""
+        remaining = self._buffer[self._pos:]
+        if len(remaining) < 2:
+            return "", 0
+        code = remaining[1]
+        if code == "u":
+            if len(remaining) < 6:
+                return "", 0
+            try:
+                return chr(int(remaining[2:6], 16)), 6
+            except ValueError:
+                return remaining[:6], 6
+        return _ESCAPES.get(code, code), 2
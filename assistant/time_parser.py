@@ -6,7 +6,6 @@ and relative expressions (in 3 days, within 2 hours).
 """
 
 import re
-import dateparser
 from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Tuple
@@ -319,6 +318,9 @@ def _create_past_range(reference_time: datetime, amount: int, unit: str) -> Time
 
 def _parse_range_endpoints(start_text: str, end_text: str, reference_time: datetime) -> Optional[TimeRange]:
     """Parse start and end points of an explicit range."""
+    # dateparser is slow to import; only explicit ranges need it
+    import dateparser
+    
     try:
         start_parsed = dateparser.parse(start_text, settings={'RELATIVE_BASE': reference_time, 'PREFER_DATES_FROM': 'past', 'RETURN_AS_TIMEZONE_AWARE': False})
         end_parsed = dateparser.parse(end_text, settings={'RELATIVE_BASE': reference_time, 'PREFER_DATES_FROM': 'future', 'RETURN_AS_TIMEZONE_AWARE': False})
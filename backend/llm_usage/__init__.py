@@ -0,0 +1 @@
+# LLM usage accounting module
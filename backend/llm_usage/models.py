@@ -0,0 +1,28 @@
+"""Per-minute rollups of LLM calls per model, stage and user"""
+
+from sqlalchemy import Column, Integer, String, Float, DateTime, Index
+from backend.database.base import Base
+
+
+class LLMUsageRollup(Base):
+    __tablename__ = "llm_usage_rollups"
+
+    id = Column(Integer, primary_key=True, index=True)
+    bucket_start = Column(DateTime, nullable=False, index=True)
+    model = Column(String, nullable=False)
+    stage = Column(String, nullable=False)
+    # Not a foreign key: usage history outlives deleted users
+    user_id = Column(Integer, nullable=True, index=True)
+
+    calls = Column(Integer, nullable=False, default=0)
+    errors = Column(Integer, nullable=False, default=0)
+    retries = Column(Integer, nullable=False, default=0)
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    cost_usd = Column(Float, nullable=False, default=0.0)
+    latency_ms_sum = Column(Float, nullable=False, default=0.0)
+    latency_ms_max = Column(Float, nullable=False, default=0.0)
+
+    __table_args__ = (
+        Index("ix_llm_usage_rollups_bucket_model", "bucket_start", "model"),
+    )
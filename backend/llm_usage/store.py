@@ -0,0 +1,53 @@
+"""Persistence and queries of LLM usage rollups"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+from assistant.llm.accounting import check_group_by, summary_row
+from backend.llm_usage.models import LLMUsageRollup
+
+SUMMED = ("calls", "errors", "retries", "prompt_tokens", "completion_tokens", "cost_usd", "latency_ms_sum")
+
+
+def save_rollups(db: Session, rows: List[Dict[str, Any]]):
+    """Insert rollup rows drained from the UsageLedger."""
+    db.bulk_insert_mappings(LLMUsageRollup, rows)
+    db.commit()
+
+
+def query_usage(db: Session, group_by: Sequence[str] = ("model",), since: Optional[datetime] = None,
+                user_id: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    Totals of the stored rollups per group, most expensive first.
+
+    Args:
+        db: Database session
+        group_by: Any of "model", "stage" and "user_id"
+        since: Only buckets starting at or after this (naive UTC) time
+        user_id: Only calls made for this user
+
+    Returns:
+        One dict per group with its key fields, totals and average latency
+    """
+    group_by = check_group_by(group_by)
+    keys = [getattr(LLMUsageRollup, name) for name in group_by]
+    totals = [func.coalesce(func.sum(getattr(LLMUsageRollup, name)), 0).label(name) for name in SUMMED]
+    query = db.query(*keys, *totals, func.max(LLMUsageRollup.latency_ms_max).label("latency_ms_max"))
+    if since is not None:
+        query = query.filter(LLMUsageRollup.bucket_start >= since)
+    if user_id is not None:
+        query = query.filter(LLMUsageRollup.user_id == user_id)
+    if keys:
+        query = query.group_by(*keys)
+
+    rows = []
+    for result in query.all():
+        values = result._mapping
+        if not values["calls"]:
+            continue
+        rows.append({
+            **{name: values[name] for name in group_by},
+            **summary_row({**{name: values[name] for name in SUMMED}, "latency_ms_max": values["latency_ms_max"] or 0.0}),
+        })
+    return sorted(rows, key=lambda row: row["cost_usd"], reverse=True)
@@ -16,6 +16,7 @@ from backend.database.base import Base
 from backend.users.models import User
 from backend.workspaces.models import Workspace, WorkspaceMember
 from backend.tasks.models import Task
+from backend.llm_usage.models import LLMUsageRollup
 
 # This is the Alembic Config object
 config = context.config
@@ -0,0 +1,42 @@
+"""Alembic migration script template"""
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7c1e9d2a41'
+down_revision = 'e5fa81aa3f2c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('llm_usage_rollups',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('bucket_start', sa.DateTime(), nullable=False),
+    sa.Column('model', sa.String(), nullable=False),
+    sa.Column('stage', sa.String(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('calls', sa.Integer(), nullable=False),
+    sa.Column('errors', sa.Integer(), nullable=False),
+    sa.Column('retries', sa.Integer(), nullable=False),
+    sa.Column('prompt_tokens', sa.Integer(), nullable=False),
+    sa.Column('completion_tokens', sa.Integer(), nullable=False),
+    sa.Column('cost_usd', sa.Float(), nullable=False),
+    sa.Column('latency_ms_sum', sa.Float(), nullable=False),
+    sa.Column('latency_ms_max', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_llm_usage_rollups_id'), 'llm_usage_rollups', ['id'], unique=False)
+    op.create_index(op.f('ix_llm_usage_rollups_bucket_start'), 'llm_usage_rollups', ['bucket_start'], unique=False)
+    op.create_index(op.f('ix_llm_usage_rollups_user_id'), 'llm_usage_rollups', ['user_id'], unique=False)
+    op.create_index('ix_llm_usage_rollups_bucket_model', 'llm_usage_rollups', ['bucket_start', 'model'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_llm_usage_rollups_bucket_model', table_name='llm_usage_rollups')
+    op.drop_index(op.f('ix_llm_usage_rollups_user_id'), table_name='llm_usage_rollups')
+    op.drop_index(op.f('ix_llm_usage_rollups_bucket_start'), table_name='llm_usage_rollups')
+    op.drop_index(op.f('ix_llm_usage_rollups_id'), table_name='llm_usage_rollups')
+    op.drop_table('llm_usage_rollups')
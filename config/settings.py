@@ -1,3 +1,4 @@
+import json
 import os
 from pathlib import Path
 
@@ -20,6 +21,84 @@ LLM_PROVIDER = os.getenv("LLM_PROVIDER", "OPENROUTER")  # OPENROUTER, MOCK
 # OpenRouter Configuration
 OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
 OPENROUTER_MODEL = os.getenv("OPENROUTER_MODEL", "anthropic/claude-3.5-sonnet")
+# Point at a local stand-in (python -m assistant.llm.fake_server) for offline load tests
+OPENROUTER_BASE_URL = os.getenv("OPENROUTER_BASE_URL", "https://openrouter.ai/api/v1")
+# How JSON replies are requested: json_schema (schema-constrained), json_object (JSON mode) or none
+OPENROUTER_RESPONSE_FORMAT = os.getenv("OPENROUTER_RESPONSE_FORMAT", "json_schema")
+
+# Per-stage models; empty uses OPENROUTER_MODEL. In COMBINED mode the intent call
+# also writes the reply and SQL, so a small intent model suits TWO_STEP best.
+ASSISTANT_INTENT_MODEL = os.getenv("ASSISTANT_INTENT_MODEL", "")
+ASSISTANT_SQL_MODEL = os.getenv("ASSISTANT_SQL_MODEL", "")
+ASSISTANT_CONVERSATION_MODEL = os.getenv("ASSISTANT_CONVERSATION_MODEL", "")
+# Backup per stage, used while the stage model's rolling p95 exceeds the budget (0 disables)
+ASSISTANT_INTENT_BACKUP_MODEL = os.getenv("ASSISTANT_INTENT_BACKUP_MODEL", "")
+ASSISTANT_SQL_BACKUP_MODEL = os.getenv("ASSISTANT_SQL_BACKUP_MODEL", "")
+ASSISTANT_CONVERSATION_BACKUP_MODEL = os.getenv("ASSISTANT_CONVERSATION_BACKUP_MODEL", "")
+MODEL_ROUTING_P95_BUDGET_MS = float(os.getenv("MODEL_ROUTING_P95_BUDGET_MS", "0"))
+
+# Circuit breaker: fail LLM calls fast (offline handling) once this share of the last
+# LLM_BREAKER_WINDOW calls failed or took over LLM_BREAKER_SLOW_CALL_MS; probe again after the cool-down
+LLM_CIRCUIT_BREAKER = os.getenv("LLM_CIRCUIT_BREAKER", "true").lower() == "true"
+LLM_BREAKER_FAILURE_RATE = float(os.getenv("LLM_BREAKER_FAILURE_RATE", "0.5"))
+LLM_BREAKER_SLOW_CALL_MS = float(os.getenv("LLM_BREAKER_SLOW_CALL_MS", "20000"))
+LLM_BREAKER_WINDOW = int(os.getenv("LLM_BREAKER_WINDOW", "20"))
+LLM_BREAKER_OPEN_SECONDS = float(os.getenv("LLM_BREAKER_OPEN_SECONDS", "30"))
+
+# Client-side LLM rate limits (0 disables); calls queue up to LLM_RATE_LIMIT_MAX_WAIT seconds.
+# The state file shares the limits between all workers on the host; empty keeps them per-process.
+LLM_RATE_LIMIT_RPM = float(os.getenv("LLM_RATE_LIMIT_RPM", "0"))
+LLM_RATE_LIMIT_TPM = float(os.getenv("LLM_RATE_LIMIT_TPM", "0"))
+LLM_RATE_LIMIT_MAX_WAIT = float(os.getenv("LLM_RATE_LIMIT_MAX_WAIT", "10"))
+LLM_RATE_LIMIT_STATE_FILE = os.getenv("LLM_RATE_LIMIT_STATE_FILE", "/tmp/taskjarvis-llm-rate-limit.json")
+
+# Hedged requests (opt-in): a call slower than this percentile of recent calls (and at least
+# LLM_HEDGE_MIN_DELAY_MS) gets a duplicate, optionally on a backup model; the first answer wins
+LLM_HEDGE = os.getenv("LLM_HEDGE", "false").lower() == "true"
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "0.95"))
+LLM_HEDGE_MIN_DELAY_MS = float(os.getenv("LLM_HEDGE_MIN_DELAY_MS", "500"))
+LLM_HEDGE_BACKUP_MODEL = os.getenv("LLM_HEDGE_BACKUP_MODEL", "")
+
+# Per-call LLM accounting (tokens, latency, retries, cost per model, stage and user), rolled up
+# every minute into llm_usage_rollups. LLM_PRICES adds or overrides USD per million tokens:
+# {"openai/gpt-4o": [2.5, 10.0]} (prompt, completion)
+LLM_ACCOUNTING = os.getenv("LLM_ACCOUNTING", "true").lower() == "true"
+LLM_PRICES = json.loads(os.getenv("LLM_PRICES", "{}"))
+# Emails of operators who may read every user's usage from /assistant/usage; others see only their own
+LLM_USAGE_OPERATORS = {
+    email.strip().lower() for email in os.getenv("LLM_USAGE_OPERATORS", "").split(",") if email.strip()
+}
+
+# On-disk LLM response cache: passthrough (off), record (serve hits, store misses) or
+# replay (hits only, no network) - e.g. LLM_CACHE_MODE=replay for regression suites
+LLM_CACHE_MODE = os.getenv("LLM_CACHE_MODE", "passthrough")
+LLM_CACHE_PATH = os.getenv("LLM_CACHE_PATH", str(BASE_DIR / ".llm_cache.sqlite3"))
+LLM_CACHE_MAX_MB = float(os.getenv("LLM_CACHE_MAX_MB", "100"))
+
+# Assistant pipeline mode:
+# - TWO_STEP: intent detection call, plus a separate SQL generation call when
+#   the query builder cannot compile the request
+# - COMBINED (opt-in): the intent call also returns SQL for such requests
+ASSISTANT_MODE = os.getenv("ASSISTANT_MODE", "TWO_STEP")  # TWO_STEP, COMBINED
+
+# Rule-based recognizer that answers common commands without calling the LLM
+ASSISTANT_FAST_PATH = os.getenv("ASSISTANT_FAST_PATH", "true").lower() == "true"
+
+# Intent cache (LRU + TTL) for repeated phrasings; size 0 disables it
+INTENT_CACHE_SIZE = int(os.getenv("INTENT_CACHE_SIZE", "1024"))
+INTENT_CACHE_TTL = float(os.getenv("INTENT_CACHE_TTL", "600"))  # seconds
+INTENT_CACHE_BUCKET_SECONDS = int(os.getenv("INTENT_CACHE_BUCKET_SECONDS", "3600"))
+
+# Maximum rows shown per assistant list reply; further pages use a continuation token
+ASSISTANT_PAGE_SIZE = int(os.getenv("ASSISTANT_PAGE_SIZE", "50"))
+
+# Bulk natural-language import: lines per request and concurrent LLM calls
+ASSISTANT_IMPORT_MAX_LINES = int(os.getenv("ASSISTANT_IMPORT_MAX_LINES", "500"))
+ASSISTANT_IMPORT_CONCURRENCY = int(os.getenv("ASSISTANT_IMPORT_CONCURRENCY", "8"))
+
+# Guard for AI-written SQL: EXPLAIN cost ceiling (0 disables) and per-statement timeout
+SQL_GUARD_MAX_COST = float(os.getenv("SQL_GUARD_MAX_COST", "10000"))
+SQL_GUARD_STATEMENT_TIMEOUT_MS = int(os.getenv("SQL_GUARD_STATEMENT_TIMEOUT_MS", "5000"))
 
 # OpenRouter Model Options (for reference):
 # - anthropic/claude-3.5-sonnet (best for structured output, SQL generation)
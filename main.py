@@ -4,13 +4,14 @@ import argparse
 from dotenv import load_dotenv
 from tasks.task_db import TaskDB
 from assistant.assistant import TaskAssistant
+from assistant.llm.factory import LLMFactory
 
 # Load environment variables
 load_dotenv()
 
 def get_provider_choice():
     """Interactive prompt to select AI provider."""
-    providers = ["OPENROUTER", "MOCK"]
+    providers = LLMFactory.providers()
     
     print("\nSelect AI Provider:")
     for i, p in enumerate(providers, 1):
@@ -50,6 +51,7 @@ def main():
     try:
         db = TaskDB()
         assistant = TaskAssistant(db, provider=provider, model_name=args.model)
+        print(f"AI Assistant: {assistant.llm_client.provider_name} - {assistant.llm_client.model_name}")
         
         print("\nTaskJarvis AI is ready! Type 'help' for commands or just ask naturally.")
         print("Example: 'Add a high priority task to finish the report by Friday'")
@@ -2,6 +2,8 @@ from apscheduler.schedulers.background import BackgroundScheduler
 from datetime import datetime, timedelta
 from sqlalchemy import text
 from backend.database import SessionLocal
+from backend.llm_usage.store import save_rollups
+from assistant.llm.accounting import llm_ledger
 from services.notification_manager import NotificationManager
 from utils.recurrence import get_next_occurrence
 import logging
@@ -40,6 +42,16 @@ class ReminderScheduler:
             )
             print("   ✅ Added process_recurring_tasks job (runs every 1 hour)")
             
+            # Write per-minute LLM usage rollups to the database
+            self.scheduler.add_job(
+                self.rollup_llm_usage,
+                'interval',
+                minutes=1,
+                id='rollup_llm_usage',
+                replace_existing=True
+            )
+            print("   ✅ Added rollup_llm_usage job (runs every 1 minute)")
+            
             self.scheduler.start()
             print("   ✅ Scheduler started successfully!")
             logger.info("Reminder scheduler started")
@@ -51,9 +63,10 @@ class ReminderScheduler:
             traceback.print_exc()
         
     def stop(self):
-        """Stop the scheduler."""
+        """Stop the scheduler, writing any LLM usage not rolled up yet."""
         print("🛑 Stopping reminder scheduler...")
         self.scheduler.shutdown()
+        self.rollup_llm_usage()
         logger.info("Reminder scheduler stopped")
         
     def check_reminders(self):
@@ -209,6 +222,20 @@ class ReminderScheduler:
         finally:
             db.close()
 
+    def rollup_llm_usage(self):
+        """Move pending LLM usage rollups from memory to llm_usage_rollups."""
+        db = SessionLocal()
+        try:
+            flushed = llm_ledger.flush(lambda rows: save_rollups(db, rows))
+            if flushed:
+                logger.info(f"Stored {flushed} LLM usage rollups")
+        except Exception as e:
+            # The rollups stay in memory and are retried on the next run
+            logger.error(f"Error storing LLM usage rollups: {e}")
+            db.rollback()
+        finally:
+            db.close()
+
 # Global scheduler instance
 scheduler = None
 
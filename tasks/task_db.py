@@ -1,5 +1,8 @@
-from typing import List, Optional, Any
+import json
+from itertools import islice
+from typing import List, Optional, Any, Dict, Tuple, Union
 from sqlalchemy import text
+from sqlalchemy.sql import Executable
 from backend.database import SessionLocal
 from tasks.task import Task
 from taskjarvis_logging.logger import get_logger
@@ -12,9 +15,10 @@ class TaskDB:
         self.session = SessionLocal()
         logger.info("TaskDB initialized with PostgreSQL session")
 
-    def execute_query(self, query: str, params: tuple = None) -> Any:
+    def execute_query(self, query: str, params: tuple = None, statement_timeout_ms: Optional[int] = None) -> Any:
         """Execute a raw SQL query"""
         try:
+            self._limit_transaction(statement_timeout_ms=statement_timeout_ms)
             if params:
                 result = self.session.execute(text(query), params)
             else:
@@ -26,6 +30,82 @@ class TaskDB:
             logger.error(f"Query execution failed: {e}")
             raise
 
+    def execute_statement(self, statement: Executable, params: Optional[Dict[str, Any]] = None,
+                          statement_timeout_ms: Optional[int] = None) -> Union[List[Any], int]:
+        """Execute a write statement with bound parameters; returns its RETURNING rows, else the affected row count"""
+        try:
+            self._limit_transaction(statement_timeout_ms=statement_timeout_ms)
+            result = self.session.execute(statement, params or {})
+            # Fetch RETURNING rows before the commit closes the cursor
+            outcome = result.all() if result.returns_rows else result.rowcount
+            self.session.commit()
+            return outcome
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Statement execution failed: {e}")
+            raise
+
+    def fetch_rows(self, query: Union[str, Executable], params: Optional[Dict[str, Any]] = None,
+                   max_rows: int = 100, read_only: bool = False,
+                   statement_timeout_ms: Optional[int] = None) -> List[Any]:
+        """Fetch at most max_rows rows of a SELECT, streaming them from a server-side cursor"""
+        statement = text(query) if isinstance(query, str) else query
+        try:
+            self._limit_transaction(read_only, statement_timeout_ms)
+            result = self.session.execute(
+                statement.execution_options(stream_results=True, yield_per=min(max_rows, 500)),
+                params or {}
+            )
+            try:
+                rows = list(islice(result, max_rows))
+            finally:
+                result.close()
+            self.session.commit()
+            return rows
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Row fetch failed: {e}")
+            raise
+
+    def explain_cost(self, query: str, params: Optional[Dict[str, Any]] = None) -> Optional[float]:
+        """Planner's total cost estimate for a raw SQL statement (PostgreSQL only, None elsewhere)"""
+        if self.session.get_bind().dialect.name != "postgresql":
+            return None
+        try:
+            plan = self.session.execute(text(f"EXPLAIN (FORMAT JSON) {query}"), params or {}).scalar()
+            self.session.commit()
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"EXPLAIN failed: {e}")
+            raise
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return float(plan[0]["Plan"]["Total Cost"])
+
+    def _limit_transaction(self, read_only: bool = False, statement_timeout_ms: Optional[int] = None):
+        """Make the transaction about to start read-only and/or time-limited (PostgreSQL only)"""
+        if self.session.get_bind().dialect.name != "postgresql":
+            return
+        if read_only:
+            self.session.execute(text("SET TRANSACTION READ ONLY"))
+        if statement_timeout_ms:
+            self.session.execute(text(f"SET LOCAL statement_timeout = {int(statement_timeout_ms)}"))
+
+    def execute_batch(self, statements: List[Tuple[Executable, Any]]) -> List[Any]:
+        """Execute several prebuilt statements in one transaction; a list of params runs executemany"""
+        try:
+            results = []
+            for statement, params in statements:
+                result = self.session.execute(statement, params or {})
+                # Fetch RETURNING rows before the commit closes the cursor
+                results.append(result.all() if result.returns_rows else result.rowcount)
+            self.session.commit()
+            return results
+        except Exception as e:
+            self.session.rollback()
+            logger.error(f"Batch execution failed: {e}")
+            raise
+
     def add_task(self, task: Task) -> int:
         """Add a task using raw SQL (legacy support)"""
         query = """
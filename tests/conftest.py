@@ -0,0 +1,85 @@
+"""Shared fixtures for assistant pipeline tests that run without an LLM or database."""
+
+import pytest
+from assistant.llm.base_llm import BaseLLMClient
+
+
+class ScriptedLLMClient(BaseLLMClient):
+    """LLM client that replays scripted responses and records prompts."""
+
+    def __init__(self, responses):
+        super().__init__(None, None)
+        self.responses = list(responses)
+        self.prompts = []
+
+    @property
+    def provider_name(self) -> str:
+        return "Scripted"
+
+    @property
+    def default_model(self) -> str:
+        return "scripted-model"
+
+    def generate(self, prompt: str) -> str:
+        self.prompts.append(prompt)
+        return self.responses.pop(0)
+
+
+class RecordingDB:
+    """Minimal TaskDB stand-in that records executed queries."""
+
+    def __init__(self):
+        self.queries = []
+        self.statements = []
+        self.rows = []
+        self.cost = None
+
+    def execute_statement(self, statement, params=None, statement_timeout_ms=None):
+        self.statements.append((statement, params))
+        self.execute_query(str(statement), params)
+        return [(1,)] if "RETURNING" in str(statement).upper() else 1
+
+    def fetch_rows(self, query, params=None, max_rows=100, read_only=False, statement_timeout_ms=None):
+        self.statements.append((query, params))
+        return self.rows[:max_rows]
+
+    def execute_batch(self, statements):
+        self.statements.extend(statements)
+        return [
+            [(n,) for n in range(1, len(params) + 1)] if isinstance(params, list) else 1
+            for statement, params in statements
+        ]
+
+    def explain_cost(self, query, params=None):
+        return self.cost
+
+    def execute_query(self, query, params=None, statement_timeout_ms=None):
+        self.queries.append(query)
+
+        class _Result:
+            rowcount = 1
+
+            def fetchall(self):
+                return []
+
+            def scalar(self):
+                return 1
+
+        return _Result()
+
+
+@pytest.fixture
+def make_assistant():
+    """Factory for a TaskAssistant wired to a scripted LLM and a recording DB."""
+
+    # Imported lazily: TaskAssistant needs DATABASE_URL, other test modules don't
+    from assistant.assistant import TaskAssistant
+
+    def _make(mode, responses):
+        db = RecordingDB()
+        assistant = TaskAssistant(db, provider="MOCK", mode=mode)
+        assistant.llm_client = ScriptedLLMClient(responses)
+        assistant.current_user_id = 7
+        return assistant, db
+
+    return _make
@@ -0,0 +1,168 @@
+"""Tests for per-call LLM accounting and its rollups."""
+
+import asyncio
+from types import SimpleNamespace
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from assistant.llm.accounting import UsageLedger, estimate_cost
+from assistant.llm.usage import llm_stage, llm_user
+
+
+class TestUsageLedger:
+
+    def test_cost_is_estimated_from_prices(self):
+        ledger = UsageLedger(prices={"openai/gpt-4o": (2.5, 10.0)})
+        record = ledger.record("openai/gpt-4o", "intent", 1, 1000, 100, 0.5)
+        assert record.cost == pytest.approx(0.0035)
+        assert estimate_cost("unknown/model", 1000, 100, ledger.prices) == 0.0
+        assert estimate_cost("openai/gpt-4o:free", 1000, 100, ledger.prices) == 0.0
+
+    def test_provider_reported_cost_wins(self):
+        ledger = UsageLedger()
+        assert ledger.record("openai/gpt-4o", "sql", None, 1000, 100, 0.5, cost=0.01).cost == 0.01
+
+    def test_summarize_groups_and_orders_by_cost(self):
+        ledger = UsageLedger(prices={"big": (10.0, 10.0), "small": (0.1, 0.1)})
+        ledger.record("small", "intent", 1, 100, 10, 0.2)
+        ledger.record("big", "sql", 1, 100, 10, 1.0, attempts=3)
+        ledger.record("big", "sql", 2, 100, 10, 3.0, ok=False)
+
+        by_model = ledger.summarize(("model",))
+        assert [row["model"] for row in by_model] == ["big", "small"]
+        assert by_model[0]["calls"] == 2
+        assert by_model[0]["errors"] == 1
+        assert by_model[0]["retries"] == 2
+        assert by_model[0]["avg_latency_ms"] == 2000.0
+
+        by_user = {row["user_id"]: row for row in ledger.summarize(("user_id", "stage"))}
+        assert by_user[2]["stage"] == "sql" and by_user[2]["calls"] == 1
+
+    def test_unknown_group_field_is_rejected(self):
+        with pytest.raises(ValueError):
+            UsageLedger().summarize(("prompt",))
+
+    def test_ring_buffer_drops_old_calls_but_rollups_keep_them(self):
+        ledger = UsageLedger(capacity=2)
+        for _ in range(5):
+            ledger.record("m", "intent", 1, 10, 1, 0.1)
+        assert len(ledger.recent()) == 2
+        rows = ledger.drain()
+        assert len(rows) == 1 and rows[0]["calls"] == 5
+        assert ledger.drain() == []
+
+    def test_failed_flush_keeps_rollups(self):
+        ledger = UsageLedger()
+        ledger.record("m", "intent", 1, 10, 1, 0.1)
+
+        def broken_sink(rows):
+            raise RuntimeError("database down")
+
+        with pytest.raises(RuntimeError):
+            ledger.flush(broken_sink)
+        stored = []
+        assert ledger.flush(stored.extend) == 1
+        assert stored[0]["calls"] == 1 and stored[0]["prompt_tokens"] == 10
+
+
+def test_rollups_are_stored_and_queried():
+    from backend.database.base import Base
+    from backend.llm_usage.models import LLMUsageRollup
+    from backend.llm_usage.store import query_usage, save_rollups
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[LLMUsageRollup.__table__])
+    db = sessionmaker(bind=engine)()
+    ledger = UsageLedger(prices={"m": (1.0, 1.0)})
+    ledger.record("m", "intent", 1, 1000, 0, 0.1)
+    ledger.record("m", "sql", 2, 2000, 0, 0.3)
+    ledger.flush(lambda rows: save_rollups(db, rows))
+    ledger.record("m", "sql", 2, 1000, 0, 0.5)
+    ledger.flush(lambda rows: save_rollups(db, rows))
+
+    by_user = {row["user_id"]: row for row in query_usage(db, ("user_id",))}
+    assert by_user[2]["calls"] == 2
+    assert by_user[2]["prompt_tokens"] == 3000
+    assert by_user[2]["cost_usd"] == pytest.approx(0.003)
+    assert by_user[2]["max_latency_ms"] == 500.0
+    assert [row["stage"] for row in query_usage(db, ("stage",), user_id=1)] == ["intent"]
+    db.close()
+
+
+def test_usage_endpoint_shows_other_users_only_to_operators(monkeypatch):
+    from api.routes.assistant import usage
+    from backend.database.base import Base
+    from backend.llm_usage.models import LLMUsageRollup
+    from backend.llm_usage.store import save_rollups
+    from config import settings
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine, tables=[LLMUsageRollup.__table__])
+    db = sessionmaker(bind=engine)()
+    ledger = UsageLedger()
+    ledger.record("m", "intent", 1, 100, 0, 0.1)
+    ledger.record("m", "intent", 2, 200, 0, 0.1)
+    ledger.flush(lambda rows: save_rollups(db, rows))
+    monkeypatch.setattr(settings, "LLM_USAGE_OPERATORS", {"ops@example.com"})
+
+    member = SimpleNamespace(id=1, email="member@example.com")
+    result = usage(group_by="user_id,model", hours=24, user_id=2, db=db, current_user=member)
+    assert result.group_by == ["model"]
+    assert [row["prompt_tokens"] for row in result.rows] == [100]
+
+    operator = SimpleNamespace(id=3, email="Ops@example.com")
+    result = usage(group_by="user_id", hours=24, user_id=None, db=db, current_user=operator)
+    assert sorted(row["user_id"] for row in result.rows) == [1, 2]
+    db.close()
+
+
+def test_openrouter_calls_are_attributed_to_stage_and_user():
+    pytest.importorskip("openai")
+    from assistant.llm.openrouter_llm import OpenRouterLLMClient
+
+    ledger = UsageLedger(prices={"openai/gpt-4o": (2.5, 10.0)})
+    client = OpenRouterLLMClient(api_key="test-key", model_name="openai/gpt-4o", coalesce=False, ledger=ledger)
+
+    async def create(**kwargs):
+        usage = SimpleNamespace(prompt_tokens=400, completion_tokens=20, total_tokens=420, prompt_tokens_details=None)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))], usage=usage)
+
+    client.async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    async def request():
+        with llm_user(7), llm_stage("intent"):
+            return await client.agenerate("hello")
+
+    assert asyncio.run(request()) == "ok"
+    [record] = ledger.recent()
+    assert (record.model, record.stage, record.user_id) == ("openai/gpt-4o", "intent", 7)
+    assert (record.prompt_tokens, record.completion_tokens, record.attempts) == (400, 20, 1)
+    assert record.ok and record.cost == pytest.approx(0.0012)
+
+
+def test_cancelled_hedge_loser_is_not_recorded_as_an_error():
+    pytest.importorskip("openai")
+    from assistant.llm.hedging import HedgePolicy
+    from assistant.llm.openrouter_llm import OpenRouterLLMClient
+
+    hedge = HedgePolicy(min_delay=0.02, min_samples=1, backup_model="fast/model")
+    hedge.observe(0.001)
+    ledger = UsageLedger()
+    client = OpenRouterLLMClient(api_key="test-key", model_name="slow/model", coalesce=False,
+                                 hedge=hedge, ledger=ledger)
+
+    async def create(**kwargs):
+        await asyncio.sleep(1 if kwargs["model"] == "slow/model" else 0)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))], usage=None)
+
+    client.async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    async def request():
+        result = await client.agenerate("hello")
+        await asyncio.sleep(0.01)  # let the loser's cancellation finish
+        return result
+
+    assert asyncio.run(request()) == "ok"
+    [record] = ledger.recent()
+    assert record.model == "fast/model" and record.ok
+    assert ledger.summarize(("model",))[0]["errors"] == 0
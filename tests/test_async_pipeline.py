@@ -0,0 +1,83 @@
+"""Tests for the async assistant pipeline."""
+
+import asyncio
+import json
+from assistant.pipeline import DBStep, LLMStep, run_async, run_sync
+
+
+class AsyncOnlyClient:
+    """Client whose sync API must never be used by the async driver."""
+
+    def __init__(self, response):
+        self.response = response
+        self.async_calls = 0
+
+    def generate(self, prompt):
+        raise AssertionError("sync generate called from the async driver")
+
+    async def agenerate(self, prompt):
+        self.async_calls += 1
+        await asyncio.sleep(0)
+        return self.response
+
+
+def sample_pipeline():
+    text = yield LLMStep("intent", "prompt")
+    try:
+        yield DBStep(lambda: 1 / 0)
+    except ZeroDivisionError:
+        pass
+    row_count = yield DBStep(lambda: 3)
+    return f"{text}:{row_count}"
+
+
+def test_run_async_awaits_llm_and_offloads_db():
+    client = AsyncOnlyClient("hello")
+    assert asyncio.run(run_async(sample_pipeline(), client)) == "hello:3"
+    assert client.async_calls == 1
+
+
+def test_run_sync_throws_step_errors_into_pipeline():
+    class SyncClient:
+        def generate(self, prompt):
+            return "hi"
+
+    assert run_sync(sample_pipeline(), SyncClient()) == "hi:3"
+
+
+def test_aprocess_input_matches_process_input(make_assistant):
+    parsed = json.dumps({"intent": "delete_task", "entities": {"id": 5}, "response": "Deleted."})
+
+    sync_assistant, sync_db = make_assistant("COMBINED", [parsed])
+    async_assistant, async_db = make_assistant("COMBINED", [parsed])
+
+    sync_response = sync_assistant.process_input("get rid of the fifth one")
+    async_response = asyncio.run(async_assistant.aprocess_input("get rid of the fifth one"))
+
+    assert async_response == sync_response
+    assert async_db.statements[0][1] == sync_db.statements[0][1]
+
+
+def test_concurrent_bound_requests_keep_their_own_context(make_assistant):
+    """Requests bound to different users never see each other's context."""
+    shared, _ = make_assistant("COMBINED", [])
+    shared.fast_path = None
+
+    class EchoUserClient(type(shared.llm_client)):
+        async def agenerate(self, prompt):
+            await asyncio.sleep(0.01)
+            return json.dumps({"intent": "delete_task", "entities": {"id": 1}, "response": "ok"})
+
+    shared.llm_client = EchoUserClient([])
+    dbs = [type(shared.db)() for _ in range(5)]
+    bound = [shared.bind(db, user_id=uid, user_email=f"u{uid}@example.com") for uid, db in enumerate(dbs)]
+
+    async def run_all():
+        await asyncio.gather(*(assistant.aprocess_input(f"drop number one #{i}") for i, assistant in enumerate(bound)))
+
+    asyncio.run(run_all())
+
+    for uid, db in enumerate(dbs):
+        assert [params["owner_id"] for _, params in db.statements] == [uid]
+    assert all(assistant.llm_client is shared.llm_client for assistant in bound)
+    assert shared.current_user_id == 7
@@ -0,0 +1,56 @@
+"""Tests for multi-command messages executed as one batch."""
+
+import json
+
+
+def test_multi_command_message_runs_as_one_batch(make_assistant):
+    assistant, db = make_assistant("COMBINED", [json.dumps({
+        "intent": "batch",
+        "entities": {},
+        "operations": [
+            {"intent": "add_task", "entities": {"title": "Buy milk"}},
+            {"intent": "add_task", "entities": {"title": "call the bank"}},
+            {"intent": "complete_task", "entities": {"id": 3}},
+        ],
+        "response": "Added two tasks and completed task 3.",
+    })])
+
+    response = assistant.process_input("add buy milk, call the bank and finish task 3")
+
+    assert len(assistant.llm_client.prompts) == 1
+    assert len(db.statements) == 2
+    insert_params = db.statements[0][1]
+    assert [params["title"] for params in insert_params] == ["buy milk", "call the bank"]
+    assert all(params["user_id"] == 7 for params in insert_params)
+    assert "2 task(s) added successfully (IDs: 1, 2)" in response
+    assert "1 task(s) updated successfully" in response
+
+
+def test_batch_with_unsupported_operation_runs_nothing(make_assistant):
+    assistant, db = make_assistant("COMBINED", [json.dumps({
+        "intent": "batch",
+        "entities": {},
+        "operations": [
+            {"intent": "add_task", "entities": {"title": "buy milk"}},
+            {"intent": "delete_task", "entities": {"title": "old report"}},
+        ],
+        "response": "Done.",
+    })])
+
+    response = assistant.process_input("add buy milk and drop the old report")
+
+    assert db.statements == []
+    assert "one at a time" in response
+
+
+def test_single_operation_batch_is_a_normal_request(make_assistant):
+    assistant, db = make_assistant("COMBINED", [json.dumps({
+        "intent": "batch",
+        "entities": {},
+        "operations": [{"intent": "delete_task", "entities": {"id": 5}}],
+        "response": "Deleted.",
+    })])
+
+    assistant.process_input("drop the fifth one please")
+
+    assert db.statements[0][1] == {"task_id": 5, "owner_id": 7}
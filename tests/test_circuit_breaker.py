@@ -0,0 +1,175 @@
+"""Tests for the LLM circuit breaker and offline handling."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+import pytest
+from assistant.llm.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+from assistant.llm.errors import LLMCircuitOpenError
+
+
+def breaker(**kwargs):
+    options = dict(failure_rate=0.5, slow_call_seconds=1.0, window=4, min_calls=4, open_seconds=0.05)
+    options.update(kwargs)
+    return CircuitBreaker(**options)
+
+
+class TestCircuitBreaker:
+
+    def test_trips_on_error_rate_and_fails_fast(self):
+        circuit = breaker()
+        for ok in (True, False, True, False):
+            circuit.before_call()
+            circuit.record_success(0.1) if ok else circuit.record_failure()
+        assert circuit.state == OPEN
+        with pytest.raises(LLMCircuitOpenError):
+            circuit.before_call()
+
+    def test_slow_calls_count_against_the_provider(self):
+        circuit = breaker()
+        for _ in range(4):
+            circuit.record_success(5.0)
+        assert circuit.state == OPEN
+
+    def test_needs_min_calls_before_tripping(self):
+        circuit = breaker()
+        circuit.record_failure()
+        assert circuit.state == CLOSED
+
+    def test_half_open_lets_one_probe_through(self):
+        circuit = breaker(min_calls=1)
+        circuit.record_failure()
+        time.sleep(0.06)
+
+        ticket = circuit.before_call()
+        assert ticket and circuit.state == HALF_OPEN
+        with pytest.raises(LLMCircuitOpenError):
+            circuit.before_call()
+
+        circuit.record_success(0.1, ticket)
+        assert circuit.state == CLOSED
+        circuit.before_call()
+
+    def test_failed_probe_reopens(self):
+        circuit = breaker(min_calls=1)
+        circuit.record_failure()
+        time.sleep(0.06)
+        circuit.record_failure(circuit.before_call())
+        assert circuit.state == OPEN
+
+    def test_abandoned_probe_frees_the_slot(self):
+        circuit = breaker(min_calls=1)
+        circuit.record_failure()
+        time.sleep(0.06)
+        circuit.abandon(circuit.before_call())
+        circuit.before_call()
+
+    def test_only_the_probe_settles_the_half_open_slot(self):
+        circuit = breaker(min_calls=1)
+        # Admitted while closed, still in flight when the breaker trips and half-opens
+        straggler = circuit.before_call()
+        assert straggler == 0
+        circuit.record_failure()
+        time.sleep(0.06)
+        probe = circuit.before_call()
+
+        circuit.abandon(straggler)  # the straggler is cancelled
+        with pytest.raises(LLMCircuitOpenError):
+            circuit.before_call()
+        circuit.record_failure(straggler)
+        assert circuit.state == HALF_OPEN
+
+        circuit.record_success(0.1, probe)
+        assert circuit.state == CLOSED
+
+
+def test_open_breaker_skips_the_upstream_call():
+    pytest.importorskip("openai")
+    from assistant.llm.openrouter_llm import OpenRouterLLMClient
+
+    client = OpenRouterLLMClient(api_key="test-key", max_retries=1, coalesce=False,
+                                 breaker=breaker(min_calls=1, open_seconds=60))
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        raise ConnectionError("provider down")
+
+    client.async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    with pytest.raises(Exception):
+        asyncio.run(client.agenerate("hello"))
+    with pytest.raises(LLMCircuitOpenError):
+        asyncio.run(client.agenerate("hello"))
+    assert len(calls) == 1
+
+
+def test_cancelled_straggler_keeps_the_probe_slot():
+    pytest.importorskip("openai")
+    from assistant.llm.openrouter_llm import OpenRouterLLMClient
+
+    circuit = breaker(min_calls=1)
+    client = OpenRouterLLMClient(api_key="test-key", coalesce=False, breaker=circuit)
+    release = asyncio.Event()
+
+    async def create(**kwargs):
+        await release.wait()
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))], usage=None)
+
+    client.async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    async def scenario():
+        straggler = asyncio.create_task(client.agenerate("admitted while closed"))
+        await asyncio.sleep(0.01)
+        circuit.record_failure()
+        await asyncio.sleep(0.06)
+        probe = asyncio.create_task(client.agenerate("probe"))
+        await asyncio.sleep(0.01)
+        assert circuit.state == HALF_OPEN
+
+        straggler.cancel()
+        await asyncio.gather(straggler, return_exceptions=True)
+        with pytest.raises(LLMCircuitOpenError):
+            await asyncio.wait_for(client.agenerate("third"), 1)
+
+        release.set()
+        assert await probe == "ok"
+
+    asyncio.run(scenario())
+    assert circuit.state == CLOSED
+
+
+class OpenCircuitLLM:
+    """LLM whose circuit breaker is open."""
+
+    def generate_structured(self, prompt, schema, **kwargs):
+        raise LLMCircuitOpenError("llm circuit open")
+
+
+def test_assistant_answers_offline_while_circuit_is_open(make_assistant):
+    from assistant.assistant import OFFLINE_RESPONSE
+
+    assistant, _ = make_assistant("TWO_STEP", [])
+    assistant.llm_client = OpenCircuitLLM()
+    assistant.fast_path = None
+    assert assistant.process_input("what should I focus on?") == OFFLINE_RESPONSE
+
+
+def test_sql_stage_answers_offline_when_circuit_opens(make_assistant):
+    import json
+    from assistant.assistant import OFFLINE_RESPONSE
+
+    assistant, db = make_assistant("TWO_STEP", [json.dumps({
+        "intent": "list_tasks", "entities": {"title": "report"}, "response": "Here you go.",
+    })])
+    assistant.fast_path = None
+    scripted = assistant.llm_client
+
+    def generate(prompt):
+        if scripted.responses:
+            return type(scripted).generate(scripted, prompt)
+        raise LLMCircuitOpenError("llm circuit open")
+
+    scripted.generate = generate
+    assert assistant.process_input("find anything about the report") == OFFLINE_RESPONSE
+    assert db.statements == []
@@ -0,0 +1,66 @@
+"""Tests for the single-call (COMBINED) assistant pipeline mode."""
+
+import json
+from assistant.sql_guard import SQLGuard
+
+
+def _guarded(sql):
+    """AI-written SQL runs only after the guard has scoped it to user 7."""
+    return SQLGuard().prepare(sql, 7).sql
+
+
+def test_combined_mode_uses_single_llm_call(make_assistant):
+    """COMBINED mode should execute the SQL returned with the intent."""
+    sql = "UPDATE tasks SET status = 'completed', updated_at = NOW() WHERE title = 'report';"
+    assistant, db = make_assistant("COMBINED", [json.dumps({
+        "intent": "complete_task",
+        "entities": {"title": "report"},
+        "response": "Done.",
+        "sql": sql,
+    })])
+
+    response = assistant.process_input("i finally finished the report")
+
+    assert len(assistant.llm_client.prompts) == 1
+    assert db.queries == [_guarded(sql)]
+    assert "1 task(s) updated" in response
+
+
+def test_combined_mode_falls_back_to_sql_call_without_sql(make_assistant):
+    """Missing SQL in the combined response should trigger the two-step path."""
+    sql = "DELETE FROM tasks WHERE title = 'milk';"
+    assistant, db = make_assistant("COMBINED", [
+        json.dumps({"intent": "delete_task", "entities": {"title": "milk"}, "response": "Deleted."}),
+        json.dumps({"sql": sql}),
+    ])
+
+    assistant.process_input("get rid of the milk one")
+
+    assert len(assistant.llm_client.prompts) == 2
+    assert db.queries == [_guarded(sql)]
+
+
+def test_two_step_mode_ignores_combined_sql(make_assistant):
+    """TWO_STEP mode should always ask for SQL separately."""
+    assistant, db = make_assistant("TWO_STEP", [
+        json.dumps({"intent": "delete_task", "entities": {"title": "milk"}, "response": "Deleted.", "sql": "DELETE FROM tasks;"}),
+        json.dumps({"sql": "DELETE FROM tasks WHERE title = 'milk';"}),
+    ])
+
+    assistant.process_input("get rid of the milk one")
+
+    assert '"sql"' not in assistant.llm_client.prompts[0]
+    assert db.queries == [_guarded("DELETE FROM tasks WHERE title = 'milk';")]
+
+
+def test_core_intents_use_compiled_statements(make_assistant):
+    """Intents the query builder can express never use AI-written SQL."""
+    assistant, db = make_assistant("TWO_STEP", [
+        json.dumps({"intent": "delete_task", "entities": {"id": 5}, "response": "Deleted.", "sql": "DELETE FROM tasks;"}),
+    ])
+
+    assistant.process_input("get rid of the fifth one")
+
+    assert len(assistant.llm_client.prompts) == 1
+    statement, params = db.statements[0]
+    assert params == {"task_id": 5, "owner_id": 7}
@@ -0,0 +1,64 @@
+"""End-to-end tests of OpenRouterLLMClient against the local LLM stand-in server."""
+
+import asyncio
+import json
+import random
+import pytest
+
+pytest.importorskip("openai")
+pytest.importorskip("uvicorn")
+
+from assistant.llm.errors import LLMRateLimitError
+from assistant.llm.fake_server import (
+    CannedResponses, FaultProfile, LatencyModel, create_app, serve_in_background
+)
+from assistant.llm.openrouter_llm import OpenRouterLLMClient
+from assistant.prompts import SQL_SCHEMA
+
+RULES = [
+    {"match": "weather", "content": "Sunny, as far as I know."},
+    {"schema": "sql", "content": {"sql": "SELECT 1"}},
+]
+
+
+def client_for(base_url, **kwargs):
+    return OpenRouterLLMClient(api_key="fake", base_url=base_url, coalesce=False, retry_delay=0.01, **kwargs)
+
+
+def test_latency_specs():
+    rng = random.Random(1)
+    assert LatencyModel.parse("0.25").sample(rng) == 0.25
+    assert 0.1 <= LatencyModel.parse("uniform:0.1,0.2").sample(rng) <= 0.2
+    assert LatencyModel.parse("lognormal:0.3,0.5").sample(rng) > 0
+    with pytest.raises(ValueError):
+        LatencyModel.parse("pareto:1")
+
+
+def test_replays_canned_responses_over_http():
+    with serve_in_background(create_app(CannedResponses(RULES))) as base_url:
+        client = client_for(base_url)
+        assert client.generate("what's the weather?") == "Sunny, as far as I know."
+        assert client.generate_structured("write the query", SQL_SCHEMA)["sql"] == "SELECT 1"
+
+
+def test_streams_in_chunks():
+    app = create_app(CannedResponses(RULES), latency=LatencyModel("fixed", [0.02]), chunk_size=4)
+    with serve_in_background(app) as base_url:
+        client = client_for(base_url)
+
+        async def collect():
+            return [chunk async for chunk in client.astream("weather today")]
+
+        chunks = asyncio.run(collect())
+    assert len(chunks) > 1
+    assert "".join(chunks) == "Sunny, as far as I know."
+
+
+def test_injected_429s_exercise_the_retry_policy():
+    app = create_app(faults=FaultProfile(rate_limit_rate=1.0, retry_after=0))
+    with serve_in_background(app) as base_url:
+        client = client_for(base_url, max_retries=3)
+        with pytest.raises(LLMRateLimitError):
+            asyncio.run(client.agenerate("hello"))
+        stats = json.loads(client.transport.http_client.get(base_url.replace("/api/v1", "/stats")).text)
+    assert stats == {"requests": 3, "rate_limited": 3, "server_errors": 0}
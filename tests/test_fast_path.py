@@ -0,0 +1,76 @@
+"""Tests for the deterministic fast-path command recognizer."""
+
+import pytest
+from assistant.fast_path import FastPathRecognizer
+
+
+@pytest.fixture
+def recognizer():
+    return FastPathRecognizer()
+
+
+class TestFastPathMatches:
+    """Commands the recognizer should answer without the LLM."""
+
+    @pytest.mark.parametrize("text", ["list my tasks", "Show all tasks", "my tasks", "What do I need to do?"])
+    def test_list_all(self, recognizer, text):
+        match = recognizer.match(text)
+        assert match is not None
+        assert match.intent == "list_tasks"
+        assert match.entities == {}
+
+    def test_list_high_priority(self, recognizer):
+        match = recognizer.match("show high priority tasks")
+        assert match.intent == "list_tasks"
+        assert match.entities == {"priority": "high"}
+
+    def test_list_pending(self, recognizer):
+        match = recognizer.match("show pending tasks")
+        assert match.entities == {"status": "pending"}
+
+    def test_list_time_range(self, recognizer):
+        match = recognizer.match("tasks for this week")
+        assert match.intent == "list_tasks"
+        assert set(match.entities["time_range"]) == {"start", "end"}
+
+    def test_delete_by_id(self, recognizer):
+        match = recognizer.match("delete task 3")
+        assert match.intent == "delete_task"
+        assert match.entities == {"id": 3}
+
+    def test_complete_by_id(self, recognizer):
+        match = recognizer.match("complete task #5")
+        assert match.intent == "complete_task"
+        assert match.entities == {"id": 5}
+
+    def test_add_with_reminder(self, recognizer):
+        match = recognizer.match("add task water plants with a 5 minute reminder")
+        assert match.intent == "add_task"
+        assert match.entities == {"title": "water plants", "reminder_offset": 5}
+
+
+class TestFastPathFallsThrough:
+    """Anything ambiguous must go to the LLM."""
+
+    @pytest.mark.parametrize("text", [
+        "add a task to buy groceries tomorrow at 5pm",
+        "add buy milk and call the bank",
+        "delete today's tasks",
+        "show tasks for the sprint review",
+        "how am i doing?",
+        "",
+    ])
+    def test_no_match(self, recognizer, text):
+        assert recognizer.match(text) is None
+
+
+def test_hit_rate_counter(recognizer):
+    recognizer.match("list my tasks")
+    recognizer.match("delete task 1")
+    recognizer.match("tell me a joke")
+    recognizer.match("how productive was i")
+
+    stats = recognizer.stats()
+    assert stats["hits"] == 2
+    assert stats["misses"] == 2
+    assert stats["hit_rate"] == 0.5
@@ -0,0 +1,103 @@
+"""Tests for concurrent batch generation and the bulk task import."""
+
+import asyncio
+import json
+from types import SimpleNamespace
+import pytest
+from assistant.llm.base_llm import BaseLLMClient
+from assistant.llm.errors import LLMInvalidResponseError
+from assistant.prompts import INTENT_SCHEMA
+
+
+class KeywordLLMClient(BaseLLMClient):
+    """Answers with the response of the first keyword found in the prompt's user input."""
+
+    def __init__(self, answers):
+        super().__init__(None, None)
+        self.answers = answers
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    @property
+    def provider_name(self) -> str:
+        return "Keyword"
+
+    @property
+    def default_model(self) -> str:
+        return "keyword-model"
+
+    def generate(self, prompt: str, **kwargs) -> str:
+        user_input = prompt.rsplit("USER INPUT:", 1)[-1]
+        for keyword, answer in self.answers.items():
+            if keyword in user_input:
+                if isinstance(answer, Exception):
+                    raise answer
+                return answer
+        raise AssertionError(f"unexpected prompt: {user_input!r}")
+
+    async def agenerate(self, prompt: str, **kwargs) -> str:
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            await asyncio.sleep(0.01)
+            return self.generate(prompt)
+        finally:
+            self.in_flight -= 1
+
+
+def task(title):
+    return json.dumps({"intent": "add_task", "entities": {"title": title}, "response": "Added."})
+
+
+class TestGenerateMany:
+
+    def test_results_are_ordered_and_errors_isolated(self):
+        client = KeywordLLMClient({"a": "A", "b": RuntimeError("boom"), "c": "C"})
+        results = client.generate_many(["a", "b", "c"], concurrency=2)
+        assert results[0] == "A" and results[2] == "C"
+        assert isinstance(results[1], RuntimeError)
+
+    def test_async_concurrency_is_bounded(self):
+        client = KeywordLLMClient({str(n): str(n) for n in range(10)})
+        results = asyncio.run(client.agenerate_many([str(n) for n in range(10)], concurrency=3))
+        assert results == [str(n) for n in range(10)]
+        assert client.max_in_flight == 3
+
+    def test_schema_validation_failures_stay_per_item(self):
+        client = KeywordLLMClient({"good": task("Buy milk"), "bad": "not json"})
+        results = asyncio.run(client.agenerate_many(["good", "bad"], schema=INTENT_SCHEMA))
+        assert results[0]["entities"] == {"title": "Buy milk"}
+        assert isinstance(results[1], LLMInvalidResponseError)
+
+    def test_openrouter_runs_sync_batches_on_one_event_loop(self):
+        pytest.importorskip("openai")
+        from assistant.llm.openrouter_llm import OpenRouterLLMClient
+
+        client = OpenRouterLLMClient(api_key="test-key", coalesce=False)
+
+        async def create(**kwargs):
+            content = kwargs["messages"][-1]["content"].upper()
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+        client.async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+        assert client.generate_many(["x", "y"]) == ["X", "Y"]
+
+
+def test_bulk_import_adds_parsed_tasks_in_one_batch(make_assistant):
+    assistant, db = make_assistant("TWO_STEP", [])
+    assistant.llm_client = KeywordLLMClient({
+        "dentist": task("Dentist appointment"),
+        "weather": json.dumps({"intent": "unknown", "entities": {}, "response": "Not sure."}),
+        "bank": RuntimeError("upstream error"),
+    })
+
+    result = asyncio.run(assistant.aimport_tasks([
+        "add task: buy milk", "book the dentist next week", "how is the weather", "call the bank", "  ",
+    ]))
+
+    assert result["imported"] == 2
+    assert [item["line"] for item in result["skipped"]] == ["how is the weather", "call the bank"]
+    assert len(db.statements) == 1
+    inserted = db.statements[0][1]
+    assert [params["title"] for params in inserted] == ["buy milk", "dentist appointment"]
+    assert "2 task(s) added" in result["response"]
@@ -0,0 +1,88 @@
+"""Tests for hedged LLM requests."""
+
+import asyncio
+from types import SimpleNamespace
+import pytest
+from assistant.llm.hedging import HedgePolicy
+
+
+def warmed_policy(**kwargs):
+    """A policy that hedges after 20ms."""
+    policy = HedgePolicy(min_delay=0.02, min_samples=1, **kwargs)
+    policy.observe(0.001)
+    return policy
+
+
+async def answer(value, after, log=None):
+    try:
+        await asyncio.sleep(after)
+    except asyncio.CancelledError:
+        if log is not None:
+            log.append(f"{value} cancelled")
+        raise
+    return value
+
+
+async def fail(after):
+    await asyncio.sleep(after)
+    raise RuntimeError("upstream error")
+
+
+def test_no_hedging_until_latencies_are_known():
+    policy = HedgePolicy(min_samples=5)
+    assert asyncio.run(policy.run(lambda: answer("primary", 0.05), lambda: answer("hedge", 0))) == "primary"
+    assert policy.stats()["hedged"] == 0
+
+
+def test_fast_primary_is_not_hedged():
+    policy = warmed_policy()
+    assert asyncio.run(policy.run(lambda: answer("primary", 0), lambda: answer("hedge", 0))) == "primary"
+    assert policy.stats()["hedged"] == 0
+
+
+def test_slow_primary_loses_to_hedge_and_is_cancelled():
+    policy, log = warmed_policy(), []
+
+    async def run():
+        result = await policy.run(lambda: answer("primary", 1, log), lambda: answer("hedge", 0))
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(run()) == "hedge"
+    assert log == ["primary cancelled"]
+    assert policy.stats() == {"calls": 1, "hedged": 1, "hedge_wins": 1, "hedge_rate": 1.0, "win_rate": 1.0}
+
+
+def test_hedge_win_records_the_latency_the_caller_saw():
+    policy = warmed_policy()
+    assert asyncio.run(policy.run(lambda: answer("primary", 1), lambda: answer("hedge", 0))) == "hedge"
+    # Hedge delay (20ms) plus the hedge's own near-zero latency
+    assert max(policy._latencies) >= 0.02
+
+
+def test_failed_hedge_falls_back_to_primary():
+    policy = warmed_policy()
+    assert asyncio.run(policy.run(lambda: answer("primary", 0.05), lambda: fail(0))) == "primary"
+    assert policy.stats()["hedge_wins"] == 0
+
+
+def test_both_failing_raises_the_primary_error():
+    policy = warmed_policy()
+    with pytest.raises(RuntimeError):
+        asyncio.run(policy.run(lambda: fail(0.05), lambda: fail(0)))
+
+
+def test_openrouter_hedges_to_the_backup_model():
+    pytest.importorskip("openai")
+    from assistant.llm.openrouter_llm import OpenRouterLLMClient
+
+    client = OpenRouterLLMClient(api_key="test-key", model_name="slow/model", coalesce=False,
+                                 hedge=warmed_policy(backup_model="fast/model"))
+
+    async def create(**kwargs):
+        await asyncio.sleep(1 if kwargs["model"] == "slow/model" else 0)
+        content = f"from {kwargs['model']}"
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))], usage=None)
+
+    client.async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    assert asyncio.run(client.agenerate("hello")) == "from fast/model"
@@ -0,0 +1,54 @@
+"""Tests for lazy provider loading and the import-time benchmark."""
+
+import subprocess
+import sys
+import pytest
+from assistant.import_time import DEFERRED_MODULES, PROJECT_ROOT, parse_importtime
+from assistant.llm import factory
+from assistant.llm.errors import LLMError
+from assistant.llm.factory import LLMFactory
+from assistant.llm.mock_llm import MockLLMClient
+
+IMPORTTIME_OUTPUT = """\
+import time: self [us] | cumulative | imported package
+import time:       100 |        100 |     json.decoder
+import time:       200 |        300 |   json
+import time:       400 |        700 |   assistant.llm
+import time:      1000 |       1000 |   dateparser
+import time:       500 |       2200 | assistant.assistant
+"""
+
+
+def test_parse_importtime():
+    total, children, loaded = parse_importtime(IMPORTTIME_OUTPUT, "assistant.assistant")
+    assert total == 2.2
+    assert children == [("dateparser", 1.0), ("assistant.llm", 0.7), ("json", 0.3)]
+    assert "json.decoder" in loaded
+
+
+def test_assistant_import_defers_heavy_dependencies():
+    code = (
+        "import sys, assistant.assistant, assistant.llm.factory\n"
+        f"print(','.join(name for name in {DEFERRED_MODULES!r} if name in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, "-c", code], cwd=PROJECT_ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ""
+
+
+class TestProviderRegistry:
+
+    def test_builtin_providers_are_registered(self):
+        assert {"OPENROUTER", "MOCK"} <= set(LLMFactory.providers())
+        assert LLMFactory.provider_class("mock") is MockLLMClient
+
+    def test_registered_path_is_imported_on_first_use(self, monkeypatch):
+        monkeypatch.setattr(factory, "_providers", dict(factory._providers))
+        LLMFactory.register("echo", "assistant.llm.mock_llm:MockLLMClient")
+        client = LLMFactory.create("ECHO", model_name="echo-1", max_retries=5)
+        assert isinstance(client, MockLLMClient)
+        assert client.model_name == "echo-1"
+
+    def test_unknown_provider(self):
+        with pytest.raises(LLMError, match="Unknown provider"):
+            LLMFactory.create("NOPE")
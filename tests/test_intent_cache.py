@@ -0,0 +1,91 @@
+"""Tests for the LRU + TTL intent cache."""
+
+import pytest
+from assistant.intent_cache import IntentCache
+
+
+class FakeClock:
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+
+def make_parsed(intent="list_tasks", **entities):
+    return {"intent": intent, "entities": entities, "response": "ok"}
+
+
+def test_hit_after_put_with_normalized_key(clock):
+    cache = IntentCache(clock=clock)
+    cache.put("Show all tasks", make_parsed())
+
+    assert cache.get("  show   ALL tasks! ") == make_parsed()
+    assert cache.stats()["hits"] == 1
+
+
+def test_miss_is_counted(clock):
+    cache = IntentCache(clock=clock)
+    assert cache.get("show all tasks") is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_ttl(clock):
+    cache = IntentCache(ttl=10, clock=clock)
+    cache.put("show all tasks", make_parsed())
+
+    clock.now += 11
+    assert cache.get("show all tasks") is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_new_time_bucket_misses(clock):
+    cache = IntentCache(ttl=10_000, bucket_seconds=60, clock=clock)
+    clock.now = 6000.0
+    cache.put("show all tasks", make_parsed())
+
+    clock.now += 60
+    assert cache.get("show all tasks") is None
+
+
+def test_lru_eviction(clock):
+    cache = IntentCache(max_size=2, clock=clock)
+    cache.put("a", make_parsed())
+    cache.put("b", make_parsed())
+    cache.get("a")  # "b" becomes least recently used
+    cache.put("c", make_parsed())
+
+    assert cache.get("b") is None
+    assert cache.get("a") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_relative_deadlines_bypass_cache(clock):
+    cache = IntentCache(clock=clock)
+    stored = cache.put("add call mom in 5 minutes", make_parsed("add_task", title="call mom", deadline="in 5 minutes"))
+
+    assert stored is False
+    assert cache.get("add call mom in 5 minutes") is None
+    assert cache.stats()["bypassed"] == 1
+
+
+def test_sql_is_not_cached(clock):
+    cache = IntentCache(clock=clock)
+    parsed = make_parsed("add_task", title="buy milk")
+    parsed["sql"] = "INSERT INTO tasks (title, user_id) VALUES ('buy milk', 42);"
+    cache.put("add task buy milk", parsed)
+
+    assert "sql" not in cache.get("add task buy milk")
+
+
+def test_cached_value_is_a_copy(clock):
+    cache = IntentCache(clock=clock)
+    cache.put("show all tasks", make_parsed())
+
+    cache.get("show all tasks")["entities"]["status"] = "pending"
+    assert cache.get("show all tasks")["entities"] == {}
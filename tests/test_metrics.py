@@ -0,0 +1,82 @@
+"""Tests for assistant pipeline latency instrumentation."""
+
+import json
+from types import SimpleNamespace
+import pytest
+from assistant.metrics import (
+    Histogram, collect_request_metrics, llm_retries, render_metrics, reset_metrics, stage_latency, timed
+)
+
+
+@pytest.fixture(autouse=True)
+def clean_metrics():
+    reset_metrics()
+    yield
+    reset_metrics()
+
+
+class TestHistogram:
+
+    def test_render_is_cumulative(self):
+        histogram = Histogram("demo_seconds", "stage", "Demo.", buckets=(0.1, 1.0))
+        for value in (0.05, 0.5, 0.5, 3.0):
+            histogram.observe("intent", value)
+
+        lines = histogram.render()
+
+        assert 'demo_seconds_bucket{stage="intent",le="0.1"} 1' in lines
+        assert 'demo_seconds_bucket{stage="intent",le="1.0"} 3' in lines
+        assert 'demo_seconds_bucket{stage="intent",le="+Inf"} 4' in lines
+        assert 'demo_seconds_count{stage="intent"} 4' in lines
+        assert histogram.stats()["intent"]["p50_ms"] == 1000.0
+
+    def test_spans_add_up_per_request(self):
+        with collect_request_metrics() as metrics:
+            with timed("db"):
+                pass
+            with timed("db"):
+                pass
+        with timed("db"):
+            pass
+
+        assert list(metrics.stages_ms) == ["db"]
+        assert stage_latency.stats()["db"]["count"] == 3
+
+
+def test_process_input_records_stage_timings(make_assistant):
+    assistant, _ = make_assistant("COMBINED", [
+        json.dumps({"intent": "delete_task", "entities": {"id": 5}, "response": "Deleted."})
+    ])
+    assistant.fast_path = None
+
+    assistant.process_input("get rid of the fifth one")
+
+    stages = assistant.request_metrics.to_dict()["stages_ms"]
+    assert {"intent", "db", "total"} <= set(stages)
+    assert stages["total"] >= stages["intent"]
+    assert 'taskjarvis_assistant_stage_seconds_count{stage="intent"} 1' in render_metrics()
+
+
+def test_openrouter_reports_retries():
+    pytest.importorskip("openai")
+    from assistant.llm.openrouter_llm import OpenRouterLLMClient
+
+    client = OpenRouterLLMClient(api_key="test-key", retry_delay=0)
+    replies = [ConnectionError("connection reset"), SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="{}"))],
+        usage=SimpleNamespace(prompt_tokens=10, completion_tokens=2, total_tokens=12, prompt_tokens_details=None),
+    )]
+
+    def create(**kwargs):
+        reply = replies.pop(0)
+        if isinstance(reply, Exception):
+            raise reply
+        return reply
+
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    with collect_request_metrics() as metrics:
+        assert client.generate("hello") == "{}"
+
+    assert (metrics.llm_calls, metrics.llm_retries, metrics.prompt_tokens) == (1, 1, 10)
+    assert 'taskjarvis_llm_retries_total{model="anthropic/claude-3.5-sonnet"} 1' in llm_retries.render()
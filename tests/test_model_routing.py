@@ -0,0 +1,78 @@
+"""Tests for per-stage model routing."""
+
+import asyncio
+import time
+from types import SimpleNamespace
+import pytest
+from assistant.llm.factory import LLMFactory
+from assistant.llm.routing import ModelRouter, Route
+from assistant.llm.usage import llm_stage
+
+
+def router(**kwargs):
+    routes = {"intent": Route("small/model", backup="other/small"), "sql": Route("large/model")}
+    return ModelRouter(routes, **kwargs)
+
+
+class TestModelRouter:
+
+    def test_stages_use_their_own_model(self):
+        models = router()
+        assert models.model_for("intent", "default/model") == "small/model"
+        assert models.model_for("sql", "default/model") == "large/model"
+        assert models.model_for("other", "default/model") == "default/model"
+
+    def test_slow_primary_moves_stage_to_backup(self):
+        models = router(p95_budget=1.0, min_samples=5)
+        for _ in range(5):
+            models.observe("small/model", 3.0)
+        assert models.model_for("intent", "default/model") == "other/small"
+        assert models.stats()["intent"]["p95_ms"] == 3000.0
+
+    def test_needs_enough_samples_and_a_budget(self):
+        few = router(p95_budget=1.0, min_samples=5)
+        few.observe("small/model", 3.0)
+        assert few.model_for("intent", "default/model") == "small/model"
+
+        unbudgeted = router(min_samples=1)
+        unbudgeted.observe("small/model", 3.0)
+        assert unbudgeted.model_for("intent", "default/model") == "small/model"
+
+    def test_primary_returns_once_slow_samples_expire(self):
+        models = router(p95_budget=1.0, min_samples=1, window=0.01)
+        models.observe("small/model", 3.0)
+        assert models.model_for("intent", "default/model") == "other/small"
+        time.sleep(0.02)
+        assert models.model_for("intent", "default/model") == "small/model"
+
+
+def test_factory_only_builds_router_for_configured_stages():
+    assert LLMFactory.create_router({"intent": "", "sql": None}) is None
+    models = LLMFactory.create_router({"intent": "small/model", "sql": ""}, {"intent": "other/small"}, 1500)
+    assert models.routes == {"intent": Route("small/model", "other/small")}
+    assert models.p95_budget == 1.5
+
+
+def test_openrouter_client_routes_by_stage():
+    pytest.importorskip("openai")
+    from assistant.llm.openrouter_llm import OpenRouterLLMClient
+
+    client = OpenRouterLLMClient(api_key="test-key", model_name="large/model", coalesce=False,
+                                 router=ModelRouter({"intent": Route("small/model")}))
+    models = []
+
+    async def create(**kwargs):
+        models.append(kwargs["model"])
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))], usage=None)
+
+    client.async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    async def run():
+        with llm_stage("intent"):
+            await client.agenerate("classify")
+        with llm_stage("sql"):
+            await client.agenerate("write sql")
+
+    asyncio.run(run())
+    assert models == ["small/model", "large/model"]
+    assert client.router.p95("small/model") is None
@@ -0,0 +1,62 @@
+"""Tests for paginated assistant list replies."""
+
+
+def _rows(count):
+    return [(n, f"task {n}", "pending", "medium", None, None) for n in range(1, count + 1)]
+
+
+def test_truncated_list_returns_continuation_token(make_assistant):
+    assistant, db = make_assistant("COMBINED", [])
+    assistant.query_builder.page_size = 2
+    db.rows = _rows(5)
+
+    response = assistant.process_input("list my tasks")
+
+    assert "1 | task 1" in response and "2 | task 2" in response
+    assert "3 | task 3" not in response
+    assert assistant.continuation_token
+
+    db.rows = _rows(5)[2:]
+    response = assistant.process_input("show more", continuation_token=assistant.continuation_token)
+
+    assert assistant.llm_client.prompts == []
+    statement, params = db.statements[-1]
+    assert params["after_id"] == 2 and params["owner_id"] == 7
+    assert "3 | task 3" in response
+
+
+def test_last_page_has_no_token(make_assistant):
+    assistant, db = make_assistant("COMBINED", [])
+    db.rows = _rows(3)
+
+    assistant.process_input("list my tasks")
+
+    assert assistant.continuation_token is None
+
+
+def test_invalid_token_is_reported(make_assistant):
+    assistant, db = make_assistant("COMBINED", [])
+
+    response = assistant.process_input("show more", continuation_token="garbage")
+
+    assert "no longer available" in response
+    assert db.statements == []
+
+
+def test_truncated_ai_sql_list_says_so(make_assistant):
+    import json
+    assistant, db = make_assistant("COMBINED", [json.dumps({
+        "intent": "list_tasks",
+        "entities": {"title": "report"},
+        "response": "Here you go.",
+        "sql": "SELECT * FROM tasks WHERE title LIKE '%report%' LIMIT 500",
+    })])
+    page_size = assistant.query_builder.page_size
+    db.rows = _rows(page_size + 5)
+
+    response = assistant.process_input("find anything about the report")
+
+    query, params = db.statements[-1]
+    assert query.endswith(f"LIMIT {page_size + 1}")
+    assert f"Showing the first {page_size} tasks." in response
+    assert assistant.continuation_token is None
@@ -0,0 +1,81 @@
+"""Tests for the cache-friendly prompt layout and per-stage token accounting."""
+
+from types import SimpleNamespace
+import pytest
+from assistant.llm.usage import UsageTracker, llm_stage, usage_tracker
+from assistant.pipeline import LLMStep, run_sync
+from assistant.prompts import SQL_EXAMPLES, build_intent_prompt, build_sql_prompt
+
+
+class TestPromptLayout:
+
+    def test_intent_prefix_is_identical_across_requests(self):
+        first = build_intent_prompt("buy milk", "2025-11-26 10:00:00", 1, combined=True)
+        second = build_intent_prompt("call mom", "2025-11-27 18:30:00", 2, combined=True)
+        assert first.prefix is second.prefix
+        assert first == first.prefix + first.suffix
+
+    def test_request_data_only_in_suffix(self):
+        prompt = build_intent_prompt("buy milk", "2025-11-26 10:00:00", 42)
+        assert "2025-11-26 10:00:00" not in prompt.prefix
+        assert "buy milk" in prompt.suffix
+        assert "CURRENT USER ID: 42" in prompt.suffix
+
+    def test_sql_examples_trimmed_to_intent(self):
+        prompt = build_sql_prompt("delete task 5", "delete_task", {"id": 5}, "2025-11-26 10:00:00", 1)
+        assert SQL_EXAMPLES["delete_task"] in prompt.prefix
+        assert SQL_EXAMPLES["add_task"] not in prompt.prefix
+        assert "INSERT INTO" not in prompt
+
+
+class TestUsageAccounting:
+
+    def test_usage_attributed_to_stage(self):
+        tracker = UsageTracker()
+        with llm_stage("intent"):
+            tracker.record(900, 40, cached_tokens=800)
+        tracker.record(100, 10)
+
+        stats = tracker.stats()
+        assert stats["intent"]["prompt_tokens"] == 900
+        assert stats["intent"]["cache_hit_ratio"] == pytest.approx(0.889, abs=1e-3)
+        assert stats["other"]["calls"] == 1
+
+    def test_pipeline_tags_llm_steps(self):
+        seen = []
+
+        class StageClient:
+            def generate(self, prompt):
+                from assistant.llm.usage import current_stage
+                seen.append(current_stage.get())
+                return "ok"
+
+        def pipeline():
+            yield LLMStep("intent", "p1")
+            yield LLMStep("sql", "p2")
+            return "done"
+
+        assert run_sync(pipeline(), StageClient()) == "done"
+        assert seen == ["intent", "sql"]
+
+
+def test_openrouter_sends_prefix_as_cacheable_system_message():
+    pytest.importorskip("openai")
+    from assistant.llm.openrouter_llm import OpenRouterLLMClient
+
+    client = OpenRouterLLMClient(api_key="test-key", model_name="anthropic/claude-3.5-sonnet")
+    prompt = build_intent_prompt("buy milk", "2025-11-26 10:00:00", 1)
+    messages = client._build_messages(prompt)
+    assert messages[0]["role"] == "system"
+    assert messages[0]["content"][0]["cache_control"] == {"type": "ephemeral"}
+    assert messages[1] == {"role": "user", "content": prompt.suffix}
+
+    usage_tracker.reset()
+    response = SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content="{}"))],
+        usage=SimpleNamespace(prompt_tokens=500, completion_tokens=20, total_tokens=520,
+                              prompt_tokens_details=SimpleNamespace(cached_tokens=480)),
+    )
+    with llm_stage("intent"):
+        assert client._extract_content(response) == "{}"
+    assert usage_tracker.stats()["intent"]["cached_tokens"] == 480
@@ -0,0 +1,159 @@
+"""Tests for the compiled, parameterized query builder."""
+
+import pytest
+from sqlalchemy import create_engine, text
+from assistant.query_builder import TaskQueryBuilder, decode_continuation, encode_continuation
+
+
+@pytest.fixture
+def builder():
+    return TaskQueryBuilder()
+
+
+@pytest.fixture
+def conn():
+    """In-memory database with a minimal tasks table and two users' rows."""
+    engine = create_engine("sqlite://")
+    with engine.begin() as connection:
+        connection.execute(text(
+            "CREATE TABLE tasks (id INTEGER PRIMARY KEY, title TEXT, status TEXT, priority TEXT, "
+            "deadline TIMESTAMP, recurrence_rule TEXT, reminder_offset INTEGER, user_id INTEGER, "
+            "created_at TIMESTAMP, updated_at TIMESTAMP)"
+        ))
+        connection.execute(text(
+            "INSERT INTO tasks (id, title, status, priority, deadline, user_id) VALUES "
+            "(1, 'mine', 'pending', 'high', '2025-11-26 10:00:00', 1), "
+            "(2, 'also mine', 'Pending', 'low', NULL, 1), "
+            "(3, 'theirs', 'pending', 'high', '2025-11-26 11:00:00', 2)"
+        ))
+        yield connection
+
+
+class TestStatementShapes:
+
+    def test_statements_are_cached_per_shape(self, builder):
+        first = builder.build("list_tasks", {"status": "pending"}, 1)
+        second = builder.build("list_tasks", {"status": "completed"}, 2)
+        assert first.statement is second.statement
+        assert first.params == {"status": "pending", "owner_id": 1}
+        assert second.params == {"status": "completed", "owner_id": 2}
+
+    def test_values_are_bound_not_inlined(self, builder):
+        compiled = builder.build("add_task", {"title": "x'); DROP TABLE tasks; --"}, 1)
+        assert "DROP TABLE" not in compiled.sql
+        assert compiled.params["title"] == "x'); DROP TABLE tasks; --"
+
+    @pytest.mark.parametrize("intent,entities", [
+        ("list_tasks", {"title": "groceries"}),
+        ("delete_task", {"deadline": "yesterday"}),
+        ("complete_task", {}),
+        ("add_task", {}),
+        ("analytics", {}),
+    ])
+    def test_unsupported_requests_fall_back(self, builder, intent, entities):
+        assert builder.build(intent, entities, 1) is None
+
+
+class TestPagination:
+
+    def test_keyset_pages_through_rows(self, conn):
+        builder = TaskQueryBuilder(page_size=1)
+        first = builder.build("list_tasks", {}, 1)
+        rows = conn.execute(first.statement, first.params).fetchall()
+        assert [row.id for row in rows] == [1, 2]  # page plus one look-ahead row
+
+        token = encode_continuation({}, rows[0].id)
+        second = builder.build_next_page(token, 1)
+        assert [row.id for row in conn.execute(second.statement, second.params)] == [2]
+
+    def test_token_keeps_filters_but_not_user(self, builder):
+        token = encode_continuation({"status": "pending", "title": "ignored"}, 9)
+        assert decode_continuation(token) == ({"status": "pending"}, 9)
+        assert builder.build_next_page(token, 3).params == {"status": "pending", "after_id": 9, "owner_id": 3}
+
+    def test_malformed_token(self, builder):
+        assert builder.build_next_page("not-a-token", 1) is None
+
+
+class TestBatch:
+
+    def test_adds_share_one_statement(self, builder):
+        batch = builder.build_batch([
+            {"intent": "add_task", "entities": {"title": "buy milk"}},
+            {"intent": "complete_task", "entities": {"id": 4}},
+            {"intent": "add_task", "entities": {"title": "call the bank"}},
+            {"intent": "complete_task", "entities": {"id": 2}},
+        ], 1)
+        assert [query.intent for query in batch.queries] == ["add_task", "complete_task"]
+        assert [params["title"] for params in batch.queries[0].params] == ["buy milk", "call the bank"]
+        assert batch.queries[1].params == {"task_ids": [2, 4], "owner_id": 1}
+
+    def test_unbatchable_operation_rejects_whole_batch(self, builder):
+        assert builder.build_batch([
+            {"intent": "add_task", "entities": {"title": "buy milk"}},
+            {"intent": "list_tasks", "entities": {}},
+        ], 1) is None
+
+    def test_batch_executes_scoped(self, builder, conn):
+        batch = builder.build_batch([
+            {"intent": "add_task", "entities": {"title": "a"}},
+            {"intent": "add_task", "entities": {"title": "b"}},
+            {"intent": "delete_task", "entities": {"id": 1}},
+            {"intent": "delete_task", "entities": {"id": 3}},
+        ], 1)
+        new_ids = conn.execute(batch.queries[0].statement, batch.queries[0].params).scalars().all()
+        deleted = conn.execute(batch.queries[1].statement, batch.queries[1].params).rowcount
+        assert len(new_ids) == 2
+        assert deleted == 1
+
+
+class TestExecution:
+
+    def test_list_is_scoped_to_user(self, builder, conn):
+        compiled = builder.build("list_tasks", {"status": "pending"}, 1)
+        rows = conn.execute(compiled.statement, compiled.params).fetchall()
+        assert [row.id for row in rows] == [1, 2]
+
+    def test_list_time_range(self, builder, conn):
+        entities = {"time_range": {"start": "2025-11-26 00:00:00", "end": "2025-11-26 23:59:59"}}
+        compiled = builder.build("list_tasks", entities, 2)
+        rows = conn.execute(compiled.statement, compiled.params).fetchall()
+        assert [row.id for row in rows] == [3]
+
+    def test_delete_cannot_touch_other_users(self, builder, conn):
+        compiled = builder.build("delete_task", {"id": 3}, 1)
+        result = conn.execute(compiled.statement, compiled.params)
+        assert result.rowcount == 0
+
+    def test_complete_all_only_completes_own_tasks(self, builder, conn):
+        compiled = builder.build("complete_task", {"scope": "all"}, 1)
+        assert conn.execute(compiled.statement, compiled.params).rowcount == 2
+        statuses = conn.execute(text("SELECT status FROM tasks WHERE user_id = 2")).scalars().all()
+        assert statuses == ["pending"]
+
+    def test_add_returns_new_id(self, builder, conn):
+        compiled = builder.build("add_task", {"title": "buy milk", "reminder_offset": 10}, 1)
+        new_id = conn.execute(compiled.statement, compiled.params).scalar()
+        row = conn.execute(text("SELECT title, status, priority, reminder_offset, user_id FROM tasks WHERE id = :id"),
+                           {"id": new_id}).one()
+        assert tuple(row) == ("buy milk", "pending", "medium", 10, 1)
+
+
+def test_insert_returning_id_survives_the_commit(builder):
+    from sqlalchemy.orm import sessionmaker
+    from tasks.task_db import TaskDB
+
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE tasks (id INTEGER PRIMARY KEY, title TEXT, status TEXT, priority TEXT, deadline TIMESTAMP,"
+            " recurrence_rule TEXT, reminder_offset INTEGER, user_id INTEGER, created_at TIMESTAMP, updated_at TIMESTAMP)"
+        ))
+    db = TaskDB.__new__(TaskDB)
+    db.session = sessionmaker(bind=engine)()
+
+    compiled = builder.build("add_task", {"title": "buy milk"}, 7)
+    assert db.execute_statement(compiled.statement, compiled.params) == [(1,)]
+    compiled = builder.build("complete_task", {"id": 1}, 7)
+    assert db.execute_statement(compiled.statement, compiled.params) == 1
+    db.session.close()
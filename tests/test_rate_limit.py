@@ -0,0 +1,85 @@
+"""Tests for the client-side LLM rate limiter."""
+
+import asyncio
+from types import SimpleNamespace
+import pytest
+from assistant.llm.errors import LLMRateLimitError
+from assistant.llm.rate_limit import FileBucketStore, TokenBucketRateLimiter, create_rate_limiter
+
+
+class TestTokenBucket:
+
+    def test_bursts_up_to_the_limit_then_queues(self):
+        limiter = TokenBucketRateLimiter(requests_per_minute=2, max_wait=60)
+        assert limiter.reserve(0) == 0
+        assert limiter.reserve(0) == 0
+        assert 29 < limiter.reserve(0) <= 30
+        # Later callers queue behind earlier reservations
+        assert 59 < limiter.reserve(0) <= 60
+
+    def test_fails_instead_of_queueing_too_long(self):
+        limiter = TokenBucketRateLimiter(requests_per_minute=1, max_wait=5)
+        limiter.reserve(0)
+        with pytest.raises(LLMRateLimitError):
+            limiter.reserve(0)
+
+    def test_unused_tokens_are_refunded(self):
+        limiter = TokenBucketRateLimiter(tokens_per_minute=1000, max_wait=0)
+        limiter.reserve(900)
+        with pytest.raises(LLMRateLimitError):
+            limiter.reserve(500)
+        limiter.refund(800)
+        assert limiter.reserve(500) == 0
+
+    def test_file_store_is_shared_between_limiters(self, tmp_path):
+        path = str(tmp_path / "buckets.json")
+        worker_a = TokenBucketRateLimiter(requests_per_minute=1, max_wait=0, store=FileBucketStore(path))
+        worker_b = TokenBucketRateLimiter(requests_per_minute=1, max_wait=0, store=FileBucketStore(path))
+        worker_a.reserve(0)
+        with pytest.raises(LLMRateLimitError):
+            worker_b.reserve(0)
+
+    def test_disabled_without_limits(self):
+        assert create_rate_limiter(0, 0) is None
+
+
+def test_openrouter_client_queues_within_its_deadline():
+    pytest.importorskip("openai")
+    from assistant.llm.openrouter_llm import OpenRouterLLMClient
+
+    client = OpenRouterLLMClient(api_key="test-key", coalesce=False,
+                                 rate_limiter=TokenBucketRateLimiter(requests_per_minute=1, max_wait=0.5))
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))], usage=None)
+
+    client.async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    assert asyncio.run(client.agenerate("first")) == "ok"
+    with pytest.raises(LLMRateLimitError):
+        asyncio.run(client.agenerate("second"))
+    assert len(calls) == 1
+
+
+def test_limiter_rejections_do_not_trip_the_breaker():
+    pytest.importorskip("openai")
+    from assistant.llm.circuit_breaker import CLOSED, CircuitBreaker
+    from assistant.llm.openrouter_llm import OpenRouterLLMClient
+
+    breaker = CircuitBreaker(min_calls=2, window=4)
+    client = OpenRouterLLMClient(api_key="test-key", coalesce=False, breaker=breaker,
+                                 rate_limiter=TokenBucketRateLimiter(requests_per_minute=1, max_wait=0))
+
+    async def create(**kwargs):
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))], usage=None)
+
+    client.async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    assert asyncio.run(client.agenerate("first")) == "ok"
+    for _ in range(5):
+        with pytest.raises(LLMRateLimitError):
+            asyncio.run(client.agenerate("burst"))
+    assert breaker.state == CLOSED
+    assert breaker.stats()["calls"] == 1
@@ -0,0 +1,106 @@
+"""Tests for the on-disk LLM response cache."""
+
+import asyncio
+import pytest
+from assistant.llm.base_llm import BaseLLMClient
+from assistant.llm.errors import LLMCacheMissError
+from assistant.llm.factory import LLMFactory
+from assistant.llm.response_cache import CachingLLMClient, ResponseCache
+
+
+class ScriptedLLMClient(BaseLLMClient):
+    """Returns scripted responses in order; runs out (IndexError) when called too often."""
+
+    def __init__(self, responses):
+        super().__init__(None, None)
+        self.responses = list(responses)
+
+    @property
+    def provider_name(self) -> str:
+        return "Scripted"
+
+    @property
+    def default_model(self) -> str:
+        return "scripted-model"
+
+    def generate(self, prompt: str) -> str:
+        return self.responses.pop(0)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ResponseCache(str(tmp_path / "llm.sqlite3"))
+    yield cache
+    cache.close()
+
+
+def test_record_then_replay_without_the_client(cache):
+    recorder = CachingLLMClient(ScriptedLLMClient(["first answer"]), cache, mode="record")
+    assert recorder.generate("CURRENT TIME: 2026-01-01 09:00:00\nlist my tasks") == "first answer"
+
+    # A later run: different clock, no scripted responses left to give
+    replayer = CachingLLMClient(ScriptedLLMClient([]), cache, mode="replay")
+    assert replayer.generate("CURRENT TIME: 2026-03-04 17:30:12\nlist my tasks") == "first answer"
+    assert asyncio.run(replayer.agenerate("CURRENT TIME: now\nlist my tasks")) == "first answer"
+    with pytest.raises(LLMCacheMissError):
+        replayer.generate("CURRENT TIME: now\ndelete task 3")
+
+
+def test_record_serves_hits_and_stores_misses(cache):
+    client = CachingLLMClient(ScriptedLLMClient(["one", "two"]), cache, mode="record")
+    assert client.generate("a") == "one"
+    assert client.generate("a") == "one"
+    assert client.generate("b") == "two"
+    assert cache.stats()["entries"] == 2
+    assert cache.stats()["hits"] == 1
+
+
+def test_passthrough_skips_the_cache(cache):
+    client = CachingLLMClient(ScriptedLLMClient(["one", "two"]), cache, mode="passthrough")
+    assert [client.generate("a"), client.generate("a")] == ["one", "two"]
+    assert cache.stats()["entries"] == 0
+
+
+def test_streams_are_recorded_once_complete(cache):
+    client = CachingLLMClient(ScriptedLLMClient(['{"response": "hi"}']), cache, mode="record")
+
+    async def collect():
+        return "".join([chunk async for chunk in client.astream("a")])
+
+    assert asyncio.run(collect()) == '{"response": "hi"}'
+    assert CachingLLMClient(ScriptedLLMClient([]), cache, mode="replay").generate("a") == '{"response": "hi"}'
+
+
+def test_routed_stages_are_cached_per_model(cache):
+    from assistant.llm.routing import ModelRouter, Route
+    from assistant.llm.usage import llm_stage
+
+    scripted = ScriptedLLMClient(["small answer", "default answer"])
+    scripted.router = ModelRouter({"intent": Route("small-model")})
+    client = CachingLLMClient(scripted, cache, mode="record")
+
+    with llm_stage("intent"):
+        assert client.generate("a") == "small answer"
+    with llm_stage("sql"):
+        assert client.generate("a") == "default answer"
+    with llm_stage("intent"):
+        assert client.generate("a") == "small answer"
+    assert cache.stats()["entries"] == 2
+
+
+def test_size_cap_evicts_least_recently_used(tmp_path):
+    cache = ResponseCache(str(tmp_path / "small.sqlite3"), max_bytes=400)
+    for key in ("a", "b", "c"):
+        cache.put(key, "model", "x" * 150)
+        cache.get("a")
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    cache.close()
+
+
+def test_factory_wraps_any_client(tmp_path):
+    client = LLMFactory.create("MOCK", cache_mode="replay", cache_path=str(tmp_path / "f.sqlite3"))
+    assert isinstance(client, CachingLLMClient)
+    assert client.provider_name == "Mock"
+    with pytest.raises(LLMCacheMissError):
+        client.generate("list my tasks")
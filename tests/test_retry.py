@@ -0,0 +1,86 @@
+"""Tests for the LLM retry policy."""
+
+import asyncio
+import random
+from types import SimpleNamespace
+import pytest
+from assistant.llm.errors import LLMAuthError, LLMError, LLMRateLimitError
+from assistant.llm.retry import RetryPolicy, retry_after_of
+
+
+class HTTPFailure(Exception):
+    """Stand-in for an SDK status error carrying the HTTP response."""
+
+    def __init__(self, status, headers=None):
+        super().__init__(f"HTTP {status}")
+        self.status_code = status
+        self.response = SimpleNamespace(status_code=status, headers=headers or {})
+
+
+def policy(**kwargs):
+    return RetryPolicy(rng=random.Random(7), **kwargs)
+
+
+class TestClassification:
+
+    @pytest.mark.parametrize("error, kind", [
+        (HTTPFailure(401), "auth"),
+        (HTTPFailure(429), "rate_limit"),
+        (HTTPFailure(503), "server"),
+        (HTTPFailure(400), "fatal"),
+        (ConnectionError("reset"), "connection"),
+        (ValueError("the text mentions 429 and timeout"), "fatal"),
+    ])
+    def test_uses_status_codes_not_text(self, error, kind):
+        assert policy().classify(error) == kind
+
+    def test_non_retryable_fails_on_first_attempt(self):
+        budget = policy().begin()
+        with pytest.raises(LLMAuthError):
+            budget.delay_after(HTTPFailure(401))
+        with pytest.raises(LLMError):
+            policy().begin().delay_after(HTTPFailure(400))
+
+
+class TestDelays:
+
+    def test_decorrelated_jitter_stays_in_bounds(self):
+        retry = policy(max_attempts=50, base_delay=0.5, max_delay=8.0, deadline=1e6)
+        budget = retry.begin()
+        delays = [budget.delay_after(HTTPFailure(503)) for _ in range(20)]
+        assert all(0.5 <= delay <= 8.0 for delay in delays)
+        assert len(set(delays)) > 1
+
+    def test_retry_after_header_wins(self):
+        budget = policy(deadline=100).begin()
+        assert budget.delay_after(HTTPFailure(429, {"retry-after": "7"})) == 7.0
+        assert retry_after_of(HTTPFailure(429, {"retry-after-ms": "250"})) == 0.25
+
+    def test_wait_past_deadline_gives_up(self):
+        budget = policy(deadline=5).begin()
+        with pytest.raises(LLMRateLimitError, match="deadline"):
+            budget.delay_after(HTTPFailure(429, {"retry-after": "30"}))
+
+    def test_attempts_are_bounded(self):
+        budget = policy(max_attempts=2, base_delay=0).begin()
+        assert budget.delay_after(HTTPFailure(502)) == 0
+        with pytest.raises(LLMError, match="after 2 attempts"):
+            budget.delay_after(HTTPFailure(502))
+
+
+def test_async_retries_never_block_the_thread(monkeypatch):
+    pytest.importorskip("openai")
+    from assistant.llm.openrouter_llm import OpenRouterLLMClient
+
+    client = OpenRouterLLMClient(api_key="test-key", retry_policy=policy(base_delay=0.01, max_delay=0.01))
+    failures = [HTTPFailure(429, {"retry-after": "0"}), HTTPFailure(503)]
+
+    async def create(**kwargs):
+        if failures:
+            raise failures.pop(0)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))], usage=None)
+
+    client.async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr("time.sleep", lambda seconds: pytest.fail("blocking sleep in async path"))
+
+    assert asyncio.run(client.agenerate("hello")) == "ok"
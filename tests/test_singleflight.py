@@ -0,0 +1,110 @@
+"""Tests for coalescing identical in-flight LLM calls."""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+import pytest
+from assistant.llm.singleflight import SingleFlight, flight_key
+
+
+def test_flight_key_covers_model_and_params():
+    assert flight_key("m", "hi", temperature=0.7) == flight_key("m", "hi", temperature=0.7)
+    assert flight_key("m", "hi") != flight_key("other", "hi")
+    assert flight_key("m", "hi", temperature=0.7) != flight_key("m", "hi", temperature=0.0)
+
+
+def test_concurrent_threads_share_one_call():
+    flights = SingleFlight()
+    calls = []
+    release = threading.Event()
+
+    def upstream():
+        calls.append(1)
+        release.wait(1)
+        return "answer"
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flights.do("k", upstream))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert calls == [1]
+    assert results == ["answer"] * 4
+    assert flights.stats() == {"upstream_calls": 1, "coalesced_calls": 3, "coalescing_ratio": 0.75}
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    flights = SingleFlight()
+
+    async def failing():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("upstream down")
+
+    async def run():
+        return await asyncio.gather(*(flights.ado("k", failing) for _ in range(3)), return_exceptions=True)
+
+    assert [str(result) for result in asyncio.run(run())] == ["upstream down"] * 3
+    assert asyncio.run(flights.ado("k", lambda: asyncio.sleep(0, result="ok"))) == "ok"
+
+
+def test_cancelled_waiter_does_not_cancel_the_others():
+    flights = SingleFlight()
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "done"
+
+    async def run():
+        first = asyncio.ensure_future(flights.ado("k", slow))
+        second = asyncio.ensure_future(flights.ado("k", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(run()) == "done"
+
+
+def test_openrouter_coalesces_identical_prompts():
+    pytest.importorskip("openai")
+    from assistant.llm.openrouter_llm import OpenRouterLLMClient
+
+    client = OpenRouterLLMClient(api_key="test-key")
+    calls = []
+
+    async def create(**kwargs):
+        calls.append(kwargs["messages"])
+        await asyncio.sleep(0.01)
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))], usage=None)
+
+    client.async_client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    async def run():
+        return await asyncio.gather(client.agenerate("same"), client.agenerate("same"), client.agenerate("other"))
+
+    assert asyncio.run(run()) == ["ok", "ok", "ok"]
+    assert len(calls) == 2
+
+
+def test_flight_key_ignores_the_clock_but_not_the_request():
+    from assistant.prompts import build_intent_prompt, build_sql_prompt
+
+    def intent_key(text, time, user_id, combined=False):
+        return flight_key("m", build_intent_prompt(text, time, user_id, combined=combined))
+
+    assert intent_key("Show my tasks", "10:00:01", 1) == intent_key("show my  tasks!", "10:00:03", 2)
+    assert intent_key("show my tasks", "10:00:01", 1) != intent_key("show done tasks", "10:00:01", 1)
+    # COMBINED answers carry SQL for one user
+    assert intent_key("show my tasks", "10:00:01", 1, True) == intent_key("show my tasks", "10:00:02", 1, True)
+    assert intent_key("show my tasks", "10:00:01", 1, True) != intent_key("show my tasks", "10:00:01", 2, True)
+
+    def sql_key(entities, time, user_id):
+        return flight_key("m", build_sql_prompt("list tasks", "list_tasks", entities, time, user_id))
+
+    assert sql_key({"status": "pending"}, "10:00:01", 1) == sql_key({"status": "pending"}, "10:00:02", 1)
+    assert sql_key({"status": "pending"}, "10:00:01", 1) != sql_key({"status": "pending"}, "10:00:01", 2)
+    assert sql_key({"status": "pending"}, "10:00:01", 1) != sql_key({"status": "completed"}, "10:00:01", 1)
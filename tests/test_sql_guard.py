@@ -0,0 +1,138 @@
+"""Tests for the guard applied to AI-written SQL."""
+
+import pytest
+from assistant.sql_guard import SCOPE_CLAUSE, WRITE_SCOPE_CLAUSE, SQLGuard, UnsafeSQLError
+
+
+@pytest.fixture
+def guard():
+    return SQLGuard(row_limit=50, max_cost=1000)
+
+
+class TestRewrites:
+
+    def test_unscoped_delete_is_scoped(self, guard):
+        guarded = guard.prepare("DELETE FROM tasks;", 7)
+        assert guarded.sql == f"DELETE FROM tasks WHERE {WRITE_SCOPE_CLAUSE}"
+        assert guarded.params == {"guard_user_id": 7}
+
+    def test_existing_where_is_kept_behind_scope(self, guard):
+        guarded = guard.prepare("UPDATE tasks SET status = 'completed' WHERE title = 'x' OR 1=1", 7)
+        assert guarded.sql.endswith(f"WHERE {WRITE_SCOPE_CLAUSE} AND (title = 'x' OR 1=1)")
+
+    def test_select_gets_limit_before_nothing_else(self, guard):
+        guarded = guard.prepare("SELECT * FROM tasks ORDER BY deadline LIMIT 100000", 7)
+        assert guarded.sql == f"SELECT * FROM tasks WHERE {SCOPE_CLAUSE} ORDER BY deadline LIMIT 50"
+
+    def test_insert_owner_is_forced(self, guard):
+        guarded = guard.prepare(
+            "INSERT INTO tasks (title, user_id) VALUES ('a, (b)', 99), ('c', 1) RETURNING id", 7
+        )
+        assert guarded.sql == (
+            "INSERT INTO tasks (title, user_id) VALUES ('a, (b)', :guard_user_id), "
+            "('c', :guard_user_id) RETURNING id"
+        )
+
+    def test_keywords_inside_literals_are_ignored(self, guard):
+        guarded = guard.prepare("SELECT * FROM tasks WHERE title = 'drop table; -- union'", 7)
+        assert "'drop table; -- union'" in guarded.sql
+
+
+class TestRejections:
+
+    @pytest.mark.parametrize("sql", [
+        "DROP TABLE tasks",
+        "SELECT * FROM users",
+        "SELECT * FROM tasks; DELETE FROM tasks",
+        "SELECT * FROM tasks WHERE id IN (SELECT id FROM tasks)",
+        "SELECT * FROM tasks UNION SELECT * FROM tasks",
+        "SELECT pg_sleep(100) FROM tasks",
+        "DELETE FROM tasks -- WHERE id = 1",
+        "UPDATE tasks SET user_id = 1 WHERE id = 3",
+        "INSERT INTO tasks (title, workspace_id) VALUES ('x', 4)",
+    ])
+    def test_rejected(self, guard, sql):
+        with pytest.raises(UnsafeSQLError):
+            guard.prepare(sql, 7)
+
+    @pytest.mark.parametrize("sql", [
+        "UPDATE tasks SET user_id = 99 WHERE id = 1",
+        'UPDATE tasks SET "user_id" = 99 WHERE id = 1',
+        "UPDATE tasks SET (user_id) = (99) WHERE id = 1",
+        "UPDATE tasks SET (title, \"workspace_id\") = ('x', 4) WHERE id = 1",
+        "UPDATE tasks t SET status = 'done', t.user_id = 99",
+    ])
+    def test_owner_and_workspace_cannot_change(self, guard, sql):
+        with pytest.raises(UnsafeSQLError, match="owner or workspace"):
+            guard.prepare(sql, 7)
+
+    def test_row_constructor_update_of_other_columns_is_allowed(self, guard):
+        guarded = guard.prepare("UPDATE tasks SET (title, status) = ('user_id', 'done') WHERE id = 1", 7)
+        assert guarded.sql.startswith("UPDATE tasks SET (title, status) = ('user_id', 'done') WHERE")
+
+    @pytest.mark.parametrize("sql", [
+        # Comma joins: the scope clause would only cover one side
+        "SELECT t.*, u.hashed_password FROM tasks t, users u WHERE t.id = 1",
+        "SELECT * FROM tasks, tasks",
+        "SELECT * FROM tasks t JOIN tasks o ON o.id = t.id",
+        "DELETE FROM tasks USING users WHERE users.id = 1",
+        "UPDATE tasks SET status = 'done' FROM users WHERE users.id = 1",
+        # Other tables behind an alias named like tasks
+        "SELECT * FROM users tasks",
+        "SELECT * FROM (SELECT * FROM users) tasks",
+        # Subqueries and CTEs
+        "SELECT * FROM tasks WHERE user_id IN (SELECT id FROM users)",
+        "WITH u AS (SELECT * FROM users) SELECT * FROM tasks",
+    ])
+    def test_other_tables_are_rejected(self, guard, sql):
+        with pytest.raises(UnsafeSQLError):
+            guard.prepare(sql, 7)
+
+    def test_aliased_tasks_table_is_allowed(self, guard):
+        guarded = guard.prepare("SELECT t.title FROM tasks AS t WHERE t.id = 1", 7)
+        assert guarded.sql.startswith(f"SELECT t.title FROM tasks AS t WHERE {SCOPE_CLAUSE}")
+
+    def test_cost_threshold(self, guard):
+        guarded = guard.prepare("SELECT * FROM tasks", 7)
+        guard.check_cost(guarded, 999.0)
+        guard.check_cost(guarded, None)
+        with pytest.raises(UnsafeSQLError):
+            guard.check_cost(guarded, 5000.0)
+
+
+def test_writes_spare_other_members_workspace_tasks(guard):
+    from sqlalchemy import create_engine, text
+
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE workspace_members (workspace_id INTEGER, user_id INTEGER)"))
+        conn.execute(text("CREATE TABLE tasks (id INTEGER PRIMARY KEY, title TEXT, user_id INTEGER, workspace_id INTEGER)"))
+        conn.execute(text("INSERT INTO workspace_members VALUES (1, 7), (1, 8)"))
+        conn.execute(text("INSERT INTO tasks VALUES (1, 'mine', 7, 1), (2, 'teammate', 8, 1), (3, 'other', 9, NULL)"))
+
+        def run(sql):
+            guarded = guard.prepare(sql, 7)
+            return conn.execute(text(guarded.sql), guarded.params)
+
+        assert sorted(row[0] for row in run("SELECT id FROM tasks")) == [1, 2]
+        assert run("UPDATE tasks SET title = 'done'").rowcount == 1
+        assert run("DELETE FROM tasks").rowcount == 1
+        assert [tuple(row) for row in conn.execute(text("SELECT id, title FROM tasks ORDER BY id"))] == [
+            (2, "teammate"), (3, "other")
+        ]
+
+
+def test_assistant_refuses_expensive_sql(make_assistant):
+    import json
+    assistant, db = make_assistant("COMBINED", [json.dumps({
+        "intent": "list_tasks",
+        "entities": {"title": "report"},
+        "response": "Here you go.",
+        "sql": "SELECT * FROM tasks WHERE title LIKE '%report%'",
+    })])
+    db.cost = 1e9
+
+    response = assistant.process_input("find anything about the report")
+
+    assert "Refused to run the generated SQL" in response
+    assert db.statements == []
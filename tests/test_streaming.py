@@ -0,0 +1,53 @@
+"""Tests for streaming assistant replies."""
+
+import asyncio
+import json
+from assistant.streaming import JSONStringFieldStreamer, StreamEvent
+
+
+def feed_all(streamer, chunks):
+    return [streamer.feed(chunk) for chunk in chunks]
+
+
+class TestJSONStringFieldStreamer:
+
+    def test_extracts_field_across_chunk_boundaries(self):
+        completion = '{"intent": "unknown", "entities": {}, "response": "Hi \\"there\\"\\nfriend \\u00e9!"}'
+        chunks = [completion[i:i + 3] for i in range(0, len(completion), 3)]
+
+        text = "".join(feed_all(JSONStringFieldStreamer("response"), chunks))
+
+        assert text == json.loads(completion)["response"]
+
+    def test_text_arrives_before_json_is_complete(self):
+        streamer = JSONStringFieldStreamer("response")
+        assert streamer.feed('{"intent": "list_tasks", "resp') == ""
+        assert streamer.feed('onse": "Here are') == "Here are"
+        assert streamer.feed(' your tasks.", "entities": {}}') == " your tasks."
+
+    def test_ignores_key_text_inside_other_values(self):
+        streamer = JSONStringFieldStreamer("response")
+        text = streamer.feed('{"entities": {"title": "write \\"response\\" doc"}, "response": "Added."}')
+        assert text == "Added."
+
+    def test_no_field_yields_nothing(self):
+        assert JSONStringFieldStreamer("response").feed("not json at all") == ""
+
+
+def test_stream_event_sse_encoding():
+    assert StreamEvent("delta", "hi").to_sse() == 'event: delta\ndata: {"text": "hi"}\n\n'
+    assert StreamEvent("result", "done").to_sse() == 'event: result\ndata: {"response": "done"}\n\n'
+
+
+def test_stream_input_emits_deltas_then_result(make_assistant):
+    reply = json.dumps({"intent": "delete_task", "entities": {"id": 5}, "response": "Deleting it now."})
+    assistant, db = make_assistant("COMBINED", [reply])
+
+    async def collect():
+        return [event async for event in assistant.stream_input("get rid of the fifth one")]
+
+    events = asyncio.run(collect())
+
+    assert "".join(e.data for e in events if e.type == "delta") == "Deleting it now."
+    assert events[-1].type == "result"
+    assert "1 task(s) deleted" in events[-1].data
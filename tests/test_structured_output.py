@@ -0,0 +1,87 @@
+"""Tests for schema-validated structured LLM responses."""
+
+import json
+import pytest
+from assistant.llm.errors import LLMInvalidResponseError
+from assistant.llm.structured import Field, ResponseSchema
+from assistant.prompts import COMBINED_INTENT_SCHEMA, SQL_SCHEMA
+
+SCHEMA = ResponseSchema("reply", (
+    Field("intent", ("string",), enum=("add_task", "unknown")),
+    Field("entities", ("object",), required=False, default=dict),
+    Field("sql", ("string", "null"), required=False),
+))
+
+
+class TestResponseSchema:
+
+    def test_parses_plain_json_and_fills_defaults(self):
+        parsed = SCHEMA.parse('{"intent": "add_task"}')
+        assert parsed.data == {"intent": "add_task", "entities": {}, "sql": None}
+        assert parsed.raw == '{"intent": "add_task"}'
+
+    @pytest.mark.parametrize("text", [
+        '```json\n{"intent": "unknown", "entities": {}}\n```',
+        'Sure! Here it is: {"intent": "unknown", "entities": {}} Hope that helps.',
+    ])
+    def test_tolerates_fences_and_prose(self, text):
+        assert SCHEMA.parse(text)["intent"] == "unknown"
+
+    @pytest.mark.parametrize("text", [
+        "I'm not sure what you mean.",
+        '{"intent": "add_task", ',
+        '["add_task"]',
+        '{"entities": {}}',
+        '{"intent": 3}',
+        '{"intent": "drop_everything"}',
+        '{"intent": "add_task", "entities": []}',
+    ])
+    def test_rejects_invalid_output(self, text):
+        with pytest.raises(LLMInvalidResponseError):
+            SCHEMA.parse(text)
+
+    def test_json_schema(self):
+        schema = SCHEMA.to_json_schema()
+        assert schema["required"] == ["intent"]
+        assert schema["properties"]["sql"] == {"type": ["string", "null"]}
+        assert schema["properties"]["intent"]["enum"] == ["add_task", "unknown"]
+
+
+def test_openrouter_requests_schema_constrained_output():
+    pytest.importorskip("openai")
+    from assistant.llm.openrouter_llm import OpenRouterLLMClient
+
+    client = OpenRouterLLMClient(api_key="test-key")
+    params = client.response_format_params(SQL_SCHEMA)
+    assert params["response_format"]["type"] == "json_schema"
+    assert params["response_format"]["json_schema"]["schema"]["required"] == ["sql"]
+
+    client = OpenRouterLLMClient(api_key="test-key", response_format="none")
+    assert client.response_format_params(SQL_SCHEMA) == {}
+
+
+def test_base_client_validates_generated_json(make_assistant):
+    assistant, _ = make_assistant("COMBINED", ['{"intent": "unknown", "response": "Hi."}'])
+    parsed = assistant.llm_client.generate_structured("prompt", COMBINED_INTENT_SCHEMA)
+    assert parsed.data == {"intent": "unknown", "entities": {}, "response": "Hi.", "operations": None, "sql": None}
+
+
+def test_malformed_intent_asks_to_rephrase(make_assistant):
+    assistant, db = make_assistant("COMBINED", ["Sorry, I can't help with that."])
+
+    response = assistant.process_input("zzz qqq")
+
+    assert "rephrase" in response
+    assert db.queries == [] and db.statements == []
+
+
+def test_malformed_sql_response_runs_nothing(make_assistant):
+    assistant, db = make_assistant("TWO_STEP", [
+        json.dumps({"intent": "delete_task", "entities": {"title": "milk"}, "response": "Deleted."}),
+        json.dumps({"query": "DELETE FROM tasks;"}),
+    ])
+
+    response = assistant.process_input("get rid of the milk one")
+
+    assert "Failed to generate SQL" in response
+    assert db.queries == []
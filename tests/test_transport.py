@@ -0,0 +1,127 @@
+"""Tests for the shared LLM HTTP transport and hot model swap."""
+
+import asyncio
+import threading
+from types import SimpleNamespace
+import pytest
+
+pytest.importorskip("openai")
+
+from assistant.llm.openrouter_llm import OpenRouterLLMClient
+from assistant.llm.transport import HTTPTransport, get_transport
+
+
+def test_clients_share_one_connection_pool():
+    first = OpenRouterLLMClient(api_key="test-key", model_name="openai/gpt-4o-mini")
+    second = OpenRouterLLMClient(api_key="test-key", model_name="anthropic/claude-3.5-sonnet")
+
+    assert first.transport is second.transport is get_transport()
+    assert first.client._client is second.client._client is first.transport.http_client
+
+
+def test_async_pool_follows_event_loop():
+    client = OpenRouterLLMClient(api_key="test-key")
+
+    async def pool():
+        assert client.async_client is client.async_client
+        return client.async_client._client
+
+    assert asyncio.run(pool()) is not asyncio.run(pool())
+
+
+def test_worker_loop_gets_its_own_pool():
+    transport = HTTPTransport("https://example.invalid")
+
+    async def main():
+        pool = transport.async_http_client()
+        worker = []
+        thread = threading.Thread(target=lambda: worker.append(asyncio.run(pool_in_worker())))
+        thread.start()
+        thread.join()
+        assert worker[0] is not pool
+        assert transport.async_http_client() is pool
+
+    async def pool_in_worker():
+        return transport.async_http_client()
+
+    asyncio.run(main())
+    # Both loops have ended; the next lookup forgets their pools
+    transport.async_http_client()
+    assert list(transport._async_http_clients) == [None]
+    transport.close()
+
+
+def test_close_closes_async_pools_on_their_loop():
+    transport = HTTPTransport("https://example.invalid")
+    loop = asyncio.new_event_loop()
+
+    async def pool():
+        return transport.async_http_client()
+
+    client = loop.run_until_complete(pool())
+    transport.close()
+    assert client.is_closed
+    loop.close()
+
+
+def test_loop_pool_is_closed_before_the_loop_ends():
+    transport = HTTPTransport("https://example.invalid")
+
+    async def run():
+        client = transport.async_http_client()
+        await transport.aclose_loop_pool()
+        return client
+
+    assert asyncio.run(run()).is_closed
+    assert transport._async_http_clients == {}
+
+
+def test_swap_model_keeps_in_flight_call_on_old_model():
+    client = OpenRouterLLMClient(api_key="test-key", model_name="openai/gpt-4o-mini", retry_delay=0)
+    seen = []
+
+    def create(model, **kwargs):
+        seen.append(model)
+        if len(seen) == 1:
+            client.swap_model("openai/gpt-4o")
+            raise ConnectionError("connection reset")
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content="ok"))], usage=None)
+
+    client.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+
+    assert client.generate("hello") == "ok"
+    assert seen == ["openai/gpt-4o-mini", "openai/gpt-4o-mini"]
+    client.generate("again")
+    assert seen[-1] == "openai/gpt-4o"
+
+
+def test_reset_assistant_swaps_model_in_place(monkeypatch):
+    from api import dependencies
+
+    assistant = SimpleNamespace(llm_client=OpenRouterLLMClient(api_key="test-key", model_name="openai/gpt-4o-mini"))
+    monkeypatch.setattr(dependencies, "_assistant_instance", assistant)
+    monkeypatch.setattr(type(assistant.llm_client), "prewarm", lambda self: None)
+
+    assert dependencies.reset_assistant("OPENROUTER", "openai/gpt-4o") is assistant
+    assert assistant.llm_client.model_name == "openai/gpt-4o"
+
+
+def test_reset_assistant_prewarms_the_serving_loops_pool(monkeypatch):
+    from api import dependencies
+
+    assistant = SimpleNamespace(llm_client=OpenRouterLLMClient(api_key="test-key"))
+    monkeypatch.setattr(dependencies, "_assistant_instance", assistant)
+    warmed = []
+
+    async def aprewarm(self):
+        warmed.append(asyncio.get_running_loop())
+
+    monkeypatch.setattr(type(assistant.llm_client), "prewarm", lambda self: pytest.fail("sync pool warmed"))
+    monkeypatch.setattr(type(assistant.llm_client), "aprewarm", aprewarm)
+
+    async def configure():
+        dependencies.reset_assistant("OPENROUTER", "openai/gpt-4o")
+        await asyncio.sleep(0)
+        return asyncio.get_running_loop()
+
+    assert warmed == [asyncio.run(configure())]
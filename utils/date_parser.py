@@ -1,6 +1,5 @@
 """Date parsing utilities for TaskJarvis."""
 
-import dateparser
 from datetime import datetime
 from typing import Optional
 from taskjarvis_logging.logger import get_logger
@@ -36,6 +35,9 @@ def parse_deadline(deadline_str: Optional[str], reference_time: Optional[datetim
     
     logger.debug(f"Parsing deadline: '{deadline_str}' with reference time: {reference_time}")
     
+    # dateparser is slow to import (timezone tables), so it is loaded on first use
+    import dateparser
+    
     try:
         # Try to parse with dateparser
         parsed_date = dateparser.parse(